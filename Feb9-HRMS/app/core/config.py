@@ -18,8 +18,89 @@ class Settings:
     if DATABASE_URL and DATABASE_URL.startswith("postgres://"):
         DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
     
+    # Optional read replica; GET endpoints read from it when set
+    DATABASE_READ_URL: str = os.getenv("DATABASE_READ_URL", "")
+    if DATABASE_READ_URL and DATABASE_READ_URL.startswith("postgres://"):
+        DATABASE_READ_URL = DATABASE_READ_URL.replace("postgres://", "postgresql://", 1)
+
+    # Connection pool (per engine, per worker process)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+    # Serve the hot routers (auth, attendance, employees, leave) on an
+    # async engine (asyncpg / aiosqlite) instead of the threadpool
+    DB_ASYNC: bool = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+
+    # Run create_all on worker startup. Off by default: create/upgrade the
+    # schema once per deploy with `python bootstrap_db.py` instead.
+    DB_AUTO_CREATE: bool = os.getenv("DB_AUTO_CREATE", "false").lower() in ("1", "true", "yes")
+
+    # Per-request SQL instrumentation: statement count and database time as
+    # X-DB-* response headers and log lines; a statement repeated this many
+    # times within one request is logged as a likely N+1. Only the statement
+    # kinds listed count; repeated writes are usually deliberate batching
+    QUERY_STATS_ENABLED: bool = os.getenv("QUERY_STATS_ENABLED", "true").lower() in ("1", "true", "yes")
+    QUERY_REPEAT_THRESHOLD: int = int(os.getenv("QUERY_REPEAT_THRESHOLD", "5"))
+    QUERY_REPEAT_KINDS: frozenset = frozenset(
+        kind.strip().upper() for kind in os.getenv("QUERY_REPEAT_KINDS", "SELECT").split(",") if kind.strip()
+    )
+
+    # Prometheus metrics at /metrics (per worker process). With a token set,
+    # scrapes must send "Authorization: Bearer <token>"
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+
     SECRET_KEY: str = os.getenv("SECRET_KEY", "supersecretkey") # Change in production
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Authenticated principal cache (set size to 0 to disable)
+    PRINCIPAL_CACHE_MAX_SIZE: int = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "10000"))
+    PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+
+    # Reference data (leave types, roles, departments, job positions) held in
+    # memory; reloaded after this long even if no local write invalidated it
+    REFERENCE_CACHE_TTL_SECONDS: int = int(os.getenv("REFERENCE_CACHE_TTL_SECONDS", "300"))
+
+    # Employee typeahead (/employees/search): "trigram" (pg_trgm index),
+    # "memory" (in-process prefix index) or "auto" to pick by database
+    EMPLOYEE_SEARCH_BACKEND: str = os.getenv("EMPLOYEE_SEARCH_BACKEND", "auto").lower()
+
+    # Cross-worker cache invalidation: "notify" (Postgres LISTEN/NOTIFY),
+    # "poll" (outbox table, for SQLite), "off", or "auto" to pick by database
+    INVALIDATION_BUS: str = os.getenv("INVALIDATION_BUS", "auto").lower()
+    INVALIDATION_POLL_INTERVAL_SECONDS: float = float(os.getenv("INVALIDATION_POLL_INTERVAL_SECONDS", "1"))
+    INVALIDATION_POLL_BACKLOG: int = int(os.getenv("INVALIDATION_POLL_BACKLOG", "10000"))
+
+    # Password hashing: changing BCRYPT_ROUNDS rehashes passwords on next login
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    HASH_POOL_WORKERS: int = int(os.getenv("HASH_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+    HASH_POOL_QUEUE_DEPTH: int = int(os.getenv("HASH_POOL_QUEUE_DEPTH", "32"))
+    HASH_POOL_TIMEOUT_SECONDS: float = float(os.getenv("HASH_POOL_TIMEOUT_SECONDS", "10"))
+    # Bulk imports hashing at once; more get a 503
+    HASH_BULK_JOBS: int = int(os.getenv("HASH_BULK_JOBS", "1"))
+
+    # Attendance storage: monthly partitions (Postgres) created this many
+    # months ahead; months older than the retention window are moved out of
+    # the database to gzip files under the archive directory (0 = keep all)
+    ATTENDANCE_PARTITIONS_AHEAD: int = int(os.getenv("ATTENDANCE_PARTITIONS_AHEAD", "3"))
+    ATTENDANCE_RETENTION_YEARS: int = int(os.getenv("ATTENDANCE_RETENTION_YEARS", "7"))
+    ATTENDANCE_ARCHIVE_DIR: str = os.getenv("ATTENDANCE_ARCHIVE_DIR", "archive/attendance")
+
+    # Group commit for check-in/check-out: collect punches for this many
+    # milliseconds and write them in one transaction (0 = one per request)
+    ATTENDANCE_COALESCE_MS: float = float(os.getenv("ATTENDANCE_COALESCE_MS", "0"))
+    ATTENDANCE_COALESCE_MAX_BATCH: int = int(os.getenv("ATTENDANCE_COALESCE_MAX_BATCH", "500"))
+
+    # Largest CSV / JSON batch accepted by POST /workflows/onboarding/bulk
+    ONBOARDING_BULK_MAX_ROWS: int = int(os.getenv("ONBOARDING_BULK_MAX_ROWS", "1000"))
+
+    # Batch payroll runs
+    PAYROLL_WORKERS: int = int(os.getenv("PAYROLL_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PAYROLL_STANDARD_MONTHLY_HOURS: float = float(os.getenv("PAYROLL_STANDARD_MONTHLY_HOURS", "160"))
+    PAYROLL_OVERTIME_MULTIPLIER: float = float(os.getenv("PAYROLL_OVERTIME_MULTIPLIER", "1.5"))
+
 settings = Settings()
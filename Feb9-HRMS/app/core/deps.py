@@ -1,22 +1,127 @@
+from dataclasses import dataclass
 from typing import Generator, Optional
 from fastapi import Depends, HTTPException, status, Query, Request
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+from app.database import get_async_db, get_db
 from app.core.config import settings
 from app.core import security
+from app.core.cache import TTLCache
+from app.core.invalidation import bus
 from app import models
 
 # set auto_error=False to handle manually efficiently
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token", auto_error=False)
 
-def get_current_user(
-    request: Request,
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme),
-    token_query: str = Query(None, alias="token", description="Alternative: Pass token as query param")
-) -> models.EmployeeSystemAccess:
+@dataclass(frozen=True)
+class Principal:
+    """
+    Compact, immutable snapshot of an authenticated user.
+    Cached per subject so authenticated requests don't hit the DB for
+    the system access row and its role on every call.
+    """
+    access_id: int
+    employee_id: int
+    username: str
+    role_id: int
+    role_name: Optional[str]
+    is_active: bool
+
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    name="principal",
+)
+
+def _principal_select(username: str):
+    return (
+        select(
+            models.EmployeeSystemAccess.access_id,
+            models.EmployeeSystemAccess.employee_id,
+            models.EmployeeSystemAccess.username,
+            models.EmployeeSystemAccess.role_id,
+            models.UserRole.role_name,
+            models.EmployeeSystemAccess.is_active,
+        )
+        .outerjoin(models.UserRole, models.UserRole.role_id == models.EmployeeSystemAccess.role_id)
+        .where(models.EmployeeSystemAccess.username == username)
+    )
+
+def _to_principal(row) -> Optional[Principal]:
+    if row is None:
+        return None
+    return Principal(
+        access_id=row.access_id,
+        employee_id=row.employee_id,
+        username=row.username,
+        role_id=row.role_id,
+        role_name=row.role_name,
+        is_active=bool(row.is_active),
+    )
+
+def load_principal(db: Session, username: str) -> Optional[Principal]:
+    return _to_principal(db.execute(_principal_select(username)).first())
+
+async def load_principal_async(db: AsyncSession, username: str) -> Optional[Principal]:
+    return _to_principal((await db.execute(_principal_select(username))).first())
+
+# Invalidate cached principals whenever the rows they were built from change.
+# Evicting at flush would be too early: until commit, a concurrent request
+# still reads the old row and would cache it again. So the changes are
+# collected on the session and evicted once it commits; other workers hear
+# of them through the bus, which delivers at commit too.
+# Note: bulk query.update()/delete() bypass these hooks; entries then expire by TTL.
+_PENDING = "principal_cache_stale"
+
+def _stash(target, key) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING, set()).add(key)
+
+@event.listens_for(models.EmployeeSystemAccess, "after_insert")
+@event.listens_for(models.EmployeeSystemAccess, "after_update")
+@event.listens_for(models.EmployeeSystemAccess, "after_delete")
+def _invalidate_access(mapper, connection, target):
+    _stash(target, ("access", target.access_id, target.username))
+
+@event.listens_for(models.UserRole, "after_update")
+@event.listens_for(models.UserRole, "after_delete")
+def _invalidate_role(mapper, connection, target):
+    _stash(target, ("role", target.role_id, None))
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    for kind, entity_id, username in session.info.pop(_PENDING, ()):
+        if kind == "access":
+            principal_cache.invalidate(username)
+            principal_cache.invalidate_where(lambda _, p: p.access_id == entity_id)
+        else:
+            principal_cache.invalidate_where(lambda _, p: p.role_id == entity_id)
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+# ... and the same on the other workers, via the invalidation bus
+def _on_access_changed(access_id: Optional[str]) -> None:
+    if access_id is None:
+        principal_cache.clear()
+    else:
+        principal_cache.invalidate_where(lambda _, p: p.access_id == int(access_id))
+
+def _on_role_changed(role_id: Optional[str]) -> None:
+    if role_id is None:
+        principal_cache.clear()
+    else:
+        principal_cache.invalidate_where(lambda _, p: p.role_id == int(role_id))
+
+bus.subscribe(models.EmployeeSystemAccess.__tablename__, _on_access_changed)
+bus.subscribe(models.UserRole.__tablename__, _on_role_changed)
+
+def _token_subject(request: Request, token: Optional[str], token_query: Optional[str]) -> str:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -52,22 +157,60 @@ def get_current_user(
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    
-    user = db.query(models.EmployeeSystemAccess).filter(models.EmployeeSystemAccess.username == username).first()
+    return username
+
+def _check_principal(user: Optional[Principal]) -> Principal:
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return user
 
+def get_current_user(
+    request: Request,
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme),
+    token_query: str = Query(None, alias="token", description="Alternative: Pass token as query param")
+) -> Principal:
+    username = _token_subject(request, token, token_query)
+    user = principal_cache.get(username)
+    if user is None:
+        user = load_principal(db, username)
+        if user is not None:
+            principal_cache.set(username, user)
+    return _check_principal(user)
+
+async def get_current_user_async(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(oauth2_scheme),
+    token_query: str = Query(None, alias="token", description="Alternative: Pass token as query param")
+) -> Principal:
+    username = _token_subject(request, token, token_query)
+    user = principal_cache.get(username)
+    if user is None:
+        user = await load_principal_async(db, username)
+        if user is not None:
+            principal_cache.set(username, user)
+    return _check_principal(user)
+
 def get_current_active_superuser(
-    current_user: models.EmployeeSystemAccess = Depends(get_current_user),
-) -> models.EmployeeSystemAccess:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     # In a real app we'd check role permissions here.
     # For now, assuming anyone with a specific role ID or name is admin.
-    # Let's assume role_name 'Admin' is checked via the relationship.
-    if current_user.role.role_name != "Admin":
+    # Let's assume role_name 'Admin' is checked via the cached principal.
+    if current_user.role_name != "Admin":
          raise HTTPException(
             status_code=400, detail="The user doesn't have enough privileges"
         )
     return current_user
+
+async def get_current_active_superuser_async(
+    current_user: Principal = Depends(get_current_user_async),
+) -> Principal:
+    return get_current_active_superuser(current_user)
@@ -0,0 +1,215 @@
+import json
+import logging
+import os
+import select
+import socket
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional
+from sqlalchemy import String, column, delete, event, func, inspect, insert, select as sql_select, values
+from sqlalchemy.engine import Connection
+from app import database, models
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "hrms_cache_invalidation"
+
+# handler(entity_id) evicts one entry; handler(None) means "drop everything"
+Handler = Callable[[Optional[str]], None]
+
+class InvalidationBus:
+    """
+    Broadcasts "row <id> of <table> changed" to every worker process so
+    in-process caches don't go stale on workers that didn't handle the write.
+
+    Writers call publish() with the connection of the transaction making
+    the change, so the message is only delivered if that transaction
+    commits. Each worker runs one listener thread that dispatches incoming
+    messages to the handlers registered for the entity:
+
+    - notify: Postgres NOTIFY / LISTEN on a dedicated connection
+    - poll:   rows in the cache_invalidations table, read every
+              INVALIDATION_POLL_INTERVAL_SECONDS (SQLite dev setups)
+    """
+
+    def __init__(self, mode: str, poll_interval: float, backlog: int):
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self.backlog = backlog
+        self.received = 0
+        self.published = 0
+        self.resets = 0
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def origin() -> str:
+        # Per process, so it stays correct in workers forked after import
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def resolved_mode(self, dialect: str) -> str:
+        if self.mode == "auto":
+            return "notify" if dialect == "postgresql" else "poll"
+        return self.mode
+
+    def subscribe(self, entity: str, handler: Handler) -> None:
+        self._handlers[entity].append(handler)
+
+    def publish(self, connection: Connection, entity: str, entity_id=None) -> None:
+        mode = self.resolved_mode(connection.dialect.name)
+        if mode == "off":
+            return
+        key = None if entity_id is None else str(entity_id)
+        if mode == "notify":
+            payload = json.dumps({"entity": entity, "id": key, "origin": self.origin()})
+            connection.execute(sql_select(func.pg_notify(CHANNEL, payload)))
+        else:
+            connection.execute(insert(models.CacheInvalidation.__table__).values(
+                entity=entity, entity_id=key, origin=self.origin(),
+            ))
+        self.published += 1
+
+    def publish_many(self, connection: Connection, entity: str, entity_ids: Iterable) -> None:
+        """publish() for many rows of one table, in a single statement (bulk writes)."""
+        mode = self.resolved_mode(connection.dialect.name)
+        keys = [str(entity_id) for entity_id in entity_ids]
+        if mode == "off" or not keys:
+            return
+        if mode == "notify":
+            payloads = values(column("payload", String), name="payloads").data([
+                (json.dumps({"entity": entity, "id": key, "origin": self.origin()}),) for key in keys
+            ])
+            connection.execute(sql_select(func.pg_notify(CHANNEL, payloads.c.payload)).select_from(payloads))
+        else:
+            connection.execute(insert(models.CacheInvalidation.__table__), [
+                {"entity": entity, "entity_id": key, "origin": self.origin()} for key in keys
+            ])
+        self.published += len(keys)
+
+    def dispatch(self, entity: str, entity_id: Optional[str], origin: Optional[str] = None) -> None:
+        # The writing process already evicted its own entries
+        if origin == self.origin():
+            return
+        self.received += 1
+        for handler in self._handlers.get(entity, ()):
+            handler(entity_id)
+
+    def reset(self) -> None:
+        """Drop everything: messages may have been missed (startup, reconnect, lag)."""
+        self.resets += 1
+        for handlers in self._handlers.values():
+            for handler in handlers:
+                handler(None)
+
+    # --- listener ---
+
+    def start(self) -> None:
+        mode = self.resolved_mode(database.engine.dialect.name)
+        if mode == "off" or self._thread is not None:
+            return
+        target = self._listen if mode == "notify" else self._poll
+        self._stop.clear()
+        self._thread = threading.Thread(target=target, name="cache-invalidation", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 5)
+            self._thread = None
+
+    def _listen(self) -> None:
+        connected_before = False
+        while not self._stop.is_set():
+            raw = None
+            try:
+                # Dedicated connection, taken out of the pool for good
+                raw = database.engine.raw_connection()
+                raw.detach()
+                conn = raw.dbapi_connection
+                conn.autocommit = True
+                conn.cursor().execute(f"LISTEN {CHANNEL}")
+                if connected_before:
+                    self.reset()
+                connected_before = True
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], self.poll_interval) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        message = json.loads(conn.notifies.pop(0).payload)
+                        self.dispatch(message["entity"], message.get("id"), message.get("origin"))
+            except Exception:
+                logger.exception("Cache invalidation listener failed; reconnecting")
+                self._stop.wait(self.poll_interval)
+            finally:
+                if raw is not None:
+                    raw.close()
+
+    def _poll(self) -> None:
+        table = models.CacheInvalidation.__table__
+        last_id = None
+        while not self._stop.is_set():
+            try:
+                with database.engine.begin() as conn:
+                    if last_id is None:
+                        # Caches start empty, so only changes from now on matter
+                        last_id = conn.execute(sql_select(func.coalesce(func.max(table.c.invalidation_id), 0))).scalar()
+                    rows = conn.execute(
+                        sql_select(table.c.invalidation_id, table.c.entity, table.c.entity_id, table.c.origin)
+                        .where(table.c.invalidation_id > last_id)
+                        .order_by(table.c.invalidation_id)
+                    ).all()
+                    if rows and last_id and rows[0].invalidation_id > last_id + 1:
+                        # A gap (pruned past us, or a rolled back id): play safe
+                        self.reset()
+                    for row in rows:
+                        self.dispatch(row.entity, row.entity_id, row.origin)
+                        last_id = row.invalidation_id
+                    if rows and last_id > self.backlog:
+                        conn.execute(delete(table).where(table.c.invalidation_id <= last_id - self.backlog))
+            except Exception:
+                logger.exception("Cache invalidation poll failed")
+            self._stop.wait(self.poll_interval)
+
+    def stats(self) -> dict:
+        return {
+            "name": "invalidation_bus",
+            "mode": self.resolved_mode(database.engine.dialect.name),
+            "running": self._thread is not None and self._thread.is_alive(),
+            "published": self.published,
+            "received": self.received,
+            "resets": self.resets,
+        }
+
+bus = InvalidationBus(
+    mode=settings.INVALIDATION_BUS,
+    poll_interval=settings.INVALIDATION_POLL_INTERVAL_SECONDS,
+    backlog=settings.INVALIDATION_POLL_BACKLOG,
+)
+
+def track(model) -> None:
+    """Publish (table name, primary key) whenever a row of `model` is written through the ORM."""
+    entity = model.__table__.name
+    pk = inspect(model).primary_key[0].key
+
+    def _publish(mapper, connection, target):
+        bus.publish(connection, entity, getattr(target, pk))
+
+    for name in ("after_insert", "after_update", "after_delete"):
+        event.listen(model, name, _publish)
+
+# Tables backing in-process caches (principals, reference data, employee
+# search). Registered here, at model import, so scripts writing these
+# tables publish too.
+for _model in (
+    models.Employee,
+    models.EmployeeSystemAccess,
+    models.UserRole,
+    models.LeaveType,
+    models.Department,
+    models.JobPosition,
+):
+    track(_model)
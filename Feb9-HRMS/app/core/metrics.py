@@ -0,0 +1,273 @@
+import bisect
+import hmac
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from app.core.query_stats import route_template
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request latencies, 5ms to 10s
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# (labels, value) pairs of one metric, labels given as ((name, value), ...)
+Samples = Iterable[Tuple[Sequence[Tuple[str, str]], float]]
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+class _GaugeChild(_CounterChild):
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+class _HistogramChild:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self._upper = buckets
+        # Per-bucket (not cumulative) counts; the last slot is +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self._upper, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+class _Metric:
+    kind = ""
+    _child_class: Callable = _CounterChild
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        return self._child_class()
+
+    def labels(self, *values) -> object:
+        """
+        The child for these label values, created on first use. Bind it
+        once and keep it: the lookup is a dict get, but hot paths should
+        not need even that.
+        """
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {values!r}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _samples(self) -> List[Tuple[str, Sequence[Tuple[str, str]], float]]:
+        return [
+            (self.name, tuple(zip(self.labelnames, key)), child.value)
+            for key, child in list(self._children.items())
+        ]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{name}{_labels(labels)} {_number(value)}" for name, labels, value in self._samples()]
+        return lines
+
+class Counter(_Metric):
+    kind = "counter"
+    _child_class = _CounterChild
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+class Gauge(_Metric):
+    kind = "gauge"
+    _child_class = _GaugeChild
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _samples(self):
+        samples = []
+        for key, child in list(self._children.items()):
+            labels = tuple(zip(self.labelnames, key))
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for upper, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", labels + (("le", _number(upper)),), cumulative))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+class Registry:
+    """
+    Metrics of this worker process, rendered in the Prometheus text format.
+
+    Two kinds of sources: metric objects updated as things happen
+    (request latencies, bcrypt waits), and collectors called at scrape time
+    that turn the stats() counters the pools and caches already keep into
+    samples. Each uvicorn worker has its own registry; Prometheus
+    aggregates across them.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Samples]]]] = []
+        self._lock = threading.Lock()
+
+    def _add(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+
+    def collector(self, fn: Callable[[], Iterable[Tuple[str, str, str, Samples]]]):
+        """
+        Register fn() -> [(name, "counter" | "gauge", help, samples)], called
+        on every scrape. Usable as a decorator.
+        """
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines += metric.render()
+        for collect in self._collectors:
+            for name, kind, documentation, samples in collect():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines += [f"{name}{_labels(labels)} {_number(value)}" for labels, value in samples]
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+# --- HTTP ---
+
+UNMATCHED = "unmatched"
+
+http_requests_in_flight = registry.gauge(
+    "hrms_http_requests_in_flight", "Requests currently being handled by this worker."
+)
+http_request_duration = registry.histogram(
+    "hrms_http_request_duration_seconds", "Time to handle a request, by route template.", ("method", "route"),
+)
+http_responses = registry.counter(
+    "hrms_http_responses_total", "Responses sent, by route template and status code.", ("method", "route", "status"),
+)
+
+class MetricsMiddleware:
+    """
+    Records per-route latency and response counts. Routes are labelled by
+    template ("/employees/{employee_id}"), and requests that matched no
+    route as "unmatched", so label cardinality stays bounded.
+
+    Children are bound once per (method, route) and (method, route, status)
+    and kept in plain dicts, so a request costs two dict lookups and three
+    locked increments.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._in_flight = http_requests_in_flight.labels()
+        self._durations: Dict[tuple, _HistogramChild] = {}
+        self._responses: Dict[tuple, _CounterChild] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500 # Unless a response starts, the request failed
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self._in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self._in_flight.dec()
+            self._record(scope, status, time.perf_counter() - started)
+
+    def _record(self, scope, status: int, elapsed: float) -> None:
+        route = scope.get("route")
+        # Routes live as long as the app, so their ids are stable keys
+        key = (scope["method"], id(route))
+        duration = self._durations.get(key)
+        if duration is None:
+            template = route_template(scope) if route is not None else UNMATCHED
+            duration = self._durations[key] = http_request_duration.labels(scope["method"], template)
+        duration.observe(elapsed)
+
+        key = (scope["method"], id(route), status)
+        responses = self._responses.get(key)
+        if responses is None:
+            template = route_template(scope) if route is not None else UNMATCHED
+            responses = self._responses[key] = http_responses.labels(scope["method"], template, status)
+        responses.inc()
+
+def authorized(authorization: Optional[str], token: str) -> bool:
+    """An empty METRICS_TOKEN leaves /metrics open (restrict it at the network level)."""
+    return not token or hmac.compare_digest(authorization or "", f"Bearer {token}")
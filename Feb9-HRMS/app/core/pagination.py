@@ -0,0 +1,141 @@
+import base64
+import bisect
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query as SAQuery
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Largest page a client can ask for; walk further with the cursor
+MAX_PAGE_SIZE = 1000
+
+class PageParams:
+    """
+    Common list parameters. `skip`/`limit` keep the old offset behaviour;
+    passing `cursor` (from a previous X-Next-Cursor header) switches to keyset
+    pagination, whose cost does not grow with page depth.
+    """
+
+    def __init__(
+        self,
+        skip: int = Query(0, ge=0),
+        limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor response header"),
+    ):
+        self.skip = skip
+        self.limit = limit
+        self.cursor = cursor
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, "value"):  # enums
+        return value.value
+    return value
+
+def _decode_value(column, value: Any) -> Any:
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is time:
+        return time.fromisoformat(value)
+    if python_type is Decimal:
+        return Decimal(value)
+    return value
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor shape mismatch")
+        return [_decode_value(col, v) for col, v in zip(columns, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+def _page_query(query, page: PageParams, order_by: Sequence[Any]):
+    # Works for both ORM Query and Core/2.0 Select (both have filter/offset/limit)
+    query = query.order_by(*order_by)
+    if page.cursor:
+        values = decode_cursor(page.cursor, order_by)
+        if len(order_by) == 1:
+            query = query.filter(order_by[0] > values[0])
+        else:
+            query = query.filter(tuple_(*order_by) > tuple_(*values))
+    elif page.skip:
+        query = query.offset(page.skip)
+    return query.limit(page.limit + 1)
+
+def _finish_page(rows: list, page: PageParams, response: Response, order_by: Sequence[Any]) -> list:
+    if rows and len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            [getattr(last, col.key) for col in order_by]
+        )
+    return rows
+
+def paginate(
+    query: SAQuery,
+    page: PageParams,
+    response: Response,
+    *order_by: Any,
+) -> list:
+    """
+    Apply ordering and either offset or keyset pagination to `query`.
+
+    `order_by` is the sort key followed by the primary key (e.g.
+    `Attendance.attendance_date, Attendance.attendance_id`); together they
+    must be unique so the cursor position is unambiguous. When more rows
+    follow, the cursor for the next page is set in the X-Next-Cursor header.
+    """
+    rows = _page_query(query, page, order_by).all()
+    return _finish_page(rows, page, response, order_by)
+
+async def paginate_async(
+    db: AsyncSession,
+    stmt: Select,
+    page: PageParams,
+    response: Response,
+    *order_by: Any,
+) -> list:
+    """
+    paginate() for a select() on an AsyncSession: of one ORM entity (rows
+    are the objects) or of columns (rows are tuples, as with paginate()).
+    """
+    result = await db.execute(_page_query(stmt, page, order_by))
+    described = stmt.column_descriptions
+    if len(described) == 1 and described[0]["expr"] is described[0]["entity"]:
+        result = result.scalars()
+    return _finish_page(list(result.all()), page, response, order_by)
+
+def paginate_sorted(rows: Sequence[Any], keys: Sequence[Any], page: PageParams, response: Response, column: Any) -> list:
+    """
+    paginate() over an in-memory list already sorted by the unique `column`;
+    `keys[i]` is that column's value for `rows[i]`. Cursors are interchangeable
+    with the ones paginate() issues for the same column.
+    """
+    if page.cursor:
+        (after,) = decode_cursor(page.cursor, [column])
+        start = bisect.bisect_right(keys, after)
+    else:
+        start = page.skip
+    return _finish_page(list(rows[start:start + page.limit + 1]), page, response, [column])
@@ -0,0 +1,197 @@
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Collection, Iterator, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+COUNT_HEADER = "X-DB-Query-Count"
+TIME_HEADER = "X-DB-Query-Time-Ms"
+REPEATED_HEADER = "X-DB-Repeated-Queries"
+HEADERS = [COUNT_HEADER, TIME_HEADER, REPEATED_HEADER]
+
+class QueryStats:
+    """Statements run, and time spent running them, inside one capture() block."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        # Keyed by SQL text with placeholders, so the same lazy load for
+        # different rows counts as one statement repeated
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: Optional[int] = None, kinds: Optional[Collection[str]] = None) -> List[Tuple[str, int]]:
+        """
+        Statements of the given kinds run at least `threshold` times: the
+        signature of an N+1. Only SELECTs count by default, since repeated
+        writes are usually deliberate batching (payroll's INSERT ... SELECT
+        per department), not lazy loads.
+        """
+        threshold = settings.QUERY_REPEAT_THRESHOLD if threshold is None else threshold
+        kinds = settings.QUERY_REPEAT_KINDS if kinds is None else kinds
+        return [
+            (statement, n) for statement, n in self.statements.most_common()
+            if n >= threshold and statement_kind(statement) in kinds
+        ]
+
+    def report(self) -> str:
+        return "\n".join(f"{n:>4} x {_shorten(statement)}" for statement, n in self.statements.most_common())
+
+def statement_kind(statement: str) -> str:
+    """SELECT, INSERT, UPDATE, ...; a leading WITH counts as SELECT."""
+    words = statement.split(None, 1)
+    kind = words[0].upper() if words else ""
+    return "SELECT" if kind == "WITH" else kind
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+# Every engine (primary, read replica, the async engines' sync core) reports
+# here; a statement only counts when a capture() is active in its context.
+# Threadpool handlers and async sessions run in a copy of the request's
+# context, so their statements reach the request's QueryStats.
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_stats_started", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = conn.info.get("query_stats_started")
+    if stats is not None and started:
+        stats.record(statement, time.perf_counter() - started.pop())
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    started = conn.info.get("query_stats_started") if conn is not None else None
+    if started:
+        started.pop()
+
+@contextmanager
+def capture() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+def _shorten(statement: str, limit: int = 200) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+class QueryStatsMiddleware:
+    """
+    Counts the SQL statements and database time of each request. The totals
+    go out as X-DB-* response headers and one JSON log line per request;
+    requests repeating a statement of QUERY_REPEAT_KINDS (SELECT by default)
+    QUERY_REPEAT_THRESHOLD times or more are logged as warnings with the
+    statements, as likely N+1 patterns.
+
+    Headers are written when the response starts, so for streaming
+    responses (exports) they only cover the work done before the first
+    chunk; the log line covers the whole request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = None
+        started = time.perf_counter()
+        with capture() as stats:
+            async def send_with_stats(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    headers = MutableHeaders(scope=message)
+                    headers[COUNT_HEADER] = str(stats.count)
+                    headers[TIME_HEADER] = f"{stats.seconds * 1000:.2f}"
+                    headers[REPEATED_HEADER] = str(len(stats.repeated()))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_stats)
+            finally:
+                _log(scope, status, stats, time.perf_counter() - started)
+
+def route_template(scope) -> str:
+    """
+    "/employees/{employee_id}" for /employees/5, so per-route numbers group
+    together. The matched route only knows its path within its router, so
+    the router prefix is taken from the request path.
+    """
+    path = scope["path"]
+    route = scope.get("route")
+    if route is None or not hasattr(route, "path_format"):
+        return path
+    try:
+        matched = route.path_format.format(**{k: str(v) for k, v in scope.get("path_params", {}).items()})
+    except (KeyError, IndexError, ValueError):
+        return path
+    if not path.endswith(matched):
+        return path
+    return path[:len(path) - len(matched)] + route.path
+
+def _log(scope, status: Optional[int], stats: QueryStats, elapsed: float) -> None:
+    record = {
+        "method": scope["method"],
+        "route": route_template(scope),
+        "status": status,
+        "queries": stats.count,
+        "db_ms": round(stats.seconds * 1000, 2),
+        "request_ms": round(elapsed * 1000, 2),
+    }
+    repeated = stats.repeated()
+    if repeated:
+        record["repeated"] = [{"count": n, "statement": _shorten(statement)} for statement, n in repeated]
+        logger.warning("Likely N+1 query pattern: %s", json.dumps(record))
+    else:
+        logger.info("%s", json.dumps(record))
+
+# --- test helpers ---
+
+def assert_max_queries(response, limit: int) -> None:
+    """
+    Fail unless the response (TestClient / httpx) reports at most `limit`
+    statements in its X-DB-Query-Count header:
+
+        assert_max_queries(client.get("/employees/?limit=50", headers=auth), 3)
+    """
+    count = response.headers.get(COUNT_HEADER)
+    if count is None:
+        raise AssertionError(f"No {COUNT_HEADER} header on the response: is QUERY_STATS_ENABLED on?")
+    if int(count) > limit:
+        request = response.request
+        raise AssertionError(
+            f"{request.method} {request.url.path} ran {count} queries, expected at most {limit} "
+            f"({response.headers.get(REPEATED_HEADER, 0)} repeated statement(s))"
+        )
+
+@contextmanager
+def max_queries(limit: int) -> Iterator[QueryStats]:
+    """
+    Fail when the block runs more than `limit` statements, listing them.
+    For code called directly in the test's thread (services, handlers);
+    use assert_max_queries() for requests through a client.
+    """
+    with capture() as stats:
+        yield stats
+    if stats.count > limit:
+        raise AssertionError(f"Ran {stats.count} queries, expected at most {limit}:\n{stats.report()}")
@@ -1,23 +1,236 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta
-from typing import Optional, Union, Any
+from typing import List, Optional, Tuple, Union, Any
+from fastapi import HTTPException, status
 from jose import jwt
 from passlib.context import CryptContext
+from app.core import metrics
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes with a different cost factor are flagged for rehash on next login.
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+# --- Raw bcrypt work (runs inside the hashing pool's worker processes) ---
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _timed(fn, *args):
+    # Worker-side run time, so the caller can tell queueing from hashing
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+# bcrypt at the default cost takes ~0.25s; queueing can take up to the timeout
+_HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+hash_queue_wait = metrics.registry.histogram(
+    "hrms_password_hash_queue_wait_seconds",
+    "Time a password hash/verify waited for a free bcrypt worker.",
+    buckets=_HASH_BUCKETS,
+)
+hash_duration = metrics.registry.histogram(
+    "hrms_password_hash_seconds", "Time spent hashing/verifying one password.", buckets=_HASH_BUCKETS,
+)
+
+class HashingPool:
+    """
+    Bounded process pool for bcrypt.
+    At most `workers + queue_depth` hashes are in flight at once; anything
+    beyond that is rejected immediately with a 503 instead of piling up
+    request threads behind a login storm.
+    """
+
+    def __init__(self, workers: int, queue_depth: int, timeout: float):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+        self.rejected = 0
+        self._slots = threading.BoundedSemaphore(max(workers, 1) + queue_depth)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._queue_wait = hash_queue_wait.labels()
+        self._duration = hash_duration.labels()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _acquire(self) -> None:
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        with self._lock:
+            self._in_flight += 1
+
+    def _release(self, future=None) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _submit(self, fn, *args) -> Future:
+        # The slot is freed when the worker finishes, not when the caller
+        # gives up: a timed-out bcrypt keeps its process busy until it is done
+        try:
+            future = self._get_executor().submit(_timed, fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _timed_out(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service timed out, please retry",
+            headers={"Retry-After": "1"},
+        )
+
+    def run(self, fn, *args):
+        self._acquire()
+        # workers=0 keeps hashing inline (dev/tests), still bounded by the slots
+        if self.workers <= 0:
+            try:
+                return self._observe(time.perf_counter(), *_timed(fn, *args))
+            finally:
+                self._release()
+        submitted = time.perf_counter()
+        future = self._submit(fn, *args)
+        try:
+            return self._observe(submitted, *future.result(timeout=self.timeout))
+        except FutureTimeoutError:
+            future.cancel()
+            raise self._timed_out()
+
+    async def run_async(self, fn, *args):
+        """Same as run(), but awaits the worker instead of blocking the event loop."""
+        self._acquire()
+        if self.workers <= 0:
+            try:
+                return self._observe(time.perf_counter(), *_timed(fn, *args))
+            finally:
+                self._release()
+        submitted = time.perf_counter()
+        future = self._submit(fn, *args)
+        try:
+            # Timing out cancels the wrapper, which cancels the job only if it has not started
+            result, ran = await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise self._timed_out()
+        return self._observe(submitted, result, ran)
+
+    def _observe(self, submitted: float, result, ran: float):
+        # Inline hashing has no queue: its wait comes out as ~0
+        self._queue_wait.observe(max(0.0, time.perf_counter() - submitted - ran))
+        self._duration.observe(ran)
+        return result
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+
+hash_pool = HashingPool(
+    workers=settings.HASH_POOL_WORKERS,
+    queue_depth=settings.HASH_POOL_QUEUE_DEPTH,
+    timeout=settings.HASH_POOL_TIMEOUT_SECONDS,
+)
+
+class BulkHashingPool:
+    """
+    Process pool for bulk hashing (onboarding batches), kept apart from
+    hash_pool: through it a batch would either be rejected by the overload
+    guard or queue ahead of every login for its whole duration. Created on
+    first use and shared by all requests; at most `jobs` batches hash at
+    once and further ones get a 503 rather than oversubscribing the CPUs.
+    """
+
+    def __init__(self, workers: int, jobs: int):
+        self.workers = workers
+        self.rejected = 0
+        self._jobs = threading.BoundedSemaphore(max(jobs, 1))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def hash_all(self, passwords: List[str]) -> List[str]:
+        if not self._jobs.acquire(blocking=False):
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Another bulk import is hashing passwords, please retry",
+                headers={"Retry-After": "5"},
+            )
+        try:
+            chunksize = max(1, len(passwords) // (self.workers * 4))
+            return list(self._get_executor().map(_hash, passwords, chunksize=chunksize))
+        finally:
+            self._jobs.release()
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+
+bulk_hash_pool = BulkHashingPool(workers=settings.HASH_POOL_WORKERS, jobs=settings.HASH_BULK_JOBS)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return verify_and_update_password(plain_password, hashed_password)[0]
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password; if the stored hash uses an outdated cost factor,
+    also return a fresh hash that the caller should persist.
+    """
+    return hash_pool.run(_verify_and_update, plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return hash_pool.run(_hash, password)
+
+def get_password_hashes(passwords: List[str]) -> List[str]:
+    """Hash many passwords at once (bulk onboarding), on bulk_hash_pool."""
+    if len(passwords) <= 1 or bulk_hash_pool.workers <= 0:
+        return [get_password_hash(p) for p in passwords]
+    return bulk_hash_pool.hash_all(passwords)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return await hash_pool.run_async(_verify_and_update, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await hash_pool.run_async(_hash, password)
 
 def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    
+
     to_encode = {"exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
@@ -0,0 +1,93 @@
+import copy
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Type
+import orjson
+from fastapi import HTTPException, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.orm import Session
+
+def _default(value: Any) -> Any:
+    # orjson handles dates, times, enums and UUIDs natively; Decimal is
+    # rendered as a string, the same way Pydantic does it in JSON mode.
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default)
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson instead of the stdlib encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def _passthrough_headers(response: Response) -> Dict[str, str]:
+    # Returning a Response directly skips FastAPI's merge of the injected
+    # response, so carry over headers set by dependencies (e.g. X-Next-Cursor).
+    return {k: v for k, v in response.headers.items() if k != "content-length"}
+
+class ListSerializer:
+    """
+    Fast response path for a `List[schema]` endpoint.
+
+    `adapter` is built once per schema instead of per request. `render()`
+    validates ORM objects and dumps them to JSON bytes in one pass inside
+    pydantic-core; `render_rows()` skips validation entirely for read-only
+    listings that select exactly the schema's columns (see `columns`).
+    `project()` narrows both to the fields a client asked for.
+    """
+
+    def __init__(self, schema: Type[BaseModel], model, key_fields: Optional[Sequence[str]] = None):
+        self.schema = schema
+        self.model = model
+        self.adapter = TypeAdapter(List[schema])
+        table = model.__table__
+        missing = [name for name in schema.model_fields if name not in table.c]
+        if missing:
+            raise ValueError(f"{schema.__name__} fields are not columns of {table.name}: {missing}")
+        self.fields = list(schema.model_fields)
+        self.columns = [getattr(model, name) for name in self.fields]
+        # Kept in every projection: the pagination cursor is read from them
+        self.key_fields = list(key_fields) if key_fields is not None else [c.key for c in table.primary_key]
+        self._include = None
+
+    def project(self, fields: Optional[str]) -> "ListSerializer":
+        """
+        The serializer narrowed to a comma-separated `fields=` selection, for
+        both the SELECT (via query()) and the JSON; None or "" means all.
+        Only the schema's fields can be asked for, so a projection never
+        reaches a column the full response doesn't expose. The key fields
+        are always included.
+        """
+        if not fields:
+            return self
+        wanted = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = wanted.difference(self.fields)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(self.fields)}",
+            )
+        wanted.update(self.key_fields)
+        projection = copy.copy(self)
+        projection.fields = [name for name in self.fields if name in wanted]
+        projection.columns = [getattr(self.model, name) for name in projection.fields]
+        projection._include = {"__all__": set(projection.fields)}
+        return projection
+
+    def query(self, db: Session):
+        """ORM query over the schema's columns only; rows come back as plain tuples."""
+        return db.query(*self.columns)
+
+    def render(self, objs: Sequence[Any], response: Response) -> Response:
+        # Validation reads every attribute, so projections are only cheaper
+        # through query() + render_rows()
+        body = self.adapter.dump_json(self.adapter.validate_python(objs, from_attributes=True), include=self._include)
+        return Response(body, media_type="application/json", headers=_passthrough_headers(response))
+
+    def render_rows(self, rows: Sequence[Sequence[Any]], response: Response) -> Response:
+        fields = self.fields
+        body = dumps([dict(zip(fields, row)) for row in rows])
+        return Response(body, media_type="application/json", headers=_passthrough_headers(response))
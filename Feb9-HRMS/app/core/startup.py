@@ -0,0 +1,37 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+class StartupTimings:
+    """
+    Wall-clock seconds spent in each startup phase of this worker, counted
+    from the moment this module is first imported (the top of app.main).
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.ready_at: Optional[float] = None
+
+    def mark(self, name: str) -> None:
+        """Record time elapsed since process import started (e.g. for "imports")."""
+        self.phases[name] = round(time.perf_counter() - self.started, 4)
+
+    @contextmanager
+    def phase(self, name: str):
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round(time.perf_counter() - began, 4)
+
+    def mark_ready(self) -> None:
+        self.ready_at = time.perf_counter()
+
+    def report(self) -> dict:
+        return {
+            "phases": dict(self.phases),
+            "time_to_ready_seconds": round(self.ready_at - self.started, 4) if self.ready_at else None,
+        }
+
+timings = StartupTimings()
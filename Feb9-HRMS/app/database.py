@@ -1,13 +1,80 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from sqlalchemy import create_engine, exc
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from app.core.config import settings
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+class PoolStats:
+    """Checkout wait-time counters for one engine's pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, waited: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += waited
+            if waited > self.wait_max:
+                self.wait_max = waited
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats("default")
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.observe(time.perf_counter() - started, timed_out=True)
+            raise
+        # Anything else (refused connection, bad credentials) is an outage,
+        # not pool exhaustion, and propagates without touching the stats
+        self.stats.observe(time.perf_counter() - started)
+        return conn
+
+    def recreate(self):
+        # Keep the same stats object across engine.dispose()
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+def _make_engine(url: str, name: str):
+    if url.startswith("sqlite"):
+        # Pool sizing does not apply to SQLite's file/memory pools
+        return create_engine(url)
+    eng = create_engine(
+        url,
+        poolclass=TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    eng.pool.stats.name = name
+    return eng
+
+engine = _make_engine(SQLALCHEMY_DATABASE_URL, "primary")
+read_engine = _make_engine(settings.DATABASE_READ_URL, "replica") if settings.DATABASE_READ_URL else engine
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base = declarative_base()
 
@@ -17,3 +84,68 @@ def get_db():
         yield db
     finally:
         db.close()
+
+if read_engine is engine:
+    # No replica: reuse get_db itself so a request that needs both
+    # dependencies shares one session (FastAPI caches per dependency).
+    get_read_db = get_db
+else:
+    def get_read_db():
+        db = ReadSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+# --- Async mode (DB_ASYNC=1): asyncpg / aiosqlite engine for the ported routers ---
+
+def _async_url(url: str) -> str:
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+async_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    _async_database_url = _async_url(SQLALCHEMY_DATABASE_URL)
+    if _async_database_url.startswith("sqlite"):
+        async_engine = create_async_engine(_async_database_url)
+    else:
+        async_engine = create_async_engine(
+            _async_database_url,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+    # No expire on commit: attributes can't lazy-load outside the greenlet,
+    # so handlers refresh explicitly where server defaults matter.
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database mode is disabled; set DB_ASYNC=1")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def pool_status(eng) -> dict:
+    pool = eng.pool
+    status = {"engine": eng.url.render_as_string(hide_password=True), "pool": type(pool).__name__}
+    for attr in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, attr):
+            status[attr] = getattr(pool, attr)()
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update({
+            "checkouts": stats.checkouts,
+            "timeouts": stats.timeouts,
+            "wait_seconds_total": round(stats.wait_total, 6),
+            "wait_seconds_max": round(stats.wait_max, 6),
+            "wait_seconds_avg": round(stats.wait_total / stats.checkouts, 6) if stats.checkouts else 0.0,
+        })
+    return status
@@ -1,14 +1,24 @@
+from app.core.startup import timings
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.orm import configure_mappers
 from app import models, database
 from app.routers import (
-    auth, employees, admin, attendance, leave, 
-    payroll, recruitment, performance, training, benefits, assets
+    auth, employees, admin, attendance, leave,
+    payroll, recruitment, performance, training, benefits, assets, workflows
 )
+from app.routers import metrics as metrics_router
+from app.core import invalidation, metrics, query_stats, security
 from app.core.config import settings
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.serialization import ORJSONResponse
+from app.services import attendance_partitions, reference
+from app.services import payroll as payroll_service
+from app.services.punch_coalescer import coalescer
 
-
-models.Base.metadata.create_all(bind=database.engine)
+# Schema creation no longer happens on import: run `python bootstrap_db.py`
+# once per deploy (or set DB_AUTO_CREATE=1 for throwaway dev databases).
+timings.mark("imports")
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -16,6 +26,7 @@ app = FastAPI(
     openapi_url="/api/v1/openapi.json",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
 )
 # CORS
 origins = ["*"]
@@ -25,23 +36,81 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, *query_stats.HEADERS],
 )
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+if settings.QUERY_STATS_ENABLED:
+    # Added last so it wraps everything, CORS included
+    app.add_middleware(query_stats.QueryStatsMiddleware)
 
 # Routers
-app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
-app.include_router(admin.router, prefix="/admin", tags=["Admin"])
-app.include_router(employees.router, prefix="/employees", tags=["Employees"])
-app.include_router(attendance.router, prefix="/attendance", tags=["Attendance"])
-app.include_router(leave.router, prefix="/leave", tags=["Leave"])
-app.include_router(payroll.router, prefix="/payroll", tags=["Payroll"])
-app.include_router(recruitment.router, prefix="/recruitment", tags=["Recruitment"])
-app.include_router(performance.router, prefix="/performance", tags=["Performance"])
-app.include_router(training.router, prefix="/training", tags=["Training"])
-app.include_router(benefits.router, prefix="/benefits", tags=["Benefits"])
-app.include_router(assets.router, prefix="/assets", tags=["Assets"])
-
-from app.routers import workflows
-app.include_router(workflows.router, prefix="/workflows", tags=["Workflows"])
+def include_routers(app: FastAPI) -> None:
+    auth_router, employees_router, attendance_router, leave_router = (
+        auth.router, employees.router, attendance.router, leave.router
+    )
+    if settings.DB_ASYNC:
+        # Hot paths served from the async engine; everything else stays sync
+        from app.routers import aio
+        from app.routers.aio import auth as aio_auth, employees as aio_employees
+        from app.routers.aio import attendance as aio_attendance, leave as aio_leave
+        auth_router = aio.merge_routers(aio_auth.router, auth.router)
+        employees_router = aio.merge_routers(aio_employees.router, employees.router)
+        attendance_router = aio.merge_routers(aio_attendance.router, attendance.router)
+        leave_router = aio.merge_routers(aio_leave.router, leave.router)
+
+    app.include_router(auth_router, prefix="/auth", tags=["Authentication"])
+    app.include_router(admin.router, prefix="/admin", tags=["Admin"])
+    app.include_router(employees_router, prefix="/employees", tags=["Employees"])
+    app.include_router(attendance_router, prefix="/attendance", tags=["Attendance"])
+    app.include_router(leave_router, prefix="/leave", tags=["Leave"])
+    app.include_router(payroll.router, prefix="/payroll", tags=["Payroll"])
+    app.include_router(recruitment.router, prefix="/recruitment", tags=["Recruitment"])
+    app.include_router(performance.router, prefix="/performance", tags=["Performance"])
+    app.include_router(training.router, prefix="/training", tags=["Training"])
+    app.include_router(benefits.router, prefix="/benefits", tags=["Benefits"])
+    app.include_router(assets.router, prefix="/assets", tags=["Assets"])
+    app.include_router(workflows.router, prefix="/workflows", tags=["Workflows"])
+    if settings.METRICS_ENABLED:
+        app.include_router(metrics_router.router)
+
+with timings.phase("routers"):
+    include_routers(app)
+
+@app.on_event("startup")
+def startup():
+    # Resolve relationships now rather than on the first query of the first request
+    with timings.phase("configure_mappers"):
+        configure_mappers()
+    if settings.DB_AUTO_CREATE:
+        with timings.phase("create_all"):
+            models.Base.metadata.create_all(bind=database.engine)
+    with timings.phase("attendance_partitions"):
+        # Keeps upcoming months' partitions in place between deploys
+        db = database.SessionLocal()
+        try:
+            attendance_partitions.ensure_partitions(db)
+        finally:
+            db.close()
+    with timings.phase("invalidation_bus"):
+        invalidation.bus.start()
+    with timings.phase("reference_data"):
+        db = database.ReadSessionLocal()
+        try:
+            reference.load_all(db)
+        finally:
+            db.close()
+    timings.mark_ready()
+
+@app.on_event("shutdown")
+def shutdown_workers():
+    # Commit punches still waiting for their batch
+    coalescer.stop()
+    invalidation.bus.stop()
+    # Forked bcrypt / payroll workers would otherwise outlive the server
+    security.hash_pool.shutdown(wait=True)
+    security.bulk_hash_pool.shutdown(wait=True)
+    payroll_service.pool.shutdown(wait=True)
 
 @app.get("/")
 def root():
@@ -1,4 +1,5 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Date, DateTime, Time, Text, Numeric, Enum, JSON
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, Date, DateTime, Time, Text, Numeric, Enum, JSON, UniqueConstraint
+from sqlalchemy import DDL, PrimaryKeyConstraint, Sequence, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -173,6 +174,12 @@ class PaymentFrequency(str, enum.Enum):
     BiWeekly = "Bi-weekly"
     Weekly = "Weekly"
 
+class LeaveLedgerEntryType(str, enum.Enum):
+    Allocation = "Allocation"
+    Approval = "Approval"
+    Reversal = "Reversal"
+    CarryForward = "Carry Forward"
+
 # Models
 
 class Department(Base):
@@ -196,6 +203,22 @@ class Department(Base):
     job_positions = relationship("JobPosition", back_populates="department")
 
 
+class DepartmentClosure(Base):
+    """
+    Closure table over Department.parent_department_id: one row per
+    (ancestor, descendant) pair, including each department with itself at
+    depth 0. Maintained by app.services.hierarchy.
+    """
+    __tablename__ = "department_closure"
+    ancestor_id = Column(Integer, ForeignKey("departments.department_id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("departments.department_id", ondelete="CASCADE"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_department_closure_descendant", "descendant_id", "depth"),
+    )
+
+
 class JobPosition(Base):
     __tablename__ = "job_positions"
 
@@ -275,6 +298,18 @@ class Employee(Base):
     system_access = relationship("EmployeeSystemAccess", back_populates="employee", uselist=False)
 
 
+class EmployeeClosure(Base):
+    """Closure table over Employee.manager_id (reporting lines)."""
+    __tablename__ = "employee_closure"
+    ancestor_id = Column(Integer, ForeignKey("employees.employee_id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("employees.employee_id", ondelete="CASCADE"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_employee_closure_descendant", "descendant_id", "depth"),
+    )
+
+
 class EmployeeEducation(Base):
     __tablename__ = "employee_education"
     education_id = Column(Integer, primary_key=True, index=True)
@@ -373,6 +408,65 @@ class Attendance(Base):
 
     employee = relationship("Employee", back_populates="attendances")
 
+    # One row per employee per day (upsert target); also serves the per-employee
+    # keyset pagination key, alongside (attendance_date, attendance_id) for admins.
+    # On Postgres the table is range partitioned by month on attendance_date
+    # (see services/attendance_partitions), and a partitioned table's primary
+    # key must include the partition key, so there it is added after CREATE.
+    __table_args__ = (
+        PrimaryKeyConstraint("attendance_id").ddl_if(callable_=lambda *a, dialect, **kw: dialect.name != "postgresql"),
+        UniqueConstraint("employee_id", "attendance_date", name="uq_attendance_employee_date"),
+        Index("ix_attendance_date_id", "attendance_date", "attendance_id"),
+        {"postgresql_partition_by": "RANGE (attendance_date)"},
+    )
+
+
+event.listen(
+    Attendance.__table__,
+    "after_create",
+    DDL("ALTER TABLE attendance ADD CONSTRAINT attendance_pkey PRIMARY KEY (attendance_id, attendance_date)")
+    .execute_if(dialect="postgresql"),
+)
+
+
+class AttendanceMonthlySummary(Base):
+    # Rollup of Attendance per employee-month, refreshed whenever the
+    # month's rows are written (see services/attendance.refresh_monthly_summary)
+    __tablename__ = "attendance_monthly_summary"
+    summary_id = Column(Integer, primary_key=True, index=True)
+    employee_id = Column(Integer, ForeignKey("employees.employee_id"), nullable=False)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+    days_recorded = Column(Integer, nullable=False, default=0)
+    days_present = Column(Integer, nullable=False, default=0)
+    days_late = Column(Integer, nullable=False, default=0)
+    days_absent = Column(Integer, nullable=False, default=0)
+    days_on_leave = Column(Integer, nullable=False, default=0)
+    total_work_hours = Column(Numeric(8, 2), nullable=False, default=0)
+    total_overtime_hours = Column(Numeric(8, 2), nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("employee_id", "year", "month", name="uq_attendance_summary_employee_month"),
+        Index("ix_attendance_summary_month", "year", "month", "employee_id"),
+    )
+
+
+class AttendanceArchive(Base):
+    # One attendance month moved out of the live table to a compressed file
+    __tablename__ = "attendance_archives"
+    archive_id = Column(Integer, primary_key=True, index=True)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+    path = Column(String(500), nullable=False)
+    row_count = Column(Integer, nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("year", "month", name="uq_attendance_archive_month"),
+    )
+
 
 class LeaveType(Base):
     __tablename__ = "leave_types"
@@ -405,6 +499,31 @@ class EmployeeLeaveBalance(Base):
     employee = relationship("Employee", back_populates="leave_balances")
     leave_type = relationship("LeaveType")
 
+    __table_args__ = (
+        UniqueConstraint("employee_id", "leave_type_id", "year", name="uq_leave_balance_employee_type_year"),
+    )
+
+
+class LeaveLedgerEntry(Base):
+    """
+    Append-only history of every change to an EmployeeLeaveBalance.
+    `days` is signed: positive adds to the balance, negative consumes it.
+    """
+    __tablename__ = "leave_ledger"
+    entry_id = Column(Integer, primary_key=True, index=True)
+    employee_id = Column(Integer, ForeignKey("employees.employee_id"), nullable=False)
+    leave_type_id = Column(Integer, ForeignKey("leave_types.leave_type_id"), nullable=False)
+    year = Column(Integer, nullable=False)
+    entry_type = Column(Enum(LeaveLedgerEntryType), nullable=False)
+    days = Column(Numeric(5, 2), nullable=False)
+    leave_id = Column(Integer, ForeignKey("leave_applications.leave_id"))
+    created_by = Column(Integer)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_leave_ledger_employee_type_year", "employee_id", "leave_type_id", "year"),
+    )
+
 
 class LeaveApplication(Base):
     __tablename__ = "leave_applications"
@@ -426,6 +545,10 @@ class LeaveApplication(Base):
     approver = relationship("Employee", foreign_keys=[approved_by])
     leave_type = relationship("LeaveType")
 
+    __table_args__ = (
+        Index("ix_leave_applications_status_id", "status", "leave_id"),
+    )
+
 
 class SalaryStructure(Base):
     __tablename__ = "salary_structure"
@@ -480,6 +603,12 @@ class Payroll(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    # One payslip per employee and period: overlapping payroll runs can't
+    # pay anyone twice, and runs skip employees already paid
+    __table_args__ = (
+        UniqueConstraint("employee_id", "pay_period_start", "pay_period_end", name="uq_payroll_employee_period"),
+    )
+
 
 class Bonus(Base):
     __tablename__ = "bonuses"
@@ -515,6 +644,10 @@ class JobPosting(Base):
     posted_by = Column(Integer)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        Index("ix_job_postings_status_id", "status", "posting_id"),
+    )
+
 
 class JobApplication(Base):
     __tablename__ = "job_applications"
@@ -784,3 +917,35 @@ class AuditLog(Base):
     ip_address = Column(String(45))
     user_agent = Column(String(255))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class CacheInvalidation(Base):
+    # Outbox read by the cache invalidation bus in polling mode (no LISTEN/NOTIFY)
+    __tablename__ = "cache_invalidations"
+    invalidation_id = Column(Integer, primary_key=True, index=True)
+    entity = Column(String(50), nullable=False)
+    entity_id = Column(String(100))
+    origin = Column(String(100))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# Employee code numbers, reserved a block at a time by each worker (see
+# app/services/employee_codes.py): one nextval hands out EMPLOYEE_CODE_BLOCK
+# numbers. Databases without sequences use the code_sequences counters.
+EMPLOYEE_CODE_BLOCK = 100
+employee_code_seq = Sequence("employee_code_seq", start=1, increment=EMPLOYEE_CODE_BLOCK, metadata=Base.metadata)
+
+
+class CodeSequence(Base):
+    # Sequence emulation for SQLite: next unreserved value per sequence name
+    __tablename__ = "code_sequences"
+    name = Column(String(50), primary_key=True)
+    next_value = Column(Integer, nullable=False)
+
+
+# Keep the org hierarchy closure tables in sync with Department/Employee writes
+from app.services import hierarchy as _hierarchy  # noqa: E402,F401
+# Broadcast writes to cached tables to the other worker processes
+from app.core import invalidation as _invalidation  # noqa: E402,F401
+# Full-text search indexes over job postings and applications
+from app.services import search as _search  # noqa: E402,F401
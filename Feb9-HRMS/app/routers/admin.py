@@ -1,9 +1,15 @@
 from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from app import models, schemas
-from app.database import get_db
+from app import database
+from app.database import get_db, get_read_db
 from app.core import deps
+from app.core.invalidation import bus
+from app.core.pagination import PageParams
+from app.core.startup import timings
+from app.services import employee_search, hierarchy, reference
+from app.services.punch_coalescer import coalescer
 
 router = APIRouter()
 
@@ -11,20 +17,21 @@ router = APIRouter()
 
 @router.get("/departments", response_model=List[schemas.Department])
 def read_departments(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_user),
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
+    current_user: deps.Principal = Depends(deps.get_current_user),
 ) -> Any:
-    deps = db.query(models.Department).offset(skip).limit(limit).all()
-    return deps
+    # Served from the reference cache; If-None-Match gets a 304
+    return reference.departments.respond(request, response, page, db)
 
 @router.post("/departments", response_model=schemas.Department)
 def create_department(
     *,
     db: Session = Depends(get_db),
     department_in: schemas.DepartmentCreate,
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_active_superuser),
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser),
 ) -> Any:
     data = department_in.model_dump()
     # Check parent dept if provided
@@ -36,27 +43,74 @@ def create_department(
     dept = models.Department(**data)
     db.add(dept)
     db.commit()
+    reference.departments.invalidate()
     db.refresh(dept)
     return dept
 
+@router.get("/departments/{department_id}/subtree", response_model=List[schemas.Department])
+def read_department_subtree(
+    department_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: deps.Principal = Depends(deps.get_current_user),
+) -> Any:
+    """All sub-departments at any depth, nearest levels first."""
+    return hierarchy.departments.subtree_query(db, models.Department, department_id).all()
+
+@router.get("/departments/{department_id}/ancestors", response_model=List[schemas.Department])
+def read_department_ancestors(
+    department_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: deps.Principal = Depends(deps.get_current_user),
+) -> Any:
+    """Parent chain up to the root department, nearest first."""
+    return hierarchy.departments.ancestors_query(db, models.Department, department_id).all()
+
+@router.get("/departments/{department_id}/headcount", response_model=schemas.DepartmentHeadcount)
+def read_department_headcount(
+    department_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: deps.Principal = Depends(deps.get_current_user),
+) -> Any:
+    rows = hierarchy.department_headcount(db, department_id)
+    if not rows:
+        raise HTTPException(status_code=404, detail="Department not found")
+    return {
+        "department_id": department_id,
+        "headcount": sum(count for _, count in rows),
+        "by_department": [{"department_id": d, "headcount": count} for d, count in rows],
+    }
+
+@router.post("/hierarchy/rebuild")
+def rebuild_hierarchy(
+    db: Session = Depends(get_db),
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """Recompute the department and reporting-line closure tables (backfill/repair)."""
+    result = {
+        "department_paths": hierarchy.departments.rebuild(db),
+        "employee_paths": hierarchy.employees.rebuild(db),
+    }
+    db.commit()
+    return result
+
 # --- Job Positions ---
 
 @router.get("/job-positions", response_model=List[schemas.JobPosition])
 def read_job_positions(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_user),
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
+    current_user: deps.Principal = Depends(deps.get_current_user),
 ) -> Any:
-    positions = db.query(models.JobPosition).offset(skip).limit(limit).all()
-    return positions
+    return reference.job_positions.respond(request, response, page, db)
 
 @router.post("/job-positions", response_model=schemas.JobPosition)
 def create_job_position(
     *,
     db: Session = Depends(get_db),
     job_in: schemas.JobPositionCreate,
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_active_superuser),
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser),
 ) -> Any:
     # Check dept exists
     dept = db.query(models.Department).filter(models.Department.department_id == job_in.department_id).first()
@@ -66,6 +120,7 @@ def create_job_position(
     job = models.JobPosition(**job_in.model_dump())
     db.add(job)
     db.commit()
+    reference.job_positions.invalidate()
     db.refresh(job)
     return job
 
@@ -73,23 +128,59 @@ def create_job_position(
 
 @router.get("/roles", response_model=List[schemas.UserRole])
 def read_roles(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
 ):
     # Publicly accessible for signup form population perhaps, or restricted
-    roles = db.query(models.UserRole).offset(skip).limit(limit).all()
-    return roles
+    return reference.roles.respond(request, response, page, db)
 
 @router.post("/roles", response_model=schemas.UserRole)
 def create_role(
     *,
     db: Session = Depends(get_db),
     role_in: schemas.UserRoleCreate,
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_active_superuser),
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser),
 ):
     role = models.UserRole(**role_in.model_dump())
     db.add(role)
     db.commit()
+    reference.roles.invalidate()
     db.refresh(role)
     return role
+
+# --- Caches ---
+
+@router.get("/cache/stats")
+def read_cache_stats(
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser),
+):
+    return (
+        [deps.principal_cache.stats()] + [t.stats() for t in reference.TABLES]
+        + [employee_search.directory.stats(), bus.stats()]
+    )
+
+@router.get("/startup")
+def read_startup_timings(
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser),
+):
+    """Seconds this worker spent in each startup phase, and in total until ready."""
+    return timings.report()
+
+@router.get("/db/pool")
+def read_pool_status(
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser),
+):
+    """Connection pool occupancy and checkout wait times, for sizing DB_POOL_*."""
+    engines = [database.engine]
+    if database.read_engine is not database.engine:
+        engines.append(database.read_engine)
+    return [database.pool_status(e) for e in engines]
+
+@router.get("/db/coalescer")
+def read_coalescer_stats(
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser),
+):
+    """Check-in/out group-commit batch sizes (ATTENDANCE_COALESCE_MS)."""
+    return coalescer.stats()
@@ -0,0 +1,32 @@
+"""
+Async (AsyncSession) versions of the hottest endpoints, served when
+DB_ASYNC is enabled. Each module only ports the latency-critical routes;
+merge_routers() fills in the remaining routes from the sync router.
+"""
+from fastapi import APIRouter
+from fastapi.routing import APIRoute
+
+def _keys(route):
+    if not isinstance(route, APIRoute):
+        return set()
+    return {(route.path, m) for m in route.methods}
+
+def merge_routers(preferred: APIRouter, fallback: APIRouter) -> APIRouter:
+    # Keep the sync router's declaration order (e.g. /export before
+    # /{employee_id}) and swap in the async route wherever one exists.
+    replacements = {}
+    for route in preferred.routes:
+        for key in _keys(route):
+            replacements[key] = route
+    merged = APIRouter()
+    used = set()
+    for route in fallback.routes:
+        keys = _keys(route)
+        swap = next((replacements[k] for k in keys if k in replacements), None)
+        if swap is None:
+            merged.routes.append(route)
+        elif id(swap) not in used:
+            merged.routes.append(swap)
+            used.add(id(swap))
+    merged.routes.extend(r for r in preferred.routes if id(r) not in used)
+    return merged
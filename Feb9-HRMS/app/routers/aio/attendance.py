@@ -0,0 +1,70 @@
+from typing import List, Any, Optional
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models, schemas
+from app.database import get_async_db
+from app.core import deps
+from app.core.pagination import PageParams, paginate_async
+from app.services import attendance as attendance_service
+from app.routers.attendance import attendance_list
+from app.services.punch_coalescer import coalescer
+
+router = APIRouter()
+
+@router.post("/check-in", response_model=schemas.Attendance)
+async def check_in(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: deps.Principal = Depends(deps.get_current_user_async),
+    notes: str = None
+) -> Any:
+    now = datetime.now()
+    if coalescer.enabled:
+        attendance = await coalescer.punch_async("in", current_user.employee_id, now, notes)
+    else:
+        attendance = await db.run_sync(
+            lambda session: attendance_service.check_in(session, current_user.employee_id, now, notes)
+        )
+        await db.commit()
+    if attendance is None:
+        raise HTTPException(status_code=400, detail="Already checked in for today")
+    return attendance
+
+@router.post("/check-out", response_model=schemas.Attendance)
+async def check_out(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: deps.Principal = Depends(deps.get_current_user_async),
+    notes: str = None
+) -> Any:
+    now = datetime.now()
+    if coalescer.enabled:
+        attendance = await coalescer.punch_async("out", current_user.employee_id, now, notes)
+    else:
+        attendance = await db.run_sync(
+            lambda session: attendance_service.check_out(session, current_user.employee_id, now, notes)
+        )
+        await db.commit()
+    if attendance is None:
+        raise HTTPException(status_code=404, detail="No attendance record found for today. Please check in first.")
+    return attendance
+
+@router.get("/history", response_model=List[schemas.Attendance])
+async def read_attendance_history(
+    response: Response,
+    page: PageParams = Depends(),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. attendance_date,status"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: deps.Principal = Depends(deps.get_current_user_async),
+) -> Any:
+    view = attendance_list.project(fields)
+    stmt = select(*view.columns)
+    if current_user.role_name != "Admin":
+        stmt = stmt.where(models.Attendance.employee_id == current_user.employee_id)
+    rows = await paginate_async(
+        db, stmt, page, response,
+        models.Attendance.attendance_date, models.Attendance.attendance_id,
+    )
+    return view.render_rows(rows, response)
@@ -0,0 +1,79 @@
+from datetime import timedelta
+from typing import Any
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models, schemas
+from app.core import security
+from app.database import get_async_db
+
+router = APIRouter()
+
+async def _authenticate(db: AsyncSession, username: str, password: str) -> models.EmployeeSystemAccess:
+    user = (await db.execute(
+        select(models.EmployeeSystemAccess).where(models.EmployeeSystemAccess.username == username)
+    )).scalar_one_or_none()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    verified, new_hash = await security.verify_and_update_password_async(password, user.password_hash)
+    if not verified:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if new_hash:
+        # Cost factor changed since this hash was made; upgrade it transparently
+        user.password_hash = new_hash
+        await db.commit()
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return user
+
+@router.post("/login", response_model=schemas.Token)
+async def login_access_token_json(
+    response: Response,
+    login_data: schemas.Login,
+    db: AsyncSession = Depends(get_async_db),
+) -> Any:
+    """
+    Login using JSON body (Preferred for FastView/API clients)
+    """
+    user = await _authenticate(db, login_data.username, login_data.password)
+
+    access_token_expires = timedelta(minutes=security.settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = security.create_access_token(
+        subject=user.username, expires_delta=access_token_expires
+    )
+
+    # Set cookie for auto-auth in browser/FastView
+    response.set_cookie(
+        key="access_token",
+        value=f"Bearer {access_token}",
+        httponly=True,
+        max_age=security.settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        expires=security.settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    )
+
+    return {"access_token": access_token, "token_type": "bearer"}
+
+@router.post("/token", response_model=schemas.Token)
+async def login_access_token_multipart(
+    db: AsyncSession = Depends(get_async_db),
+    form_data: OAuth2PasswordRequestForm = Depends(),
+) -> Any:
+    """
+    OAuth2 compatible token login, get an access token for future requests
+    """
+    user = await _authenticate(db, form_data.username, form_data.password)
+
+    access_token_expires = timedelta(minutes=security.settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = security.create_access_token(
+        subject=user.username, expires_delta=access_token_expires
+    )
+    return {"access_token": access_token, "token_type": "bearer"}
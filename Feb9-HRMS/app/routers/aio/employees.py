@@ -0,0 +1,65 @@
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models, schemas
+from app.database import get_async_db
+from app.core import deps
+from app.core.pagination import PageParams, paginate_async
+from app.routers.employees import employee_list, search_results
+from app.services import employee_search
+
+router = APIRouter()
+
+@router.get("/", response_model=List[schemas.Employee])
+async def read_employees(
+    response: Response,
+    page: PageParams = Depends(),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. employee_id,first_name,last_name"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: deps.Principal = Depends(deps.get_current_user_async),
+) -> Any:
+    """
+    Retrieve employees.
+    """
+    view = employee_list.project(fields)
+    rows = await paginate_async(db, select(*view.columns), page, response, models.Employee.employee_id)
+    return view.render_rows(rows, response)
+
+@router.get("/search", response_model=List[schemas.EmployeeSearchResult])
+async def search_employees(
+    response: Response,
+    q: str = Query(..., min_length=2, max_length=100),
+    department_id: Optional[int] = None,
+    status: Optional[models.EmploymentStatus] = None,
+    manager_id: Optional[int] = None,
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: deps.Principal = Depends(deps.get_current_user_async),
+) -> Any:
+    """
+    Typeahead over name, email and employee code (prefix and fuzzy), best
+    match first.
+    """
+    rows = await db.run_sync(lambda session: employee_search.search(
+        session, search_results.query(session), q, limit,
+        department_id=department_id, status=status, manager_id=manager_id,
+    ))
+    return search_results.render_rows(rows, response)
+
+@router.get("/{employee_id}", response_model=schemas.Employee)
+async def read_employee(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    employee_id: int,
+    current_user: deps.Principal = Depends(deps.get_current_user_async),
+) -> Any:
+    """
+    Get employee by ID.
+    """
+    employee = await db.get(models.Employee, employee_id)
+    if not employee:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    if current_user.role_name != "Admin" and current_user.employee_id != employee_id:
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    return employee
@@ -0,0 +1,83 @@
+from typing import List, Any, Optional
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models, schemas
+from app.database import get_async_db
+from app.core import deps
+from app.core.pagination import PageParams, paginate_async
+from app.routers.leave import leave_application_list
+from app.services import leave as leave_service
+
+router = APIRouter()
+
+@router.post("/apply", response_model=schemas.LeaveApplication)
+async def apply_leave(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    leave_in: schemas.LeaveApplicationCreate,
+    current_user: deps.Principal = Depends(deps.get_current_user_async),
+) -> Any:
+    if current_user.role_name != "Admin" and leave_in.employee_id != current_user.employee_id:
+         raise HTTPException(status_code=400, detail="Cannot apply leave for another employee")
+
+    days = (leave_in.end_date - leave_in.start_date).days + 1
+    if days <= 0:
+        raise HTTPException(status_code=400, detail="End date must be after start date")
+
+    application = models.LeaveApplication(
+        **leave_in.model_dump(),
+        total_days=days,
+        status="Pending"
+    )
+    db.add(application)
+    await db.commit()
+    await db.refresh(application)
+    return application
+
+@router.get("/pending", response_model=List[schemas.LeaveApplication])
+async def get_pending_leaves(
+    response: Response,
+    page: PageParams = Depends(),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. leave_id,employee_id,start_date,end_date"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser_async),
+) -> Any:
+    view = leave_application_list.project(fields)
+    rows = await paginate_async(
+        db,
+        select(*view.columns).where(models.LeaveApplication.status == "Pending"),
+        page, response, models.LeaveApplication.leave_id,
+    )
+    return view.render_rows(rows, response)
+
+@router.put("/{leave_id}/status", response_model=schemas.LeaveApplication)
+async def update_leave_status(
+    leave_id: int,
+    status: str, # Approved, Rejected
+    db: AsyncSession = Depends(get_async_db),
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser_async),
+) -> Any:
+    try:
+        new_status = models.LeaveApplicationStatus(status)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid leave status")
+
+    leave = (await db.execute(
+        select(models.LeaveApplication)
+        .where(models.LeaveApplication.leave_id == leave_id)
+        .with_for_update()
+    )).scalar_one_or_none()
+    if not leave:
+        raise HTTPException(status_code=404, detail="Leave application not found")
+
+    # The ledger service is sync; run it on the session's greenlet bridge
+    await db.run_sync(lambda session: leave_service.transition(session, leave, new_status, current_user.employee_id))
+
+    leave.status = new_status
+    leave.approved_by = current_user.employee_id
+    leave.approved_on = datetime.now()
+    await db.commit()
+    await db.refresh(leave)
+    return leave
@@ -1,20 +1,21 @@
 from typing import List, Any
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
 from app import models, schemas
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.core import deps
+from app.core.pagination import PageParams, paginate
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.CompanyAsset])
 def read_assets(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_user),
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
+    current_user: deps.Principal = Depends(deps.get_current_user),
 ) -> Any:
-    assets = db.query(models.CompanyAsset).offset(skip).limit(limit).all()
+    assets = paginate(db.query(models.CompanyAsset), page, response, models.CompanyAsset.asset_id)
     return assets
 
 @router.post("/", response_model=schemas.CompanyAsset)
@@ -22,7 +23,7 @@ def create_asset(
     *,
     db: Session = Depends(get_db),
     asset_in: schemas.CompanyAssetCreate,
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_active_superuser),
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser),
 ) -> Any:
     asset = models.CompanyAsset(**asset_in.model_dump())
     db.add(asset)
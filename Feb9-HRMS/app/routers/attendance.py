@@ -1,99 +1,213 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from datetime import date
+from datetime import date, datetime
 from app import models, schemas
-from app.database import get_db
+from app.database import ReadSessionLocal, get_db, get_read_db
 from app.core import deps
+from app.core.export import stream_export
+from app.core.pagination import PageParams, paginate
+from app.core.serialization import ListSerializer, dumps
+from app.services import attendance as attendance_service
+from app.services import attendance_partitions
+from app.services.punch_coalescer import coalescer
 
 router = APIRouter()
 
+# The history is paged by date, then id: both are needed for the cursor
+attendance_list = ListSerializer(schemas.Attendance, models.Attendance, key_fields=("attendance_id", "attendance_date"))
+
 @router.post("/check-in", response_model=schemas.Attendance)
 def check_in(
     *,
     db: Session = Depends(get_db),
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_user),
+    current_user: deps.Principal = Depends(deps.get_current_user),
     notes: str = None
 ) -> Any:
-    # Check if already checked in today
-    today = date.today()
-    existing = db.query(models.Attendance).filter(
-        models.Attendance.employee_id == current_user.employee_id,
-        models.Attendance.attendance_date == today
-    ).first()
-    
-    if existing:
-         raise HTTPException(status_code=400, detail="Already checked in for today")
-    
-    # Needs a time object. In a real app, this comes from the request or server time.
-    # Using server time via SQL default or python datetime.now().time()
-    from datetime import datetime
+    # One INSERT ... ON CONFLICT DO NOTHING RETURNING; no row back means
+    # the (employee_id, attendance_date) row already exists
     now = datetime.now()
-    
-    attendance = models.Attendance(
-        employee_id=current_user.employee_id,
-        attendance_date=today,
-        check_in=now.time(),
-        status="Present",
-        notes=notes
-    )
-    db.add(attendance)
-    db.commit()
-    db.refresh(attendance)
+    if coalescer.enabled:
+        attendance = coalescer.punch("in", current_user.employee_id, now, notes)
+    else:
+        attendance = attendance_service.check_in(db, current_user.employee_id, now, notes)
+        db.commit()
+    if attendance is None:
+        raise HTTPException(status_code=400, detail="Already checked in for today")
     return attendance
 
 @router.post("/check-out", response_model=schemas.Attendance)
 def check_out(
     *,
     db: Session = Depends(get_db),
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_user),
+    current_user: deps.Principal = Depends(deps.get_current_user),
     notes: str = None
 ) -> Any:
-    today = date.today()
-    attendance = db.query(models.Attendance).filter(
-        models.Attendance.employee_id == current_user.employee_id,
-        models.Attendance.attendance_date == today
-    ).first()
-    
-    if not attendance:
-        raise HTTPException(status_code=404, detail="No attendance record found for today. Please check in first.")
-    
-    from datetime import datetime
+    # One UPDATE ... RETURNING; work hours are computed in the statement
     now = datetime.now()
-    attendance.check_out = now.time()
-    
-    # Calculate work hours (simplified)
-    # in real world, handle cross-day shifts
-    dummy_date = date(2000, 1, 1)
-    start = datetime.combine(dummy_date, attendance.check_in)
-    end = datetime.combine(dummy_date, attendance.check_out)
-    duration = (end - start).total_seconds() / 3600
-    
-    attendance.work_hours = round(duration, 2)
-    if notes:
-        attendance.notes = (attendance.notes or "") + " | Checkout: " + notes
-        
-    db.add(attendance)
-    db.commit()
-    db.refresh(attendance)
+    if coalescer.enabled:
+        attendance = coalescer.punch("out", current_user.employee_id, now, notes)
+    else:
+        attendance = attendance_service.check_out(db, current_user.employee_id, now, notes)
+        db.commit()
+    if attendance is None:
+        raise HTTPException(status_code=404, detail="No attendance record found for today. Please check in first.")
     return attendance
 
 @router.get("/history", response_model=List[schemas.Attendance])
 def read_attendance_history(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_user),
+    response: Response,
+    page: PageParams = Depends(),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. attendance_date,status"),
+    db: Session = Depends(get_read_db),
+    current_user: deps.Principal = Depends(deps.get_current_user),
 ) -> Any:
     # Employees verify their own, Admin verifies all?
     # Logic: If admin, can see all (maybe with filter). If employee, only own.
     # For now, simplistic: return all for admin, own for employee.
     
-    if current_user.role.role_name == "Admin":
-        attendance = db.query(models.Attendance).offset(skip).limit(limit).all()
-    else:
-        attendance = db.query(models.Attendance).filter(
-            models.Attendance.employee_id == current_user.employee_id
-        ).offset(skip).limit(limit).all()
-        
-    return attendance
+    view = attendance_list.project(fields)
+    query = view.query(db)
+    if current_user.role_name != "Admin":
+        query = query.filter(models.Attendance.employee_id == current_user.employee_id)
+    rows = paginate(
+        query, page, response,
+        models.Attendance.attendance_date, models.Attendance.attendance_id,
+    )
+    return view.render_rows(rows, response)
+
+@router.get("/export")
+def export_attendance(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    employee_id: Optional[int] = None,
+    format: str = "ndjson",
+    current_user: deps.Principal = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Stream attendance rows in a date range as NDJSON or CSV.
+    Admins can export everyone (or one employee); others only their own.
+    """
+    if current_user.role_name != "Admin":
+        employee_id = current_user.employee_id
+
+    stmt = select(*models.Attendance.__table__.columns)
+    if employee_id is not None:
+        stmt = stmt.where(models.Attendance.employee_id == employee_id)
+    if date_from:
+        stmt = stmt.where(models.Attendance.attendance_date >= date_from)
+    if date_to:
+        stmt = stmt.where(models.Attendance.attendance_date <= date_to)
+    stmt = stmt.order_by(models.Attendance.attendance_date, models.Attendance.attendance_id)
+    return stream_export(ReadSessionLocal, stmt, format, "attendance")
+
+@router.get("/archive")
+def export_archived_attendance(
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    employee_id: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+    current_user: deps.Principal = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Attendance for months the retention policy has moved out of the database,
+    read back from the archive files and streamed as NDJSON. Much slower than
+    /history or /export: every archived month in range is decompressed.
+    """
+    if current_user.role_name != "Admin":
+        employee_id = current_user.employee_id
+    archives = attendance_partitions.archives_between(db, date_from, date_to)
+    rows = attendance_partitions.iter_archived(archives, date_from, date_to, employee_id)
+    return StreamingResponse(
+        (dumps(row) + b"\n" for row in rows),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="attendance-archive.ndjson"'},
+    )
+
+@router.post("/bulk", response_model=schemas.AttendanceBulkResult)
+def ingest_attendance_punches(
+    *,
+    db: Session = Depends(get_db),
+    batch_in: schemas.AttendancePunchBatch,
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Bulk ingestion for badge readers / biometric devices. (Admin only)
+    Accepts buffered (employee_id, timestamp, direction) punches and returns
+    an outcome per punch. Safe to replay after network outages.
+    """
+    return attendance_service.ingest_punches(db, batch_in)
+
+# --- Monthly summaries (read from the attendance_monthly_summary rollup) ---
+
+@router.get("/summary", response_model=List[schemas.AttendanceMonthlySummary])
+def read_monthly_summaries(
+    year: int,
+    month: int,
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
+    current_user: deps.Principal = Depends(deps.get_current_user),
+) -> Any:
+    """
+    One row per employee for the month. Admins see everyone; others only themselves.
+    """
+    query = db.query(models.AttendanceMonthlySummary).filter(
+        models.AttendanceMonthlySummary.year == year,
+        models.AttendanceMonthlySummary.month == month,
+    )
+    if current_user.role_name != "Admin":
+        query = query.filter(models.AttendanceMonthlySummary.employee_id == current_user.employee_id)
+    return paginate(query, page, response, models.AttendanceMonthlySummary.employee_id)
+
+@router.post("/summary/rebuild", response_model=schemas.AttendanceSummaryRebuildResult)
+def rebuild_monthly_summaries(
+    year: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """Recompute the monthly rollup from raw attendance (backfill/repair). (Admin only)"""
+    summaries = attendance_service.rebuild_monthly_summary(db, year)
+    db.commit()
+    return {"summaries": summaries}
+
+@router.get("/summary/department/{department_id}", response_model=schemas.DepartmentAttendanceSummary)
+def read_department_monthly_summary(
+    department_id: int,
+    year: int,
+    month: int,
+    db: Session = Depends(get_read_db),
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """Month totals for a department including its sub-departments. (Admin only)"""
+    employees, present, absent, on_leave, hours, overtime = attendance_service.department_monthly_summary(
+        db, department_id, year, month
+    )
+    return {
+        "department_id": department_id,
+        "year": year,
+        "month": month,
+        "employees": employees,
+        "days_present": present,
+        "days_absent": absent,
+        "days_on_leave": on_leave,
+        "total_work_hours": hours,
+        "total_overtime_hours": overtime,
+    }
+
+@router.get("/summary/{employee_id}", response_model=List[schemas.AttendanceMonthlySummary])
+def read_employee_monthly_summaries(
+    employee_id: int,
+    year: int,
+    db: Session = Depends(get_read_db),
+    current_user: deps.Principal = Depends(deps.get_current_user),
+) -> Any:
+    """Month-by-month totals for one employee over a year."""
+    if current_user.role_name != "Admin" and current_user.employee_id != employee_id:
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    return db.query(models.AttendanceMonthlySummary).filter(
+        models.AttendanceMonthlySummary.employee_id == employee_id,
+        models.AttendanceMonthlySummary.year == year,
+    ).order_by(models.AttendanceMonthlySummary.month).all()
@@ -22,12 +22,23 @@ def login_access_token_json(
     Login using JSON body (Preferred for FastView/API clients)
     """
     user = db.query(models.EmployeeSystemAccess).filter(models.EmployeeSystemAccess.username == login_data.username).first()
-    if not user or not security.verify_password(login_data.password, user.password_hash):
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    verified, new_hash = security.verify_and_update_password(login_data.password, user.password_hash)
+    if not verified:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if new_hash:
+        # Cost factor changed since this hash was made; upgrade it transparently
+        user.password_hash = new_hash
+        db.commit()
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     
@@ -56,12 +67,23 @@ def login_access_token_multipart(
     OAuth2 compatible token login, get an access token for future requests
     """
     user = db.query(models.EmployeeSystemAccess).filter(models.EmployeeSystemAccess.username == form_data.username).first()
-    if not user or not security.verify_password(form_data.password, user.password_hash):
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    verified, new_hash = security.verify_and_update_password(form_data.password, user.password_hash)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # Cost factor changed since this hash was made; upgrade it transparently
+        user.password_hash = new_hash
+        db.commit()
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     
@@ -106,14 +128,13 @@ def signup(
     if not pos:
         raise HTTPException(status_code=404, detail="Job Position not found")
 
-    # Create Employee
+    # Hash first: a busy hashing pool answers 503 before anything is written
+    hashed_password = security.get_password_hash(user_in.password)
+
+    # Employee and System Access go in one transaction, so a failure leaves neither
     db_employee = models.Employee(**employee_in.model_dump())
     db.add(db_employee)
-    db.commit()
-    db.refresh(db_employee)
-
-    # Create System Access
-    hashed_password = security.get_password_hash(user_in.password)
+    db.flush()
     db_user = models.EmployeeSystemAccess(
         employee_id=db_employee.employee_id,
         role_id=user_in.role_id,
@@ -123,5 +144,6 @@ def signup(
     )
     db.add(db_user)
     db.commit()
-    
+    db.refresh(db_employee)
+
     return db_employee
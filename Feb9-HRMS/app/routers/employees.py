@@ -1,31 +1,73 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app import models, schemas
-from app.database import get_db
+from app.database import ReadSessionLocal, get_db, get_read_db
 from app.core import deps
+from app.core.export import stream_export
+from app.core.pagination import PageParams, paginate
+from app.core.serialization import ListSerializer
+from app.services import employee_search, hierarchy
 
 router = APIRouter()
 
+employee_list = ListSerializer(schemas.Employee, models.Employee)
+search_results = ListSerializer(schemas.EmployeeSearchResult, models.Employee)
+
 @router.get("/", response_model=List[schemas.Employee])
 def read_employees(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_user),
+    response: Response,
+    page: PageParams = Depends(),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. employee_id,first_name,last_name"),
+    db: Session = Depends(get_read_db),
+    current_user: deps.Principal = Depends(deps.get_current_user),
 ) -> Any:
     """
     Retrieve employees.
     """
-    employees = db.query(models.Employee).offset(skip).limit(limit).all()
-    return employees
+    view = employee_list.project(fields)
+    rows = paginate(view.query(db), page, response, models.Employee.employee_id)
+    return view.render_rows(rows, response)
+
+@router.get("/search", response_model=List[schemas.EmployeeSearchResult])
+def search_employees(
+    response: Response,
+    q: str = Query(..., min_length=2, max_length=100),
+    department_id: Optional[int] = None,
+    status: Optional[models.EmploymentStatus] = None,
+    manager_id: Optional[int] = None,
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_read_db),
+    current_user: deps.Principal = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Typeahead over name, email and employee code (prefix and fuzzy), best
+    match first.
+    """
+    rows = employee_search.search(
+        db, search_results.query(db), q, limit,
+        department_id=department_id, status=status, manager_id=manager_id,
+    )
+    return search_results.render_rows(rows, response)
+
+@router.get("/export")
+def export_employees(
+    format: str = "ndjson",
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Stream all employees as NDJSON or CSV. (Admin only)
+    """
+    stmt = select(*models.Employee.__table__.columns).order_by(models.Employee.employee_id)
+    return stream_export(ReadSessionLocal, stmt, format, "employees")
 
 @router.post("/", response_model=schemas.Employee)
 def create_employee(
     *,
     db: Session = Depends(get_db),
     employee_in: schemas.EmployeeCreate,
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_active_superuser),
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser),
 ) -> Any:
     """
     Create new employee. (Admin only)
@@ -46,9 +88,9 @@ def create_employee(
 @router.get("/{employee_id}", response_model=schemas.Employee)
 def read_employee(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     employee_id: int,
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_user),
+    current_user: deps.Principal = Depends(deps.get_current_user),
 ) -> Any:
     """
     Get employee by ID.
@@ -57,7 +99,7 @@ def read_employee(
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     # Add permission check here: Admins or the employee themselves
-    if current_user.role.role_name != "Admin" and current_user.employee_id != employee_id:
+    if current_user.role_name != "Admin" and current_user.employee_id != employee_id:
         raise HTTPException(status_code=400, detail="Not enough permissions")
     return employee
 
@@ -67,7 +109,7 @@ def update_employee(
     db: Session = Depends(get_db),
     employee_id: int,
     employee_in: schemas.EmployeeUpdate,
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_active_superuser),
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser),
 ) -> Any:
     """
     Update an employee. (Admin only)
@@ -77,6 +119,9 @@ def update_employee(
         raise HTTPException(status_code=404, detail="Employee not found")
     
     update_data = employee_in.model_dump(exclude_unset=True)
+    new_manager = update_data.get("manager_id")
+    if new_manager is not None and hierarchy.employees.is_in_subtree(db, employee_id, new_manager):
+        raise HTTPException(status_code=400, detail="Manager cannot be the employee or one of their reports")
     for field, value in update_data.items():
         setattr(employee, field, value)
     
@@ -84,3 +129,54 @@ def update_employee(
     db.commit()
     db.refresh(employee)
     return employee
+
+@router.get("/{employee_id}/reports", response_model=List[schemas.Employee])
+def read_employee_reports(
+    *,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    employee_id: int,
+    direct_only: bool = False,
+    page: PageParams = Depends(),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. employee_id,first_name,last_name"),
+    current_user: deps.Principal = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Everyone reporting to this employee, directly or indirectly, nearest
+    levels first.
+    """
+    if current_user.role_name != "Admin" and current_user.employee_id != employee_id:
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    query = hierarchy.employees.subtree_query(db, models.Employee, employee_id)
+    if direct_only:
+        query = query.filter(models.EmployeeClosure.depth == 1)
+    view = employee_list.project(fields)
+    # depth rides along after the schema's columns for the cursor; render_rows ignores it
+    rows = paginate(
+        query.with_entities(*view.columns, models.EmployeeClosure.depth).order_by(None),
+        page, response, models.EmployeeClosure.depth, models.Employee.employee_id,
+    )
+    return view.render_rows(rows, response)
+
+@router.get("/{employee_id}/chain", response_model=List[schemas.Employee])
+def read_management_chain(
+    *,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    employee_id: int,
+    page: PageParams = Depends(),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. employee_id,first_name,last_name"),
+    current_user: deps.Principal = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Management chain from the direct manager up to the top.
+    """
+    if current_user.role_name != "Admin" and current_user.employee_id != employee_id:
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    view = employee_list.project(fields)
+    query = hierarchy.employees.ancestors_query(db, models.Employee, employee_id)
+    rows = paginate(
+        query.with_entities(*view.columns, models.EmployeeClosure.depth).order_by(None),
+        page, response, models.EmployeeClosure.depth, models.Employee.employee_id,
+    )
+    return view.render_rows(rows, response)
@@ -1,33 +1,40 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
 from app import models, schemas
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.core import deps
+from app.core.pagination import PageParams, paginate
+from app.core.serialization import ListSerializer
+from app.services import leave as leave_service
+from app.services import reference
 
 router = APIRouter()
 
+leave_application_list = ListSerializer(schemas.LeaveApplication, models.LeaveApplication)
+
 # --- Leave Types ---
 @router.get("/types", response_model=List[schemas.LeaveType])
 def read_leave_types(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_user),
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
+    current_user: deps.Principal = Depends(deps.get_current_user),
 ) -> Any:
-    types = db.query(models.LeaveType).offset(skip).limit(limit).all()
-    return types
+    return reference.leave_types.respond(request, response, page, db)
 
 @router.post("/types", response_model=schemas.LeaveType)
 def create_leave_type(
     *,
     db: Session = Depends(get_db),
     type_in: schemas.LeaveTypeBase,
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_active_superuser),
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser),
 ) -> Any:
     leave_type = models.LeaveType(**type_in.model_dump())
     db.add(leave_type)
     db.commit()
+    reference.leave_types.invalidate()
     db.refresh(leave_type)
     return leave_type
 
@@ -37,10 +44,10 @@ def apply_leave(
     *,
     db: Session = Depends(get_db),
     leave_in: schemas.LeaveApplicationCreate,
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_user),
+    current_user: deps.Principal = Depends(deps.get_current_user),
 ) -> Any:
     # Verify employee ID matches current user unless admin/manager
-    if current_user.role.role_name != "Admin" and leave_in.employee_id != current_user.employee_id:
+    if current_user.role_name != "Admin" and leave_in.employee_id != current_user.employee_id:
          raise HTTPException(status_code=400, detail="Cannot apply leave for another employee")
 
     # Simple days calculation (inclusive)
@@ -60,36 +67,78 @@ def apply_leave(
 
 @router.get("/pending", response_model=List[schemas.LeaveApplication])
 def get_pending_leaves(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_active_superuser), # Managers only
+    response: Response,
+    page: PageParams = Depends(),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. leave_id,employee_id,start_date,end_date"),
+    db: Session = Depends(get_read_db),
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser), # Managers only
 ) -> Any:
-    leaves = db.query(models.LeaveApplication).filter(models.LeaveApplication.status == "Pending").offset(skip).limit(limit).all()
-    return leaves
+    view = leave_application_list.project(fields)
+    rows = paginate(
+        view.query(db).filter(models.LeaveApplication.status == "Pending"),
+        page, response, models.LeaveApplication.leave_id,
+    )
+    return view.render_rows(rows, response)
 
 @router.put("/{leave_id}/status", response_model=schemas.LeaveApplication)
 def update_leave_status(
     leave_id: int,
     status: str, # Approved, Rejected
     db: Session = Depends(get_db),
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_active_superuser),
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser),
 ) -> Any:
-    leave = db.query(models.LeaveApplication).filter(models.LeaveApplication.leave_id == leave_id).first()
+    try:
+        new_status = models.LeaveApplicationStatus(status)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid leave status")
+
+    # Lock the application so concurrent decisions on it are serialized
+    leave = db.query(models.LeaveApplication).filter(
+        models.LeaveApplication.leave_id == leave_id
+    ).with_for_update().first()
     if not leave:
         raise HTTPException(status_code=404, detail="Leave application not found")
-    
-    leave.status = status
+
+    # Approvals debit and reversals credit the balance in this same transaction
+    leave_service.transition(db, leave, new_status, current_user.employee_id)
+
+    leave.status = new_status
     leave.approved_by = current_user.employee_id
     from datetime import datetime
     leave.approved_on = datetime.now()
-    
-    # If approved, deduct balance (logic omitted for brevity, but should be here)
-    if status == "Approved":
-        # Check balance, deduct...
-        pass
-        
+
     db.add(leave)
     db.commit()
     db.refresh(leave)
     return leave
+
+# --- Leave Balances ---
+@router.get("/balances/{employee_id}", response_model=List[schemas.LeaveBalance])
+def read_leave_balances(
+    employee_id: int,
+    year: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+    current_user: deps.Principal = Depends(deps.get_current_user),
+) -> Any:
+    if current_user.role_name != "Admin" and current_user.employee_id != employee_id:
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    from datetime import date
+    balances = db.query(models.EmployeeLeaveBalance).filter(
+        models.EmployeeLeaveBalance.employee_id == employee_id,
+        models.EmployeeLeaveBalance.year == (year or date.today().year),
+    ).all()
+    return balances
+
+@router.post("/rollover", response_model=schemas.LeaveRolloverResult)
+def rollover_leave_balances(
+    year: int,
+    db: Session = Depends(get_db),
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Year-end job: open `year + 1` balances for all employees, carrying
+    forward unused days where the leave type allows it.
+    """
+    result = leave_service.rollover(db, year, current_user.employee_id)
+    db.commit()
+    return result
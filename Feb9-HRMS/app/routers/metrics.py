@@ -0,0 +1,112 @@
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Response
+from app import database
+from app.core import deps, metrics, security
+from app.core.config import settings
+from app.core.invalidation import bus
+from app.services import employee_codes, employee_search, reference
+from app.services.punch_coalescer import coalescer
+
+router = APIRouter()
+
+def _engines():
+    engines = [("primary", database.engine)]
+    if database.read_engine is not database.engine:
+        engines.append(("replica", database.read_engine))
+    return engines
+
+@metrics.registry.collector
+def collect_db_pool():
+    occupancy = {attr: [] for attr in ("size", "checkedout", "checkedin", "overflow")}
+    checkouts, timeouts, waited = [], [], []
+    for name, engine in _engines():
+        labels = (("engine", name),)
+        status = database.pool_status(engine)
+        for attr, samples in occupancy.items():
+            if attr in status:
+                samples.append((labels, status[attr]))
+        if "checkouts" in status:
+            checkouts.append((labels, status["checkouts"]))
+            timeouts.append((labels, status["timeouts"]))
+            waited.append((labels, status["wait_seconds_total"]))
+    return [
+        ("hrms_db_pool_size", "gauge", "Connections the pool keeps open.", occupancy["size"]),
+        ("hrms_db_pool_checked_out", "gauge", "Connections currently in use.", occupancy["checkedout"]),
+        ("hrms_db_pool_checked_in", "gauge", "Idle connections in the pool.", occupancy["checkedin"]),
+        ("hrms_db_pool_overflow", "gauge", "Connections open beyond the pool size (negative: unopened slots).", occupancy["overflow"]),
+        ("hrms_db_pool_checkouts_total", "counter", "Connections handed out by the pool.", checkouts),
+        ("hrms_db_pool_checkout_timeouts_total", "counter", "Checkouts that gave up after DB_POOL_TIMEOUT.", timeouts),
+        ("hrms_db_pool_checkout_wait_seconds_total", "counter", "Time spent waiting for a pooled connection.", waited),
+    ]
+
+@metrics.registry.collector
+def collect_hash_pool():
+    pool = security.hash_pool
+    return [
+        ("hrms_password_hash_in_flight", "gauge", "Password hashes running or queued.", [((), pool.in_flight)]),
+        ("hrms_password_hash_rejected_total", "counter", "Logins turned away with a 503 because the bcrypt queue was full.", [((), pool.rejected)]),
+        ("hrms_bulk_password_hash_rejected_total", "counter", "Bulk imports turned away with a 503 because another was hashing.", [((), security.bulk_hash_pool.rejected)]),
+    ]
+
+@metrics.registry.collector
+def collect_caches():
+    caches = [deps.principal_cache.stats()] + [
+        # A reference table reload is its cache miss
+        {**s, "misses": s["loads"]} for s in (t.stats() for t in reference.TABLES)
+    ]
+    families = [
+        ("hrms_cache_hits_total", "counter", "In-process cache lookups served from memory.", "hits"),
+        ("hrms_cache_misses_total", "counter", "In-process cache lookups that went to the database.", "misses"),
+        ("hrms_cache_entries", "gauge", "Entries (rows, for reference tables) held in the cache.", "size"),
+    ]
+    result = [
+        (name, kind, documentation, [((("cache", s["name"]),), s[key]) for s in caches])
+        for name, kind, documentation, key in families
+    ]
+    ratios = [
+        ((("cache", s["name"]),), s["hits"] / (s["hits"] + s["misses"]))
+        for s in caches if s["hits"] + s["misses"]
+    ]
+    result.append(("hrms_cache_hit_ratio", "gauge", "Hits over lookups since the worker started.", ratios))
+    result.append((
+        "hrms_cache_evictions_total", "counter", "Entries pushed out by the size limit.",
+        [((("cache", deps.principal_cache.name),), deps.principal_cache.evictions)],
+    ))
+    return result
+
+@metrics.registry.collector
+def collect_services():
+    families = [
+        ("hrms_invalidation_published_total", "counter", "Cache invalidations published by this worker.", [((), bus.published)]),
+        ("hrms_invalidation_received_total", "counter", "Cache invalidations received from any worker.", [((), bus.received)]),
+        ("hrms_invalidation_resets_total", "counter", "Times every cache was dropped after a missed invalidation.", [((), bus.resets)]),
+    ]
+    stats = coalescer.stats()
+    families += [
+        ("hrms_punch_queue_depth", "gauge", "Check-ins/outs waiting for the next group commit.", [((), stats["queued"])]),
+        ("hrms_punch_batches_total", "counter", "Group commits of check-ins/outs.", [((), stats["batches"])]),
+        ("hrms_punch_batched_total", "counter", "Check-ins/outs written by group commits.", [((), stats["punches"])]),
+        ("hrms_punch_fallbacks_total", "counter", "Check-ins/outs written one by one after a failed batch.", [((), stats["fallbacks"])]),
+    ]
+    stats = employee_codes.allocator.stats()
+    families += [
+        ("hrms_employee_codes_issued_total", "counter", "Employee codes handed out by this worker.", [((), stats["issued"])]),
+        ("hrms_employee_code_blocks_total", "counter", "Blocks of employee codes reserved from the sequence.", [((), stats["blocks_reserved"])]),
+        ("hrms_employee_codes_available", "gauge", "Reserved employee codes not yet used.", [((), stats["available"])]),
+    ]
+    stats = employee_search.directory.stats()
+    if "searches" in stats:
+        # The in-process prefix index; the trigram backend keeps no counters
+        families += [
+            ("hrms_employee_search_total", "counter", "Typeahead searches served by the in-process index.", [((), stats["searches"])]),
+            ("hrms_employee_search_indexed", "gauge", "Employees held in the in-process search index.", [((), stats["employees"])]),
+            ("hrms_employee_search_dirty", "gauge", "Employees changed since the index last refreshed.", [((), stats["dirty"])]),
+        ]
+    return families
+
+@router.get("/metrics", include_in_schema=False)
+def read_metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus scrape endpoint; protected by METRICS_TOKEN when it is set."""
+    if not metrics.authorized(authorization, settings.METRICS_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid metrics token", headers={"WWW-Authenticate": "Bearer"})
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
@@ -1,9 +1,11 @@
 from typing import List, Any
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app import models, schemas
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.core import deps
+from app.services import payroll as payroll_service
 
 router = APIRouter()
 
@@ -13,7 +15,7 @@ def create_salary_structure(
     *,
     db: Session = Depends(get_db),
     structure_in: schemas.SalaryStructureCreate,
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_active_superuser),
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser),
 ) -> Any:
     # Check if active structure exists and update end_date?
     # Simplified: just create new
@@ -26,8 +28,8 @@ def create_salary_structure(
 @router.get("/salary-structure/{employee_id}", response_model=List[schemas.SalaryStructure])
 def read_salary_structure(
     employee_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_active_superuser), 
+    db: Session = Depends(get_read_db),
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser), 
 ) -> Any:
     structures = db.query(models.SalaryStructure).filter(models.SalaryStructure.employee_id == employee_id).all()
     return structures
@@ -38,10 +40,36 @@ def process_payroll(
     *,
     db: Session = Depends(get_db),
     payroll_in: schemas.PayrollCreate, # In real app, might just take period and employee_id, and calc rest
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_active_superuser),
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser),
 ) -> Any:
     payroll = models.Payroll(**payroll_in.model_dump())
     db.add(payroll)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Payroll already exists for this employee and pay period")
     db.refresh(payroll)
     return payroll
+
+@router.post("/run", response_model=schemas.PayrollRunResult)
+def run_payroll(
+    *,
+    db: Session = Depends(get_db),
+    run_in: schemas.PayrollRunRequest,
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Compute and store payroll for all active employees in a pay period.
+    Re-running the same period resumes: already processed employees are skipped.
+    """
+    if run_in.pay_period_end < run_in.pay_period_start:
+        raise HTTPException(status_code=400, detail="Pay period end must be after start")
+    return payroll_service.run_payroll(
+        db,
+        run_in.pay_period_start,
+        run_in.pay_period_end,
+        department_ids=run_in.department_ids,
+        workers=run_in.workers,
+        processed_by=current_user.employee_id,
+    )
@@ -1,28 +1,56 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from app import models, schemas
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.core import deps
+from app.core.pagination import PageParams, paginate
+from app.services import search
 
 router = APIRouter()
 
 @router.get("/postings", response_model=List[schemas.JobPosting])
 def read_job_postings(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
 ) -> Any:
     # Public endpoint?
-    postings = db.query(models.JobPosting).filter(models.JobPosting.status == "Open").offset(skip).limit(limit).all()
+    postings = paginate(
+        db.query(models.JobPosting).filter(models.JobPosting.status == "Open"),
+        page, response, models.JobPosting.posting_id,
+    )
     return postings
 
+@router.get("/postings/search", response_model=List[schemas.JobPostingSearchHit])
+def search_job_postings(
+    q: str = Query(..., min_length=1, max_length=200),
+    department_id: Optional[int] = None,
+    experience_min: Optional[int] = Query(None, ge=0),
+    experience_max: Optional[int] = Query(None, ge=0),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+) -> Any:
+    # Public endpoint: open postings only, best match first
+    filters = [models.JobPosting.status == "Open"]
+    if department_id is not None:
+        filters.append(models.JobPosting.department_id == department_id)
+    # Postings whose experience range overlaps the requested one
+    if experience_min is not None:
+        filters.append(or_(models.JobPosting.max_experience.is_(None), models.JobPosting.max_experience >= experience_min))
+    if experience_max is not None:
+        filters.append(or_(models.JobPosting.min_experience.is_(None), models.JobPosting.min_experience <= experience_max))
+    hits = search.postings.search(db, q, filters, skip=skip, limit=limit)
+    return [{"posting": posting, "rank": rank, "highlights": highlights} for posting, rank, highlights in hits]
+
 @router.post("/postings", response_model=schemas.JobPosting)
 def create_job_posting(
     *,
     db: Session = Depends(get_db),
     posting_in: schemas.JobPostingCreate,
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_active_superuser),
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser),
 ) -> Any:
     posting = models.JobPosting(**posting_in.model_dump())
     db.add(posting)
@@ -42,3 +70,27 @@ def apply_for_job(
     db.commit()
     db.refresh(application)
     return application
+
+@router.get("/applications/search", response_model=List[schemas.JobApplicationSearchHit])
+def search_job_applications(
+    q: str = Query(..., min_length=1, max_length=200),
+    posting_id: Optional[int] = None,
+    status: Optional[models.ApplicationStatus] = None,
+    experience_min: Optional[int] = Query(None, ge=0),
+    experience_max: Optional[int] = Query(None, ge=0),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser),
+) -> Any:
+    filters = []
+    if posting_id is not None:
+        filters.append(models.JobApplication.posting_id == posting_id)
+    if status is not None:
+        filters.append(models.JobApplication.status == status)
+    if experience_min is not None:
+        filters.append(models.JobApplication.total_experience >= experience_min)
+    if experience_max is not None:
+        filters.append(models.JobApplication.total_experience <= experience_max)
+    hits = search.applications.search(db, q, filters, skip=skip, limit=limit)
+    return [{"application": application, "rank": rank, "highlights": highlights} for application, rank, highlights in hits]
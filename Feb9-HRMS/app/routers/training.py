@@ -1,20 +1,21 @@
 from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from app import models, schemas
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.core import deps
+from app.core.pagination import PageParams, paginate
 
 router = APIRouter()
 
 @router.get("/programs", response_model=List[schemas.TrainingProgram])
 def read_programs(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_user),
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
+    current_user: deps.Principal = Depends(deps.get_current_user),
 ) -> Any:
-    programs = db.query(models.TrainingProgram).offset(skip).limit(limit).all()
+    programs = paginate(db.query(models.TrainingProgram), page, response, models.TrainingProgram.program_id)
     return programs
 
 @router.post("/programs", response_model=schemas.TrainingProgram)
@@ -22,7 +23,7 @@ def create_program(
     *,
     db: Session = Depends(get_db),
     program_in: schemas.TrainingProgramCreate,
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_active_superuser),
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser),
 ) -> Any:
     program = models.TrainingProgram(**program_in.model_dump())
     db.add(program)
@@ -1,10 +1,12 @@
+import json
 from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
-from app import models, schemas
+from app import schemas
 from app.database import get_db
-from app.core import security, deps
-from datetime import date
+from app.core import deps
+from app.core.config import settings
+from app.services import onboarding
 
 router = APIRouter()
 
@@ -12,7 +14,7 @@ router = APIRouter()
 def onboard_employee(
     workflow_data: schemas.OnboardingWorkflow,
     db: Session = Depends(get_db),
-    current_user: models.EmployeeSystemAccess = Depends(deps.get_current_user)
+    current_user: deps.Principal = Depends(deps.get_current_user)
 ) -> Any:
     """
     Onboard a new employee:
@@ -22,71 +24,81 @@ def onboard_employee(
     All in a single transaction.
     """
     # Check permissions (e.g. only Admin or HR)
-    if current_user.role.role_name not in ["Admin", "HR"]:
+    if current_user.role_name not in ["Admin", "HR"]:
         raise HTTPException(status_code=403, detail="Not authorized to onboard employees")
 
+    # Everything that would fail the inserts, before any write
+    errors = onboarding.check(db, [workflow_data])
+    if errors:
+        raise HTTPException(status_code=400, detail=errors[0]["errors"][0])
+
     try:
-        # 0. Generate Employee Code (Simple auto-generation)
-        # In real app, use a sequence or max ID query.
-        import random
-        import string
-        suffix = ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
-        e_code = f"EMP-{date.today().strftime('%Y%m')}-{suffix}"
+        hire = onboarding.onboard(db, [workflow_data], current_user.employee_id)[0]
+        db.commit()
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
 
-        # 1. Create Employee
-        db_employee = models.Employee(
-            employee_code=e_code,
-            first_name=workflow_data.first_name,
-            last_name=workflow_data.last_name,
-            email=workflow_data.email,
-            department_id=workflow_data.department_id,
-            position_id=workflow_data.position_id,
-            date_of_joining=workflow_data.date_of_joining,
-            employment_type=workflow_data.employment_type,
-            employment_status=workflow_data.employment_status,
-            created_by=current_user.employee_id
-        )
-        db.add(db_employee)
-        db.flush() # Flush to get employee_id for next steps
+    return {
+        "message": "Onboarding workflow completed successfully",
+        "employee_id": hire["employee_id"],
+        "employee_code": hire["employee_code"],
+        "employee_name": hire["employee_name"],
+        "username": hire["username"],
+    }
 
-        # 2. Create System Access (Login)
-        # Check if username exists
-        if db.query(models.EmployeeSystemAccess).filter(models.EmployeeSystemAccess.username == workflow_data.username).first():
-            raise HTTPException(status_code=400, detail="Username already taken")
-        
-        hashed_password = security.get_password_hash(workflow_data.password)
-        db_access = models.EmployeeSystemAccess(
-            employee_id=db_employee.employee_id,
-            role_id=workflow_data.role_id,
-            username=workflow_data.username,
-            password_hash=hashed_password,
-            is_active=True
+async def read_hires(request: Request) -> List[schemas.OnboardingWorkflow]:
+    """Hires from a JSON array of OnboardingWorkflow objects, or from CSV (Content-Type: text/csv)."""
+    body = await request.body()
+    if request.headers.get("content-type", "").startswith("text/csv"):
+        try:
+            hires, errors = onboarding.parse_csv(body.decode("utf-8-sig"))
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="CSV must be UTF-8")
+    else:
+        try:
+            hires, errors = onboarding.parse_json(json.loads(body))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array of hires or a text/csv file")
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+    if not hires:
+        raise HTTPException(status_code=400, detail="No hires to onboard")
+    if len(hires) > settings.ONBOARDING_BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {settings.ONBOARDING_BULK_MAX_ROWS} hires per request",
         )
-        db.add(db_access)
+    return hires
 
-        # 3. Assign Initial Task (if provided)
-        if workflow_data.task_name:
-            db_task = models.OnboardingTask(
-                employee_id=db_employee.employee_id,
-                task_name=workflow_data.task_name,
-                task_description=workflow_data.task_description,
-                assigned_to=current_user.employee_id,
-                due_date=workflow_data.task_due_date,
-                status=models.TaskStatus.Pending
-            )
-            db.add(db_task)
-        
-        db.commit()
-        db.refresh(db_employee)
-        
-        return {
-            "message": "Onboarding workflow completed successfully",
-            "employee_id": db_employee.employee_id,
-            "employee_code": db_employee.employee_code,
-            "employee_name": f"{db_employee.first_name} {db_employee.last_name}",
-            "username": workflow_data.username
-        }
+@router.post("/onboarding/bulk", status_code=status.HTTP_201_CREATED, response_model=schemas.BulkOnboardingResult)
+def onboard_employees_bulk(
+    current_user: deps.Principal = Depends(deps.get_current_user),
+    hires: List[schemas.OnboardingWorkflow] = Depends(read_hires),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    Onboard many employees at once, all or nothing: employee records,
+    logins and initial tasks are written with one multi-row INSERT per
+    table, and the passwords are hashed in parallel. Problems are reported
+    per row (numbered from 1) before anything is written.
+    """
+    if current_user.role_name not in ["Admin", "HR"]:
+        raise HTTPException(status_code=403, detail="Not authorized to onboard employees")
 
+    errors = onboarding.check(db, hires)
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+
+    try:
+        created = onboarding.onboard(db, hires, current_user.employee_id)
+        db.commit()
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
+    return {"created": len(created), "employees": created}
@@ -1,4 +1,4 @@
-from typing import List, Optional, Any
+from typing import Dict, List, Optional, Any
 from pydantic import BaseModel, EmailStr
 from datetime import date, datetime, time
 from decimal import Decimal
@@ -39,6 +39,15 @@ class Department(DepartmentBase):
     class Config:
         from_attributes = True
 
+class DepartmentHeadcountEntry(BaseModel):
+    department_id: int
+    headcount: int
+
+class DepartmentHeadcount(BaseModel):
+    department_id: int
+    headcount: int # Whole subtree, including the department itself
+    by_department: List[DepartmentHeadcountEntry]
+
 # --- Job Position Schemas ---
 class JobPositionBase(BaseModel):
     position_title: str
@@ -111,6 +120,21 @@ class Employee(EmployeeBase):
     class Config:
         from_attributes = True
 
+class EmployeeSearchResult(BaseModel):
+    # Just enough to render and pick a typeahead suggestion
+    employee_id: int
+    employee_code: str
+    first_name: str
+    last_name: str
+    email: str
+    department_id: int
+    position_id: int
+    manager_id: Optional[int] = None
+    employment_status: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
 # --- User/Auth Schemas ---
 class UserRoleBase(BaseModel):
     role_name: str
@@ -174,6 +198,58 @@ class Attendance(AttendanceBase):
     class Config:
         from_attributes = True
 
+class AttendancePunch(BaseModel):
+    employee_id: int
+    timestamp: datetime
+    direction: str # "in" or "out"
+
+class AttendancePunchBatch(BaseModel):
+    punches: List[AttendancePunch]
+    location: Optional[str] = None
+
+class AttendancePunchResult(BaseModel):
+    index: int
+    employee_id: int
+    attendance_date: Optional[date] = None
+    status: str # "applied" or "rejected"
+    reason: Optional[str] = None
+
+class AttendanceBulkResult(BaseModel):
+    received: int
+    applied: int
+    rejected: int
+    days_upserted: int
+    results: List[AttendancePunchResult]
+
+class AttendanceMonthlySummary(BaseModel):
+    employee_id: int
+    year: int
+    month: int
+    days_recorded: int
+    days_present: int
+    days_late: int
+    days_absent: int
+    days_on_leave: int
+    total_work_hours: Decimal
+    total_overtime_hours: Decimal
+
+    class Config:
+        from_attributes = True
+
+class DepartmentAttendanceSummary(BaseModel):
+    department_id: int
+    year: int
+    month: int
+    employees: int
+    days_present: int
+    days_absent: int
+    days_on_leave: int
+    total_work_hours: Decimal
+    total_overtime_hours: Decimal
+
+class AttendanceSummaryRebuildResult(BaseModel):
+    summaries: int
+
 # --- Leave Schemas ---
 class LeaveTypeBase(BaseModel):
     leave_name: str
@@ -206,6 +282,23 @@ class LeaveApplication(LeaveApplicationBase):
     class Config:
         from_attributes = True
 
+class LeaveBalance(BaseModel):
+    employee_id: int
+    leave_type_id: int
+    year: int
+    total_days: Decimal
+    used_days: Decimal
+    remaining_days: Decimal
+    carried_forward: Decimal
+
+    class Config:
+        from_attributes = True
+
+class LeaveRolloverResult(BaseModel):
+    from_year: int
+    to_year: int
+    balances_created: int
+
 # --- Recruitment Schemas ---
 class JobPostingBase(BaseModel):
     position_id: int
@@ -245,6 +338,17 @@ class JobApplication(JobApplicationBase):
     class Config:
         from_attributes = True
 
+class JobPostingSearchHit(BaseModel):
+    posting: JobPosting
+    rank: float
+    # Matching fields, HTML-escaped, with the hits wrapped in <mark> tags
+    highlights: Dict[str, str] = {}
+
+class JobApplicationSearchHit(BaseModel):
+    application: JobApplication
+    rank: float
+    highlights: Dict[str, str] = {}
+
 # --- Payroll Schemas ---
 class SalaryStructureBase(BaseModel):
     employee_id: int
@@ -281,6 +385,27 @@ class Payroll(PayrollBase):
     class Config:
         from_attributes = True
 
+class PayrollRunRequest(BaseModel):
+    pay_period_start: date
+    pay_period_end: date
+    department_ids: Optional[List[int]] = None # Default: all departments
+    workers: Optional[int] = None
+
+class PayrollRunDepartment(BaseModel):
+    department_id: int
+    processed: int
+    elapsed_seconds: Optional[float] = None
+    error: Optional[str] = None
+
+class PayrollRunResult(BaseModel):
+    pay_period_start: date
+    pay_period_end: date
+    departments: List[PayrollRunDepartment]
+    employees_processed: int
+    failed_departments: int
+    elapsed_seconds: float
+    employees_per_second: float
+
 # --- Performance Schemas ---
 class PerformanceReviewBase(BaseModel):
     employee_id: int
@@ -359,3 +484,14 @@ class OnboardingWorkflow(BaseModel):
     task_name: Optional[str] = "Complete Profile"
     task_description: Optional[str] = "Please complete your employee profile"
     task_due_date: Optional[date] = None
+
+class OnboardedEmployee(BaseModel):
+    employee_id: int
+    employee_code: str
+    employee_name: str
+    email: str
+    username: str
+
+class BulkOnboardingResult(BaseModel):
+    created: int
+    employees: List[OnboardedEmployee]
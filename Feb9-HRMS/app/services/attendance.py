@@ -0,0 +1,315 @@
+from collections import defaultdict
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, case, cast, delete, exists, extract, func, insert as core_insert, literal, Numeric, select, Time, update
+from sqlalchemy.orm import Session
+from app import models, schemas
+
+# Days upserted per INSERT statement (keeps bind parameters well under driver limits)
+UPSERT_CHUNK_SIZE = 1000
+
+def compute_work_hours(check_in: Optional[time], check_out: Optional[time]) -> Optional[Decimal]:
+    # Same-day shifts only; cross-midnight punches are left without hours
+    if check_in is None or check_out is None or check_out <= check_in:
+        return None
+    dummy_date = date(2000, 1, 1)
+    duration = (datetime.combine(dummy_date, check_out) - datetime.combine(dummy_date, check_in)).total_seconds() / 3600
+    return Decimal(str(round(duration, 2)))
+
+def _insert_for(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Bulk attendance upsert is not supported on {dialect}")
+    return dialect, insert
+
+def _earliest(dialect: str, a, b):
+    fn = func.least if dialect == "postgresql" else func.min
+    return fn(func.coalesce(a, b), func.coalesce(b, a))
+
+def _latest(dialect: str, a, b):
+    fn = func.greatest if dialect == "postgresql" else func.max
+    return fn(func.coalesce(a, b), func.coalesce(b, a))
+
+def work_hours_expr(dialect: str, check_in, check_out):
+    """SQL expression for work hours between two TIME expressions (NULL unless out > in)."""
+    if dialect == "postgresql":
+        hours = extract("epoch", check_out - check_in) / 3600
+    else:
+        hours = (func.julianday(check_out) - func.julianday(check_in)) * 24
+    return case(
+        (and_(check_in.is_not(None), check_out.is_not(None), check_out > check_in),
+         func.round(cast(hours, Numeric), 2)),
+        else_=None,
+    )
+
+# --- Check-in / check-out (one statement each) ---
+
+def check_in_statement(db: Session, rows: List[dict]):
+    """
+    INSERT ... ON CONFLICT DO NOTHING RETURNING for one or more check-ins:
+    the unique (employee_id, attendance_date) constraint replaces the
+    "already checked in?" SELECT, and only newly created rows come back.
+    """
+    _, insert = _insert_for(db)
+    table = models.Attendance.__table__
+    return (
+        insert(table)
+        .values([{"status": models.AttendanceStatus.Present, "overtime_hours": 0, **row} for row in rows])
+        .on_conflict_do_nothing(index_elements=[table.c.employee_id, table.c.attendance_date])
+        .returning(*table.c)
+    )
+
+def check_out_statement(db: Session, day: date, punches: Dict[int, Tuple[time, Optional[str]]]):
+    """
+    UPDATE ... RETURNING that stamps check_out and computes work_hours in
+    SQL for one or more employees' rows on `day`; `punches` maps
+    employee_id to (check-out time, notes).
+    """
+    dialect = db.get_bind().dialect.name
+    table = models.Attendance.__table__
+    employee = table.c.employee_id
+    if len(punches) == 1:
+        check_out = literal(next(iter(punches.values()))[0], Time)
+    else:
+        check_out = case({eid: literal(at, Time) for eid, (at, _) in punches.items()}, value=employee)
+    values = {
+        "check_out": check_out,
+        "work_hours": work_hours_expr(dialect, table.c.check_in, check_out),
+    }
+    noted = {eid: notes for eid, (_, notes) in punches.items() if notes}
+    if noted:
+        values["notes"] = case(
+            {eid: func.coalesce(table.c.notes, "") + " | Checkout: " + notes for eid, notes in noted.items()},
+            value=employee,
+            else_=table.c.notes,
+        )
+    return (
+        update(table)
+        .where(employee.in_(list(punches)), table.c.attendance_date == day)
+        .values(**values)
+        .returning(*table.c)
+    )
+
+def check_in(db: Session, employee_id: int, at: datetime, notes: Optional[str] = None) -> Optional[dict]:
+    """Create today's row; None if the employee already checked in. Caller commits."""
+    row = db.execute(check_in_statement(db, [{
+        "employee_id": employee_id, "attendance_date": at.date(), "check_in": at.time(), "notes": notes,
+    }])).first()
+    if row is None:
+        return None
+    refresh_monthly_summary(db, [(employee_id, at.date())])
+    return dict(row._mapping)
+
+def check_out(db: Session, employee_id: int, at: datetime, notes: Optional[str] = None) -> Optional[dict]:
+    """Close today's row; None if there is nothing to check out of. Caller commits."""
+    row = db.execute(check_out_statement(db, at.date(), {employee_id: (at.time(), notes)})).first()
+    if row is None:
+        return None
+    refresh_monthly_summary(db, [(employee_id, at.date())])
+    return dict(row._mapping)
+
+def ingest_punches(db: Session, batch: schemas.AttendancePunchBatch) -> schemas.AttendanceBulkResult:
+    """
+    Fold a batch of device punches into one row per (employee, day) and
+    upsert them with INSERT ... ON CONFLICT, merging with whatever is already
+    stored (earliest check-in, latest check-out) and recomputing work_hours
+    in the same statement. Replaying the same batch is idempotent.
+    """
+    punches = batch.punches
+    employee_ids = {p.employee_id for p in punches}
+    known = set()
+    if employee_ids:
+        known = set(db.execute(
+            select(models.Employee.employee_id).where(models.Employee.employee_id.in_(employee_ids))
+        ).scalars())
+
+    results: List[schemas.AttendancePunchResult] = []
+    days: Dict[Tuple[int, date], List[Optional[time]]] = {}
+    for i, punch in enumerate(punches):
+        day = punch.timestamp.date()
+        direction = punch.direction.lower()
+        reason = None
+        if punch.employee_id not in known:
+            reason = "Unknown employee"
+        elif direction not in ("in", "out"):
+            reason = "Direction must be 'in' or 'out'"
+        if reason:
+            results.append(schemas.AttendancePunchResult(
+                index=i, employee_id=punch.employee_id, attendance_date=day, status="rejected", reason=reason
+            ))
+            continue
+
+        at = punch.timestamp.time()
+        slot = days.setdefault((punch.employee_id, day), [None, None])
+        if direction == "in":
+            slot[0] = at if slot[0] is None else min(slot[0], at)
+        else:
+            slot[1] = at if slot[1] is None else max(slot[1], at)
+        results.append(schemas.AttendancePunchResult(
+            index=i, employee_id=punch.employee_id, attendance_date=day, status="applied"
+        ))
+
+    rows = [
+        {
+            "employee_id": employee_id,
+            "attendance_date": day,
+            "check_in": check_in,
+            "check_out": check_out,
+            "work_hours": compute_work_hours(check_in, check_out),
+            "status": models.AttendanceStatus.Present,
+            "location": batch.location,
+        }
+        for (employee_id, day), (check_in, check_out) in days.items()
+    ]
+    if rows:
+        upsert_attendance_rows(db, rows)
+        refresh_monthly_summary(db, days.keys())
+        db.commit()
+
+    applied = sum(1 for r in results if r.status == "applied")
+    return schemas.AttendanceBulkResult(
+        received=len(punches),
+        applied=applied,
+        rejected=len(punches) - applied,
+        days_upserted=len(rows),
+        results=results,
+    )
+
+def upsert_attendance_rows(db: Session, rows: List[dict]) -> None:
+    dialect, insert = _insert_for(db)
+    table = models.Attendance.__table__
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        stmt = insert(table).values(rows[start:start + UPSERT_CHUNK_SIZE])
+        check_in = _earliest(dialect, table.c.check_in, stmt.excluded.check_in)
+        check_out = _latest(dialect, table.c.check_out, stmt.excluded.check_out)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.employee_id, table.c.attendance_date],
+            set_={
+                "check_in": check_in,
+                "check_out": check_out,
+                "work_hours": work_hours_expr(dialect, check_in, check_out),
+                "location": func.coalesce(stmt.excluded.location, table.c.location),
+                "updated_at": func.now(),
+            },
+        )
+        db.execute(stmt)
+
+# --- Monthly rollup ---
+
+Summary = models.AttendanceMonthlySummary
+_SUMMARY_COLUMNS = [
+    "employee_id", "year", "month", "days_recorded", "days_present", "days_late",
+    "days_absent", "days_on_leave", "total_work_hours", "total_overtime_hours",
+]
+
+def _summary_source():
+    a = models.Attendance
+    status = models.AttendanceStatus
+    year = extract("year", a.attendance_date)
+    month = extract("month", a.attendance_date)
+
+    def days(*statuses):
+        return func.sum(case((a.status.in_(statuses), 1), else_=0))
+
+    return (
+        select(
+            a.employee_id,
+            year,
+            month,
+            func.count(),
+            days(status.Present, status.Late, status.HalfDay),
+            days(status.Late),
+            days(status.Absent),
+            days(status.OnLeave),
+            func.coalesce(func.sum(a.work_hours), 0),
+            func.coalesce(func.sum(a.overtime_hours), 0),
+        )
+        .group_by(a.employee_id, year, month)
+    )
+
+def _month_range(year: int, month: int) -> Tuple[date, date]:
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+def refresh_monthly_summary(db: Session, keys: Iterable[Tuple[int, date]]) -> None:
+    """
+    Recompute the rollup rows for the (employee_id, any day in month) pairs
+    just written, one grouped upsert per month touched. Each refresh reads
+    at most a month of rows per employee, so it stays cheap however large
+    the attendance table grows, and it is exact even when an upsert merged
+    punches into an existing day.
+    """
+    months: Dict[Tuple[int, int], set] = defaultdict(set)
+    for employee_id, day in keys:
+        months[(day.year, day.month)].add(employee_id)
+    if not months:
+        return
+    db.flush()
+    _, insert = _insert_for(db)
+    table = Summary.__table__
+    a = models.Attendance
+    for (year, month), employee_ids in months.items():
+        start, end = _month_range(year, month)
+        ids = sorted(employee_ids)
+        for i in range(0, len(ids), UPSERT_CHUNK_SIZE):
+            source = _summary_source().where(
+                a.employee_id.in_(ids[i:i + UPSERT_CHUNK_SIZE]),
+                a.attendance_date >= start,
+                a.attendance_date < end,
+            )
+            stmt = insert(table).from_select([table.c[name] for name in _SUMMARY_COLUMNS], source)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.employee_id, table.c.year, table.c.month],
+                set_={
+                    **{name: stmt.excluded[name] for name in _SUMMARY_COLUMNS[3:]},
+                    "updated_at": func.now(),
+                },
+            )
+            db.execute(stmt)
+
+def rebuild_monthly_summary(db: Session, year: Optional[int] = None) -> int:
+    """
+    Recompute the rollup from raw attendance (backfill/repair), optionally
+    for one year. Summaries of archived months have no raw rows left to
+    rebuild from, so they are kept as they are.
+    """
+    table = Summary.__table__
+    a = models.Attendance
+    archive = models.AttendanceArchive
+    source = _summary_source()
+    clear = delete(table).where(~exists().where(archive.year == table.c.year, archive.month == table.c.month))
+    if year is not None:
+        start, end = date(year, 1, 1), date(year + 1, 1, 1)
+        source = source.where(a.attendance_date >= start, a.attendance_date < end)
+        clear = clear.where(table.c.year == year)
+    db.execute(clear)
+    db.execute(core_insert(table).from_select([table.c[name] for name in _SUMMARY_COLUMNS], source))
+    count = select(func.count()).select_from(table)
+    if year is not None:
+        count = count.where(table.c.year == year)
+    return db.execute(count).scalar()
+
+def department_monthly_summary(db: Session, department_id: int, year: int, month: int):
+    """Totals over the department and all its sub-departments, read from the rollup."""
+    c = models.DepartmentClosure
+    e = models.Employee
+    return db.execute(
+        select(
+            func.count(Summary.employee_id),
+            func.coalesce(func.sum(Summary.days_present), 0),
+            func.coalesce(func.sum(Summary.days_absent), 0),
+            func.coalesce(func.sum(Summary.days_on_leave), 0),
+            func.coalesce(func.sum(Summary.total_work_hours), 0),
+            func.coalesce(func.sum(Summary.total_overtime_hours), 0),
+        )
+        .select_from(c)
+        .join(e, e.department_id == c.descendant_id)
+        .join(Summary, and_(Summary.employee_id == e.employee_id, Summary.year == year, Summary.month == month))
+        .where(c.ancestor_id == department_id)
+    ).one()
@@ -0,0 +1,315 @@
+import gzip
+import hashlib
+import logging
+import os
+import re
+from datetime import date
+from typing import Iterator, List, Optional, Sequence, Tuple
+import orjson
+from sqlalchemy import Select, column, delete, extract, select, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app import models
+from app.core.config import settings
+from app.core.export import EXPORT_BATCH_SIZE
+from app.core.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+PARENT = models.Attendance.__tablename__
+DEFAULT_PARTITION = f"{PARENT}_default"
+LEGACY_TABLE = f"{PARENT}_unpartitioned"
+_PARTITION_NAME = re.compile(rf"^{PARENT}_(\d{{4}})_(\d{{2}})$")
+
+# pg_advisory_xact_lock key: workers starting together must not race on DDL
+_DDL_LOCK_KEY = 7_246_501_016
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+def add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_{month:%Y_%m}"
+
+def _month_of(name: str) -> date:
+    match = _PARTITION_NAME.match(name)
+    return date(int(match[1]), int(match[2]), 1)
+
+def _lock(conn: Connection) -> None:
+    conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _DDL_LOCK_KEY})
+
+# --- partitions (Postgres only; other databases keep one plain table) ---
+
+def is_partitioned(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(conn.execute(
+        text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:name)"), {"name": PARENT}
+    ).scalar())
+
+def partitions(conn: Connection) -> List[date]:
+    """Months with an attached partition, oldest first."""
+    names = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:parent)"
+    ), {"parent": PARENT}).scalars()
+    return sorted(_month_of(name) for name in names if _PARTITION_NAME.match(name))
+
+def _detached(conn: Connection) -> List[date]:
+    # Month tables left behind by an archive run that stopped after DETACH
+    names = conn.execute(text(
+        "SELECT relname FROM pg_class WHERE relkind = 'r' AND NOT relispartition "
+        "AND pg_table_is_visible(oid) AND relname ~ :pattern"
+    ), {"pattern": _PARTITION_NAME.pattern}).scalars()
+    return sorted(_month_of(name) for name in names)
+
+def _create_partition(conn: Connection, month: date) -> None:
+    name = partition_name(month)
+    bounds = f"FROM ('{month}') TO ('{add_months(month, 1)}')"
+    in_range = {"start": month, "end": add_months(month, 1)}
+    stranded = conn.execute(text(
+        f"SELECT count(*) FROM {DEFAULT_PARTITION} WHERE attendance_date >= :start AND attendance_date < :end"
+    ), in_range).scalar()
+    if not stranded:
+        conn.execute(text(f"CREATE TABLE {name} PARTITION OF {PARENT} FOR VALUES {bounds}"))
+        return
+    # Rows written before the month had a partition sit in the default one,
+    # which makes PARTITION OF fail: build the table, move them, then attach.
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    conn.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+        f"WHERE attendance_date >= :start AND attendance_date < :end RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ), in_range)
+    conn.execute(text(f"ALTER TABLE {PARENT} ATTACH PARTITION {name} FOR VALUES {bounds}"))
+    logger.info("Moved %s attendance rows from %s to %s", stranded, DEFAULT_PARTITION, name)
+
+def _ensure(conn: Connection, months: Sequence[date]) -> List[str]:
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT} DEFAULT"))
+    wanted = set(months)
+    wanted.update(conn.execute(text(
+        f"SELECT DISTINCT CAST(date_trunc('month', attendance_date) AS date) FROM {DEFAULT_PARTITION}"
+    )).scalars())
+    created = []
+    for month in sorted(wanted - set(partitions(conn))):
+        _create_partition(conn, month)
+        created.append(partition_name(month))
+    return created
+
+def ensure_partitions(db: Session, today: Optional[date] = None, ahead: Optional[int] = None) -> List[str]:
+    """
+    Create the partitions for this month and the next `ahead` months, plus
+    the default partition that catches anything outside them (old backfills,
+    a missed maintenance run) so writes never fail for want of a partition.
+    Rows found in the default partition are moved into a month partition.
+    Returns the partitions created; a no-op unless attendance is partitioned.
+    """
+    conn = db.connection()
+    if not is_partitioned(conn):
+        return []
+    ahead = settings.ATTENDANCE_PARTITIONS_AHEAD if ahead is None else ahead
+    current = month_start(today or date.today())
+    _lock(conn)
+    created = _ensure(conn, [add_months(current, n) for n in range(ahead + 1)])
+    db.commit()
+    return created
+
+def convert_to_partitioned(db: Session, today: Optional[date] = None) -> int:
+    """
+    One-off migration of an existing plain attendance table: rename it,
+    create the partitioned table with a partition per month of data, copy
+    the rows across and drop the old table, all in one transaction (the
+    table is locked for the duration). Returns the number of rows copied.
+    """
+    conn = db.connection()
+    if conn.dialect.name != "postgresql":
+        raise RuntimeError("Attendance partitioning requires PostgreSQL")
+    if is_partitioned(conn):
+        return 0
+    _lock(conn)
+    conn.execute(text(f"LOCK TABLE {PARENT} IN ACCESS EXCLUSIVE MODE"))
+    conn.execute(text(f"ALTER TABLE {PARENT} RENAME TO {LEGACY_TABLE}"))
+    # Free the index and sequence names for the new table
+    indexes = conn.execute(
+        text("SELECT indexname FROM pg_indexes WHERE tablename = :name"), {"name": LEGACY_TABLE}
+    ).scalars().all()
+    for index in indexes:
+        conn.execute(text(f'ALTER INDEX "{index}" RENAME TO "{index[:50]}_unpartitioned"'))
+    sequence = conn.execute(
+        text("SELECT pg_get_serial_sequence(:name, 'attendance_id')"), {"name": LEGACY_TABLE}
+    ).scalar()
+    if sequence:
+        conn.execute(text(f"ALTER SEQUENCE {sequence} RENAME TO {LEGACY_TABLE}_attendance_id_seq"))
+
+    models.Attendance.__table__.create(conn, checkfirst=True)
+    first = conn.execute(text(f"SELECT min(attendance_date) FROM {LEGACY_TABLE}")).scalar()
+    current = month_start(today or date.today())
+    month = month_start(first) if first and first < current else current
+    months = []
+    while month <= add_months(current, settings.ATTENDANCE_PARTITIONS_AHEAD):
+        months.append(month)
+        month = add_months(month, 1)
+    _ensure(conn, months)
+
+    columns = ", ".join(c.name for c in models.Attendance.__table__.columns)
+    copied = conn.execute(text(f"INSERT INTO {PARENT} ({columns}) SELECT {columns} FROM {LEGACY_TABLE}")).rowcount
+    conn.execute(text(
+        f"SELECT setval(pg_get_serial_sequence('{PARENT}', 'attendance_id'), "
+        f"(SELECT coalesce(max(attendance_id), 0) + 1 FROM {PARENT}), false)"
+    ))
+    conn.execute(text(f"DROP TABLE {LEGACY_TABLE}"))
+    db.commit()
+    return copied
+
+# --- retention and archival ---
+
+def archive_cutoff(today: date, years: int) -> date:
+    """First month that is kept: everything before it is archived."""
+    return add_months(month_start(today), -12 * years)
+
+def _archived(db: Session) -> set:
+    a = models.AttendanceArchive
+    return {date(y, m, 1) for y, m in db.query(a.year, a.month)}
+
+def expired_months(db: Session, years: Optional[int] = None, today: Optional[date] = None) -> List[date]:
+    """Months still in the database that fall outside the retention window."""
+    years = settings.ATTENDANCE_RETENTION_YEARS if years is None else years
+    if years <= 0:
+        return []
+    cutoff = archive_cutoff(today or date.today(), years)
+    conn = db.connection()
+    if is_partitioned(conn):
+        months = set(partitions(conn)) | set(_detached(conn))
+    else:
+        a = models.Attendance
+        year, month = extract("year", a.attendance_date), extract("month", a.attendance_date)
+        months = {
+            date(int(y), int(m), 1)
+            for y, m in db.execute(select(year, month).where(a.attendance_date < cutoff).group_by(year, month))
+        }
+    archived = _archived(db)
+    for month in sorted(m for m in months if m in archived):
+        # Backfilled after its month was archived; needs a manual merge
+        logger.warning("Attendance for %s is already archived; leaving the new rows in place", f"{month:%Y-%m}")
+    return sorted(m for m in months if m < cutoff and m not in archived)
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _write_archive(conn: Connection, stmt: Select, path: str) -> Tuple[int, str]:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    columns = [c.name for c in stmt.selected_columns]
+    partial = path + ".partial"
+    rows = 0
+    with open(partial, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as out:
+            result = conn.execute(stmt.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE))
+            for batch in result.partitions():
+                out.write(b"".join(dumps(dict(zip(columns, row))) + b"\n" for row in batch))
+                rows += len(batch)
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(partial, path)
+    return rows, _sha256(path)
+
+def archive_month(db: Session, month: date, directory: Optional[str] = None) -> models.AttendanceArchive:
+    """
+    Move one month of attendance out of the database into a gzip NDJSON
+    file. On Postgres the month's partition is detached first (so the parent
+    no longer sees it and the dump holds no lock on it), then dropped once
+    the file is written; elsewhere the rows are deleted by date range.
+    Monthly summaries for the month are kept.
+    """
+    directory = directory or settings.ATTENDANCE_ARCHIVE_DIR
+    name = partition_name(month)
+    path = os.path.join(directory, f"{name}.ndjson.gz")
+    attendance = models.Attendance.__table__
+    start, end = month, add_months(month, 1)
+
+    partitioned = is_partitioned(db.connection())
+    if partitioned:
+        if month in partitions(db.connection()):
+            db.connection().execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+            db.commit()
+        source = table(name, *[column(c.name) for c in attendance.columns])
+        stmt = select(*source.c).order_by(source.c.attendance_date, source.c.attendance_id)
+    else:
+        stmt = (
+            select(*attendance.c)
+            .where(attendance.c.attendance_date >= start, attendance.c.attendance_date < end)
+            .order_by(attendance.c.attendance_date, attendance.c.attendance_id)
+        )
+
+    row_count, sha256 = _write_archive(db.connection(), stmt, path)
+    if partitioned:
+        db.connection().execute(text(f"DROP TABLE {name}"))
+    else:
+        deleted = db.execute(delete(attendance).where(
+            attendance.c.attendance_date >= start, attendance.c.attendance_date < end,
+        )).rowcount
+        if deleted != row_count:
+            db.rollback()
+            raise RuntimeError(f"{name}: {deleted} rows changed while archiving {row_count}; retry")
+    record = models.AttendanceArchive(
+        year=month.year, month=month.month, path=path, row_count=row_count, sha256=sha256,
+    )
+    db.add(record)
+    db.commit()
+    return record
+
+def archive_expired(
+    db: Session, years: Optional[int] = None, directory: Optional[str] = None, today: Optional[date] = None,
+) -> List[models.AttendanceArchive]:
+    """Apply the retention policy: archive every month older than `years` years."""
+    return [archive_month(db, month, directory) for month in expired_months(db, years, today)]
+
+# --- reading archived months (explicit slow path) ---
+
+def archives_between(db: Session, start: date, end: date) -> List[models.AttendanceArchive]:
+    a = models.AttendanceArchive
+    key = a.year * 100 + a.month
+    return db.query(a).filter(
+        key >= start.year * 100 + start.month,
+        key <= end.year * 100 + end.month,
+    ).order_by(a.year, a.month).all()
+
+def iter_archived(
+    archives: Sequence[models.AttendanceArchive], start: date, end: date, employee_id: Optional[int] = None,
+) -> Iterator[dict]:
+    """
+    Attendance rows between `start` and `end` (inclusive) from the archive
+    files. Every row of each month is decompressed and decoded, so this is
+    far slower than reading the live table; it is only for old records.
+    """
+    first, last = start.isoformat(), end.isoformat()
+    for archive in archives:
+        with gzip.open(archive.path, "rb") as f:
+            for line in f:
+                row = orjson.loads(line)
+                if employee_id is not None and row["employee_id"] != employee_id:
+                    continue
+                if first <= row["attendance_date"] <= last:
+                    yield row
+
+def storage_status(db: Session) -> dict:
+    conn = db.connection()
+    partitioned = is_partitioned(conn)
+    return {
+        "partitioned": partitioned,
+        "partitions": [partition_name(m) for m in partitions(conn)] if partitioned else [],
+        "detached": [partition_name(m) for m in _detached(conn)] if partitioned else [],
+        "default_partition_rows": (
+            conn.execute(text(f"SELECT count(*) FROM {DEFAULT_PARTITION}")).scalar() if partitioned else None
+        ),
+        "archived": [
+            {"month": f"{a.year}-{a.month:02d}", "rows": a.row_count, "path": a.path}
+            for a in db.query(models.AttendanceArchive).order_by(models.AttendanceArchive.year, models.AttendanceArchive.month)
+        ],
+    }
@@ -0,0 +1,98 @@
+import threading
+from collections import deque
+from datetime import date
+from typing import Deque, List, Optional
+from sqlalchemy import Sequence, func, select, update
+from sqlalchemy.engine import Engine
+from app import database, models
+
+CODE_PREFIX = "EMP"
+
+class BlockAllocator:
+    """
+    Unique numbers from a database sequence without a round trip per number.
+    Each worker reserves a block of `block_size` numbers with one nextval
+    (or one counter UPDATE on SQLite) and hands them out from memory until
+    the block runs out.
+
+    Blocks are reserved in their own committed transaction, so a number is
+    never handed out twice even when the caller's transaction rolls back;
+    numbers left unused when a worker exits are simply skipped. Codes
+    therefore have gaps, but never collide.
+
+    On SQLite the reservation writes to the database: call take() before the
+    caller's session writes anything, or the two connections would wait on
+    each other's lock.
+    """
+
+    def __init__(self, engine: Engine, sequence: Sequence, block_size: int):
+        self.engine = engine
+        self.sequence = sequence
+        self.block_size = block_size
+        self.blocks_reserved = 0
+        self.issued = 0
+        self._blocks: Deque[List[int]] = deque()  # [next, end) per block
+        self._lock = threading.Lock()
+
+    def _reserve(self, blocks: int) -> List[int]:
+        """First number of each of `blocks` new blocks."""
+        with self.engine.begin() as conn:
+            dialect = conn.dialect.name
+            if dialect == "postgresql":
+                starts = conn.execute(
+                    select(self.sequence.next_value()).select_from(func.generate_series(1, blocks))
+                ).scalars().all()
+            elif dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert
+                table = models.CodeSequence.__table__
+                conn.execute(
+                    insert(table).values(name=self.sequence.name, next_value=self.sequence.start)
+                    .on_conflict_do_nothing()
+                )
+                span = blocks * self.block_size
+                end = conn.execute(
+                    update(table).where(table.c.name == self.sequence.name)
+                    .values(next_value=table.c.next_value + span)
+                    .returning(table.c.next_value)
+                ).scalar_one()
+                starts = list(range(end - span, end, self.block_size))
+            else:
+                raise NotImplementedError(f"Block allocation is not supported on {dialect}")
+        self.blocks_reserved += len(starts)
+        return starts
+
+    def take(self, count: int = 1) -> List[int]:
+        with self._lock:
+            available = sum(end - start for start, end in self._blocks)
+            if available < count:
+                missing = count - available
+                blocks = -(-missing // self.block_size)
+                self._blocks.extend([start, start + self.block_size] for start in self._reserve(blocks))
+            numbers: List[int] = []
+            while len(numbers) < count:
+                block = self._blocks[0]
+                n = min(count - len(numbers), block[1] - block[0])
+                numbers.extend(range(block[0], block[0] + n))
+                block[0] += n
+                if block[0] == block[1]:
+                    self._blocks.popleft()
+            self.issued += count
+            return numbers
+
+    def stats(self) -> dict:
+        return {
+            "name": f"allocator:{self.sequence.name}",
+            "block_size": self.block_size,
+            "blocks_reserved": self.blocks_reserved,
+            "issued": self.issued,
+            "available": sum(end - start for start, end in self._blocks),
+        }
+
+allocator = BlockAllocator(database.engine, models.employee_code_seq, models.EMPLOYEE_CODE_BLOCK)
+
+def format_code(number: int, joined: Optional[date] = None) -> str:
+    return f"{CODE_PREFIX}-{(joined or date.today()):%Y%m}-{number:06d}"
+
+def next_codes(count: int, joined: Optional[date] = None) -> List[str]:
+    """`count` new, never-used employee codes (EMP-YYYYMM-000123)."""
+    return [format_code(n, joined) for n in allocator.take(count)]
@@ -0,0 +1,455 @@
+import bisect
+import heapq
+import logging
+import re
+import sys
+import threading
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import and_, case, event, exists, func, literal, literal_column, or_, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, object_session
+from app import database, models
+from app.core.config import settings
+from app.core.invalidation import bus
+
+logger = logging.getLogger(__name__)
+
+SEARCH_FIELDS = ("first_name", "last_name", "email", "employee_code")
+
+# Must stay identical to the indexed expression or Postgres won't use the index
+DOCUMENT_SQL = "lower(first_name || ' ' || last_name || ' ' || email || ' ' || employee_code)"
+
+_SPLIT = re.compile(r"\W+")
+
+def query_words(q: str) -> List[str]:
+    """Lower-cased words of a typeahead query; punctuation-only words are dropped."""
+    return [w for w in q.lower().split() if re.search(r"\w", w)]
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def sql_filters(
+    department_id: Optional[int] = None,
+    status: Optional[models.EmploymentStatus] = None,
+    manager_id: Optional[int] = None,
+) -> list:
+    E = models.Employee
+    filters = []
+    if department_id is not None:
+        filters.append(E.department_id == department_id)
+    if status is not None:
+        filters.append(E.employment_status == status)
+    if manager_id is not None:
+        # Anyone in the manager's subtree, at any depth
+        closure = models.EmployeeClosure
+        filters.append(exists().where(
+            closure.ancestor_id == manager_id,
+            closure.descendant_id == E.employee_id,
+            closure.depth > 0,
+        ))
+    return filters
+
+def _trigrams(word: str) -> Set[str]:
+    # Padded the way pg_trgm does it, so short words still get trigrams
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TrigramSearch:
+    """
+    Postgres backend: one GIN pg_trgm index over the lower-cased
+    concatenation of the searchable fields. Every query word must appear in
+    it (LIKE '%word%', served by the trigram index), or the whole query must
+    be close to some word of it (word_similarity, the `<%` operator), which
+    catches typos. Prefix matches rank first, then by similarity.
+    """
+
+    name = "trigram"
+
+    def ensure(self, conn: Connection) -> None:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_employees_search_trgm ON employees "
+            f"USING GIN (({DOCUMENT_SQL}) gin_trgm_ops)"
+        ))
+
+    def search(self, db: Session, query, words: List[str], limit: int, **filters) -> list:
+        E = models.Employee
+        document = literal_column(DOCUMENT_SQL)
+        phrase = " ".join(words)
+        contains = and_(*[document.like(f"%{_escape_like(w)}%", escape="\\") for w in words])
+        similar = literal(phrase).op("<%")(document)
+        starts = or_(*[
+            func.lower(getattr(E, field)).like(f"{_escape_like(words[0])}%", escape="\\")
+            for field in SEARCH_FIELDS
+        ])
+        return (
+            query.filter(or_(contains, similar), *sql_filters(**filters))
+            .order_by(
+                case((starts, 0), else_=1),
+                func.word_similarity(phrase, document).desc(),
+                E.last_name, E.first_name, E.employee_id,
+            )
+            .limit(limit)
+            .all()
+        )
+
+    def stats(self) -> dict:
+        return {"name": "employee_search", "backend": self.name}
+
+class PrefixIndex:
+    """
+    In-process backend for SQLite and small deployments: a sorted list of
+    (token, employee_id) pairs searched with bisect. Tokens are the
+    lower-cased names, email, email local part and employee code, plus
+    their word pieces ("anne-marie" -> "anne", "marie").
+
+    Every query word must be a prefix of some token of the employee. When
+    that finds too few employees, words of 3+ letters also match name
+    pieces sharing enough trigrams with them (typo tolerance). Department
+    and status are kept alongside, so filtering happens before ranking;
+    only the final page is read from the database.
+
+    Loaded on first use; concurrent first searches wait for the one load.
+    Writes through the ORM mark their employees dirty after commit (this
+    worker) or through the invalidation bus (others); dirty employees are
+    re-read before the next search. A bus reset rebuilds the index in the
+    background while searches keep using the current one.
+    """
+
+    name = "memory"
+
+    def __init__(self, similarity: float = 0.3):
+        self.similarity = similarity
+        self.loaded = False
+        self.loads = 0
+        self.refreshes = 0
+        self.searches = 0
+        self._tokens: List[str] = []
+        self._ids: List[int] = []
+        # employee_id -> (first_name, last_name, email, code, department_id, status)
+        self._rows: Dict[int, tuple] = {}
+        self._order: Dict[int, Tuple[str, str, int]] = {}
+        self._words: Counter = Counter()
+        self._grams: Dict[str, Set[str]] = defaultdict(set)
+        self._dirty: Set[int] = set()
+        self._lock = threading.Lock()
+        # Held for a whole load, so a cold worker builds the index once
+        self._load_lock = threading.Lock()
+        self.rebuilding = False
+        self._rebuild_again = False
+        # Employees refreshed on the old snapshot during a rebuild
+        self._redo: Set[int] = set()
+
+    @staticmethod
+    def _columns():
+        E = models.Employee
+        return select(
+            E.employee_id, E.first_name, E.last_name, E.email, E.employee_code, E.department_id, E.employment_status,
+        )
+
+    @staticmethod
+    def _tokenize(first_name: str, last_name: str, email: str, code: str) -> Tuple[Set[str], Set[str]]:
+        first_name, last_name, email, code = (v.lower() for v in (first_name, last_name, email, code))
+        local = email.split("@")[0]
+        words = set()
+        for value in (first_name, last_name, local, code):
+            words.update(w for w in _SPLIT.split(value) if w)
+        # Interned: first and last names repeat across thousands of employees
+        tokens = {sys.intern(t) for t in words | {first_name, last_name, email, local, code}}
+        # Only alphabetic pieces take part in fuzzy matching: codes and
+        # numbers would share trigrams with nearly every employee
+        return tokens, {t for t in tokens if t.isalpha()}
+
+    def ensure(self, conn: Connection) -> None:
+        pass
+
+    def load(self, db: Session) -> None:
+        """Build the index from scratch and swap it in."""
+        with self._load_lock:
+            self._build(db)
+
+    def _build(self, db: Session) -> None:
+        with self._lock:
+            # The read below covers everything marked dirty so far
+            self._dirty.clear()
+            self._redo = set()
+        pairs = []
+        rows, order = {}, {}
+        words: Counter = Counter()
+        for employee_id, *row in db.execute(self._columns()):
+            tokens, fuzzy = self._tokenize(*row[:4])
+            rows[employee_id] = tuple(row)
+            order[employee_id] = (row[1].lower(), row[0].lower(), employee_id)
+            pairs.extend((token, employee_id) for token in tokens)
+            words.update(fuzzy)
+        pairs.sort()
+        grams = defaultdict(set)
+        for word in words:
+            for gram in _trigrams(word):
+                grams[gram].add(word)
+        with self._lock:
+            self._tokens = [token for token, _ in pairs]
+            self._ids = [employee_id for _, employee_id in pairs]
+            self._rows, self._order = rows, order
+            self._words, self._grams = words, grams
+            # Changed while the rows were read: the new snapshot may predate them
+            self._dirty |= self._redo
+            self._redo = set()
+            self.loaded = True
+            self.loads += 1
+
+    def invalidate(self, employee_id: Optional[str] = None) -> None:
+        """Mark one employee (or, with None, the whole index) for re-reading."""
+        with self._lock:
+            if employee_id is not None:
+                self._dirty.add(int(employee_id))
+            elif not self.loaded:
+                pass # The first search loads it
+            elif self.rebuilding:
+                # The running rebuild may have read the rows already
+                self._rebuild_again = True
+            else:
+                self.rebuilding = True
+                threading.Thread(target=self._rebuild, name="employee-search-rebuild", daemon=True).start()
+
+    def _rebuild(self) -> None:
+        try:
+            while True:
+                db = database.ReadSessionLocal()
+                try:
+                    self.load(db)
+                finally:
+                    db.close()
+                with self._lock:
+                    if not self._rebuild_again:
+                        self.rebuilding = False
+                        return
+                    self._rebuild_again = False
+        except Exception:
+            logger.exception("Employee search index rebuild failed; the next search reloads it")
+            with self._lock:
+                self.rebuilding = self._rebuild_again = False
+                self.loaded = False
+
+    def _remove(self, employee_id: int) -> None:
+        row = self._rows.pop(employee_id, None)
+        if row is None:
+            return
+        del self._order[employee_id]
+        tokens, fuzzy = self._tokenize(*row[:4])
+        for token in tokens:
+            i = bisect.bisect_left(self._tokens, token)
+            while i < len(self._tokens) and self._tokens[i] == token:
+                if self._ids[i] == employee_id:
+                    del self._tokens[i]
+                    del self._ids[i]
+                    break
+                i += 1
+        for word in fuzzy:
+            self._words[word] -= 1
+            if self._words[word] <= 0:
+                del self._words[word]
+                for gram in _trigrams(word):
+                    self._grams[gram].discard(word)
+
+    def _add(self, employee_id: int, *row) -> None:
+        tokens, fuzzy = self._tokenize(*row[:4])
+        self._rows[employee_id] = row
+        self._order[employee_id] = (row[1].lower(), row[0].lower(), employee_id)
+        for token in tokens:
+            i = bisect.bisect_left(self._tokens, token)
+            while i < len(self._tokens) and self._tokens[i] == token and self._ids[i] < employee_id:
+                i += 1
+            self._tokens.insert(i, token)
+            self._ids.insert(i, employee_id)
+        for word in fuzzy:
+            if not self._words[word]:
+                for gram in _trigrams(word):
+                    self._grams[gram].add(word)
+            self._words[word] += 1
+
+    def sync(self, db: Session) -> None:
+        """Load the index, or re-read the employees changed since the last search."""
+        if not self.loaded:
+            with self._load_lock:
+                # Loaded by another request while this one waited
+                if not self.loaded:
+                    self._build(db)
+            return
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            if self.rebuilding:
+                self._redo |= dirty
+        if not dirty:
+            return
+        rows = db.execute(self._columns().where(models.Employee.employee_id.in_(dirty))).all()
+        with self._lock:
+            for employee_id in dirty:
+                self._remove(employee_id)
+            for row in rows:
+                self._add(*row)
+            self.refreshes += 1
+
+    def _exact(self, token: str) -> Set[int]:
+        lo = bisect.bisect_left(self._tokens, token)
+        hi = bisect.bisect_right(self._tokens, token)
+        return set(self._ids[lo:hi])
+
+    def _prefixed(self, prefix: str) -> Set[int]:
+        lo = bisect.bisect_left(self._tokens, prefix)
+        hi = bisect.bisect_left(self._tokens, prefix + "\U0010ffff")
+        return set(self._ids[lo:hi])
+
+    def _similar(self, word: str) -> Dict[int, float]:
+        grams = _trigrams(word)
+        shared: Counter = Counter()
+        for gram in grams:
+            shared.update(self._grams.get(gram, ()))
+        scores: Dict[int, float] = {}
+        for candidate, count in shared.items():
+            score = count / (len(grams) + len(_trigrams(candidate)) - count)
+            if score >= self.similarity:
+                for employee_id in self._exact(candidate):
+                    if score > scores.get(employee_id, 0):
+                        scores[employee_id] = score
+        return scores
+
+    def candidates(self, words: List[str], want: int, keep: Optional[Callable[[int], bool]] = None) -> List[int]:
+        """
+        The `want` best matching employee ids that pass `keep`: an exact
+        match on the first word, then prefix matches, then fuzzy matches;
+        ties by last and first name.
+        """
+        with self._lock:
+            self.searches += 1
+            per_word = [self._prefixed(w) for w in words]
+            matched = set.intersection(*per_word)
+            if keep is not None:
+                matched = {i for i in matched if keep(i)}
+            exact = self._exact(words[0])
+            order = self._order
+            ranked = heapq.nsmallest(want, matched, key=lambda i: (i not in exact, order[i]))
+            if len(ranked) >= want:
+                return ranked
+            scores: Dict[int, float] = defaultdict(float)
+            widened = []
+            for word, ids in zip(words, per_word):
+                close = self._similar(word) if len(word) >= 3 and word.isalpha() else {}
+                for employee_id, score in close.items():
+                    scores[employee_id] += score
+                widened.append(ids | close.keys())
+            fuzzy = set.intersection(*widened) - matched
+            if keep is not None:
+                fuzzy = {i for i in fuzzy if keep(i)}
+            ranked.extend(heapq.nsmallest(want - len(ranked), fuzzy, key=lambda i: (-scores[i], order[i])))
+            return ranked
+
+    def search(
+        self, db: Session, query, words: List[str], limit: int,
+        department_id: Optional[int] = None, status: Optional[models.EmploymentStatus] = None,
+        manager_id: Optional[int] = None,
+    ) -> list:
+        self.sync(db)
+        subtree = None
+        if manager_id is not None:
+            closure = models.EmployeeClosure
+            subtree = set(db.execute(
+                select(closure.descendant_id).where(closure.ancestor_id == manager_id, closure.depth > 0)
+            ).scalars())
+        keep = None
+        if department_id is not None or status is not None or subtree is not None:
+            rows = self._rows
+
+            def keep(employee_id: int) -> bool:
+                department, employment_status = rows[employee_id][4:]
+                return (
+                    (department_id is None or department == department_id)
+                    and (status is None or employment_status == status)
+                    and (subtree is None or employee_id in subtree)
+                )
+
+        ranked = self.candidates(words, limit, keep)
+        if not ranked:
+            return []
+        # The filters again, in case this worker hasn't seen a change yet
+        rows = query.filter(
+            models.Employee.employee_id.in_(ranked),
+            *sql_filters(department_id, status, manager_id),
+        ).all()
+        position = {employee_id: i for i, employee_id in enumerate(ranked)}
+        return sorted(rows, key=lambda row: position[row.employee_id])
+
+    def stats(self) -> dict:
+        return {
+            "name": "employee_search",
+            "backend": self.name,
+            "loaded": self.loaded,
+            "rebuilding": self.rebuilding,
+            "employees": len(self._rows),
+            "tokens": len(self._tokens),
+            "dirty": len(self._dirty),
+            "loads": self.loads,
+            "refreshes": self.refreshes,
+            "searches": self.searches,
+        }
+
+def _backend():
+    choice = settings.EMPLOYEE_SEARCH_BACKEND
+    if choice == "auto":
+        choice = "trigram" if database.engine.dialect.name == "postgresql" else "memory"
+    return TrigramSearch() if choice == "trigram" else PrefixIndex()
+
+directory = _backend()
+
+def search(
+    db: Session, query, q: str, limit: int = 10,
+    department_id: Optional[int] = None, status: Optional[models.EmploymentStatus] = None,
+    manager_id: Optional[int] = None,
+) -> list:
+    """
+    Typeahead matches for `q`, best first; `query` selects the columns to
+    return. `manager_id` limits results to that manager's reports, at any
+    depth.
+    """
+    words = query_words(q)
+    if not words:
+        return []
+    return directory.search(
+        db, query, words, limit, department_id=department_id, status=status, manager_id=manager_id,
+    )
+
+def ensure(conn: Connection) -> None:
+    directory.ensure(conn)
+
+# New databases get the index on create; bootstrap_db adds it to existing ones
+event.listen(models.Employee.__table__, "after_create", lambda target, connection, **kw: ensure(connection))
+
+def _invalidate(employee_id: Optional[str]) -> None:
+    if isinstance(directory, PrefixIndex):
+        directory.invalidate(employee_id)
+
+# Other workers' writes arrive through the bus; this worker's own writes
+# are picked up after commit (a rolled back write leaves nothing to refresh)
+bus.subscribe(models.Employee.__tablename__, _invalidate)
+
+def mark_changed(session: Session, employee_ids: Iterable[int]) -> None:
+    """Refresh these employees in this worker's index once `session` commits."""
+    session.info.setdefault("employee_search_dirty", set()).update(employee_ids)
+
+def _stash(mapper, connection, target) -> None:
+    session = object_session(target)
+    if session is not None:
+        mark_changed(session, [target.employee_id])
+
+for _name in ("after_insert", "after_update", "after_delete"):
+    event.listen(models.Employee, _name, _stash)
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    for employee_id in session.info.pop("employee_search_dirty", ()):
+        _invalidate(employee_id)
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop("employee_search_dirty", None)
@@ -0,0 +1,169 @@
+from typing import List, Optional, Tuple
+from sqlalchemy import Integer, column, delete, event, func, insert, inspect, literal, select, true, values
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app import models
+
+class ClosureIndex:
+    """
+    Keeps a closure table in sync with a self-referencing adjacency column
+    so subtree / ancestor questions are one indexed join instead of one
+    round trip per level.
+    """
+
+    def __init__(self, node_model, closure_model, id_attr: str, parent_attr: str):
+        self.node = node_model.__table__
+        self.closure = closure_model.__table__
+        self.id_col = self.node.c[id_attr]
+        self.parent_col = self.node.c[parent_attr]
+        self.id_attr = id_attr
+        self.parent_attr = parent_attr
+
+    # --- maintenance (called from mapper events with the flush connection) ---
+
+    def on_insert(self, conn: Connection, node_id: int, parent_id: Optional[int]) -> None:
+        c = self.closure.c
+        rows = select(literal(node_id), literal(node_id), literal(0))
+        if parent_id is not None:
+            rows = rows.union_all(
+                select(c.ancestor_id, literal(node_id), c.depth + 1).where(c.descendant_id == parent_id)
+            )
+        conn.execute(insert(self.closure).from_select([c.ancestor_id, c.descendant_id, c.depth], rows))
+
+    def on_insert_many(self, conn: Connection, nodes: List[Tuple[int, Optional[int]]]) -> None:
+        """
+        on_insert() for a batch of (node_id, parent_id) in two statements, for
+        bulk inserts that bypass the mapper events. Parents must already be
+        in the tree (not in the same batch).
+        """
+        if not nodes:
+            return
+        c = self.closure.c
+        conn.execute(insert(self.closure), [
+            {"ancestor_id": node_id, "descendant_id": node_id, "depth": 0} for node_id, _ in nodes
+        ])
+        children = [(node_id, parent_id) for node_id, parent_id in nodes if parent_id is not None]
+        if children:
+            batch = values(column("node_id", Integer), column("parent_id", Integer), name="batch").data(children)
+            conn.execute(insert(self.closure).from_select(
+                [c.ancestor_id, c.descendant_id, c.depth],
+                select(c.ancestor_id, batch.c.node_id, c.depth + 1)
+                .join(batch, c.descendant_id == batch.c.parent_id),
+            ))
+
+    def current_parent(self, conn: Connection, node_id: int) -> Optional[int]:
+        c = self.closure.c
+        return conn.execute(
+            select(c.ancestor_id).where(c.descendant_id == node_id, c.depth == 1)
+        ).scalar()
+
+    def on_move(self, conn: Connection, node_id: int, new_parent_id: Optional[int]) -> None:
+        c = self.closure.c
+        # Detach: drop every path from outside the subtree into it
+        conn.execute(
+            delete(self.closure).where(
+                c.descendant_id.in_(select(c.descendant_id).where(c.ancestor_id == node_id)),
+                c.ancestor_id.not_in(select(c.descendant_id).where(c.ancestor_id == node_id)),
+            )
+        )
+        if new_parent_id is None:
+            return
+        # Re-attach: every ancestor of the new parent x every node of the subtree
+        sup = self.closure.alias("sup")
+        sub = self.closure.alias("sub")
+        conn.execute(
+            insert(self.closure).from_select(
+                [c.ancestor_id, c.descendant_id, c.depth],
+                select(sup.c.ancestor_id, sub.c.descendant_id, sup.c.depth + sub.c.depth + 1)
+                .select_from(sup)
+                .join(sub, true())
+                .where(sup.c.descendant_id == new_parent_id, sub.c.ancestor_id == node_id),
+            )
+        )
+
+    def on_delete(self, conn: Connection, node_id: int) -> None:
+        c = self.closure.c
+        conn.execute(delete(self.closure).where((c.ancestor_id == node_id) | (c.descendant_id == node_id)))
+
+    def rebuild(self, db: Session) -> int:
+        """Recompute the whole closure table from the adjacency column (backfill/repair)."""
+        c = self.closure.c
+        tree = select(
+            self.id_col.label("ancestor_id"), self.id_col.label("descendant_id"), literal(0).label("depth")
+        ).cte("tree", recursive=True)
+        child = self.node.alias("child")
+        tree = tree.union_all(
+            select(tree.c.ancestor_id, child.c[self.id_attr], tree.c.depth + 1)
+            .where(child.c[self.parent_attr] == tree.c.descendant_id)
+        )
+        db.execute(delete(self.closure))
+        db.execute(
+            insert(self.closure).from_select(
+                [c.ancestor_id, c.descendant_id, c.depth],
+                select(tree.c.ancestor_id, tree.c.descendant_id, tree.c.depth),
+            )
+        )
+        return db.execute(select(func.count()).select_from(self.closure)).scalar()
+
+    # --- queries ---
+
+    def is_in_subtree(self, db: Session, root_id: int, node_id: int) -> bool:
+        c = self.closure.c
+        return db.execute(
+            select(literal(1)).where(c.ancestor_id == root_id, c.descendant_id == node_id)
+        ).first() is not None
+
+    def subtree_query(self, db: Session, model, root_id: int, include_root: bool = False):
+        c = self.closure.c
+        q = db.query(model).join(self.closure, c.descendant_id == self.id_col).filter(c.ancestor_id == root_id)
+        if not include_root:
+            q = q.filter(c.depth > 0)
+        return q.order_by(c.depth, self.id_col)
+
+    def ancestors_query(self, db: Session, model, node_id: int):
+        # Nearest first: parent, grandparent, ... root
+        c = self.closure.c
+        return (
+            db.query(model)
+            .join(self.closure, c.ancestor_id == self.id_col)
+            .filter(c.descendant_id == node_id, c.depth > 0)
+            .order_by(c.depth)
+        )
+
+departments = ClosureIndex(models.Department, models.DepartmentClosure, "department_id", "parent_department_id")
+employees = ClosureIndex(models.Employee, models.EmployeeClosure, "employee_id", "manager_id")
+
+def department_headcount(db: Session, department_id: int) -> List[tuple]:
+    """(department_id, active headcount) for every department in the subtree, in one grouped query."""
+    c = models.DepartmentClosure
+    e = models.Employee
+    return db.execute(
+        select(c.descendant_id, func.count(e.employee_id))
+        .select_from(c)
+        .outerjoin(e, (e.department_id == c.descendant_id) & (e.is_active.is_(True)))
+        .where(c.ancestor_id == department_id)
+        .group_by(c.descendant_id)
+        .order_by(c.descendant_id)
+    ).all()
+
+def _register(model, index: ClosureIndex) -> None:
+    @event.listens_for(model, "after_insert")
+    def _after_insert(mapper, connection, target):
+        index.on_insert(connection, getattr(target, index.id_attr), getattr(target, index.parent_attr))
+
+    @event.listens_for(model, "after_update")
+    def _after_update(mapper, connection, target):
+        # Most updates leave the parent alone; only a changed one costs a lookup
+        if not inspect(target).attrs[index.parent_attr].history.has_changes():
+            return
+        node_id = getattr(target, index.id_attr)
+        new_parent = getattr(target, index.parent_attr)
+        if index.current_parent(connection, node_id) != new_parent:
+            index.on_move(connection, node_id, new_parent)
+
+    @event.listens_for(model, "after_delete")
+    def _after_delete(mapper, connection, target):
+        index.on_delete(connection, getattr(target, index.id_attr))
+
+_register(models.Department, departments)
+_register(models.Employee, employees)
@@ -0,0 +1,253 @@
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import and_, case, delete, exists, func, insert, inspect, literal, select, text, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app import models, schemas
+
+Balance = models.EmployeeLeaveBalance
+Ledger = models.LeaveLedgerEntry
+
+def _record(db: Session, employee_id: int, leave_type_id: int, year: int,
+            entry_type: models.LeaveLedgerEntryType, days: Decimal,
+            leave_id: Optional[int] = None, created_by: Optional[int] = None) -> None:
+    db.add(Ledger(
+        employee_id=employee_id, leave_type_id=leave_type_id, year=year,
+        entry_type=entry_type, days=days, leave_id=leave_id, created_by=created_by,
+    ))
+
+def ensure_balance(db: Session, employee_id: int, leave_type_id: int, year: int,
+                   created_by: Optional[int] = None) -> None:
+    """Create the year's balance row from the leave type allowance if missing."""
+    present = db.execute(
+        select(Balance.balance_id).where(
+            Balance.employee_id == employee_id,
+            Balance.leave_type_id == leave_type_id,
+            Balance.year == year,
+        )
+    ).first()
+    if present:
+        return
+    leave_type = db.get(models.LeaveType, leave_type_id)
+    if leave_type is None:
+        raise HTTPException(status_code=404, detail="Leave type not found")
+    allowance = Decimal(leave_type.days_per_year or 0)
+    try:
+        # Savepoint: a concurrent request may create the same row first
+        with db.begin_nested():
+            db.add(Balance(
+                employee_id=employee_id, leave_type_id=leave_type_id, year=year,
+                total_days=allowance, used_days=0, remaining_days=allowance, carried_forward=0,
+            ))
+            _record(db, employee_id, leave_type_id, year,
+                    models.LeaveLedgerEntryType.Allocation, allowance, created_by=created_by)
+    except IntegrityError:
+        pass
+
+def ensure_unique_balances(conn: Connection) -> None:
+    """
+    Add the one-balance-per-year unique index to a balance table created
+    before it was declared (create_all leaves existing tables alone). Rows
+    duplicated by the race it guards against are dropped first, keeping
+    the oldest: approvals updated every copy alike, so they agree.
+    """
+    columns = ["employee_id", "leave_type_id", "year"]
+    inspector = inspect(conn)
+    table = Balance.__tablename__
+    if any(c["column_names"] == columns for c in inspector.get_unique_constraints(table)) or any(
+        i["unique"] and i["column_names"] == columns for i in inspector.get_indexes(table)
+    ):
+        return
+    keep = select(func.min(Balance.balance_id)).group_by(Balance.employee_id, Balance.leave_type_id, Balance.year)
+    conn.execute(delete(Balance.__table__).where(Balance.balance_id.not_in(keep)))
+    conn.execute(text(
+        f"CREATE UNIQUE INDEX uq_leave_balance_employee_type_year ON {table} ({', '.join(columns)})"
+    ))
+
+def _apply(db: Session, employee_id: int, leave_type_id: int, year: int, used_delta: Decimal,
+           enforce_remaining: bool) -> bool:
+    # Single conditional UPDATE: concurrent approvals can't both pass the check
+    stmt = (
+        update(Balance)
+        .where(
+            Balance.employee_id == employee_id,
+            Balance.leave_type_id == leave_type_id,
+            Balance.year == year,
+        )
+        .values(
+            used_days=func.coalesce(Balance.used_days, 0) + used_delta,
+            remaining_days=Balance.remaining_days - used_delta,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if enforce_remaining:
+        stmt = stmt.where(Balance.remaining_days >= used_delta)
+    return db.execute(stmt).rowcount == 1
+
+def days_by_year(leave: models.LeaveApplication) -> List[Tuple[int, Decimal]]:
+    """
+    The leave's days per calendar year it touches: a leave from December
+    into January draws on both years' balances. Each year gets its share of
+    the span, up to what is left of total_days; the last year takes the rest.
+    """
+    remaining = Decimal(leave.total_days)
+    years = range(leave.start_date.year, leave.end_date.year + 1)
+    split = []
+    for year in years:
+        if year == years[-1]:
+            days = remaining
+        else:
+            first = max(leave.start_date, date(year, 1, 1))
+            days = min(Decimal((date(year, 12, 31) - first).days + 1), remaining)
+        if days:
+            split.append((year, days))
+        remaining -= days
+    return split
+
+def debit_for_approval(db: Session, leave: models.LeaveApplication, actor_id: Optional[int]) -> None:
+    leave_type = db.get(models.LeaveType, leave.leave_type_id)
+    # Leave types without a yearly allowance are uncapped; just track usage
+    capped = leave_type.days_per_year is not None
+    for year, days in days_by_year(leave):
+        ensure_balance(db, leave.employee_id, leave.leave_type_id, year, created_by=actor_id)
+        if not _apply(db, leave.employee_id, leave.leave_type_id, year, days, enforce_remaining=capped):
+            raise HTTPException(status_code=400, detail=f"Insufficient leave balance for {year}")
+        _record(db, leave.employee_id, leave.leave_type_id, year,
+                models.LeaveLedgerEntryType.Approval, -days, leave_id=leave.leave_id, created_by=actor_id)
+
+def credit_for_reversal(db: Session, leave: models.LeaveApplication, actor_id: Optional[int]) -> None:
+    # Give back exactly what the ledger says was taken, per year, so leaves
+    # approved before they were split by year reverse correctly too
+    taken = db.execute(
+        select(Ledger.year, -func.sum(Ledger.days))
+        .where(
+            Ledger.employee_id == leave.employee_id,
+            Ledger.leave_type_id == leave.leave_type_id,
+            Ledger.leave_id == leave.leave_id,
+            Ledger.entry_type.in_([models.LeaveLedgerEntryType.Approval, models.LeaveLedgerEntryType.Reversal]),
+        )
+        .group_by(Ledger.year)
+        .order_by(Ledger.year)
+    ).all() or days_by_year(leave)
+    for year, days in taken:
+        days = Decimal(days)
+        if days <= 0:
+            continue
+        _apply(db, leave.employee_id, leave.leave_type_id, year, -days, enforce_remaining=False)
+        _record(db, leave.employee_id, leave.leave_type_id, year,
+                models.LeaveLedgerEntryType.Reversal, days, leave_id=leave.leave_id, created_by=actor_id)
+
+def transition(db: Session, leave: models.LeaveApplication, new_status: models.LeaveApplicationStatus,
+               actor_id: Optional[int]) -> None:
+    """
+    Ledger side of a status change. Caller holds the leave row lock and
+    commits, so the status, balance and ledger entry land together.
+    """
+    was_approved = leave.status == models.LeaveApplicationStatus.Approved
+    now_approved = new_status == models.LeaveApplicationStatus.Approved
+    if now_approved and not was_approved:
+        debit_for_approval(db, leave, actor_id)
+    elif was_approved and not now_approved:
+        credit_for_reversal(db, leave, actor_id)
+
+def _upsert_insert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as upsert_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as upsert_insert
+    else:
+        raise NotImplementedError(f"Leave rollover is not supported on {dialect}")
+    return upsert_insert
+
+def rollover(db: Session, year: int, actor_id: Optional[int] = None) -> schemas.LeaveRolloverResult:
+    """
+    Year-end carry forward for everyone at once, in one upsert over active
+    employees x active leave types. A pair without a balance for `year`
+    (nobody opened one: no leave approved) carries the full allowance.
+    Next year's row is created with allowance + carry, or, if an approval
+    already opened it, has the carry added to it. Pairs with a CarryForward
+    ledger entry for next year are skipped, so the job is safe to re-run.
+    """
+    next_year = year + 1
+    e, lt = models.Employee, models.LeaveType
+    allowance = func.coalesce(lt.days_per_year, 0)
+    remaining = func.coalesce(Balance.remaining_days, allowance)
+    cap = func.coalesce(lt.max_carry_forward_days, remaining)
+    carry = case(
+        (and_(lt.carry_forward_allowed.is_(True), remaining > 0),
+         case((remaining < cap, remaining), else_=cap)),
+        else_=0,
+    )
+    carried = exists().where(
+        Ledger.employee_id == e.employee_id,
+        Ledger.leave_type_id == lt.leave_type_id,
+        Ledger.year == next_year,
+        Ledger.entry_type == models.LeaveLedgerEntryType.CarryForward,
+    )
+    source = (
+        select(
+            e.employee_id,
+            lt.leave_type_id,
+            literal(next_year),
+            allowance + carry,
+            literal(0),
+            allowance + carry,
+            carry,
+        )
+        .select_from(e)
+        .join(lt, lt.is_active.is_(True))
+        .outerjoin(Balance, and_(
+            Balance.employee_id == e.employee_id,
+            Balance.leave_type_id == lt.leave_type_id,
+            Balance.year == year,
+        ))
+        .where(e.is_active.is_(True), ~carried)
+    )
+    table = Balance.__table__
+    b = table.c
+    existing = select(func.count()).select_from(table).where(b.year == next_year)
+    before = db.execute(existing).scalar()
+    stmt = _upsert_insert(db)(table).from_select(
+        [b.employee_id, b.leave_type_id, b.year, b.total_days, b.used_days, b.remaining_days, b.carried_forward],
+        source,
+    )
+    # Opened early by an approval: only the carry is new
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[b.employee_id, b.leave_type_id, b.year],
+        set_={
+            "total_days": b.total_days + stmt.excluded.carried_forward,
+            "remaining_days": b.remaining_days + stmt.excluded.carried_forward,
+            "carried_forward": func.coalesce(b.carried_forward, 0) + stmt.excluded.carried_forward,
+        },
+    ))
+    created = db.execute(existing).scalar() - before
+
+    nxt = table.alias("nxt")
+    l = Ledger.__table__.c
+    for entry_type, days in (
+        (models.LeaveLedgerEntryType.Allocation, nxt.c.total_days - nxt.c.carried_forward),
+        (models.LeaveLedgerEntryType.CarryForward, nxt.c.carried_forward),
+    ):
+        ledger_source = select(
+            nxt.c.employee_id, nxt.c.leave_type_id, nxt.c.year,
+            literal(entry_type, l.entry_type.type), days, literal(actor_id, l.created_by.type),
+        ).where(
+            nxt.c.year == next_year,
+            ~exists().where(
+                Ledger.employee_id == nxt.c.employee_id,
+                Ledger.leave_type_id == nxt.c.leave_type_id,
+                Ledger.year == next_year,
+                Ledger.entry_type == entry_type,
+            ),
+        )
+        if entry_type == models.LeaveLedgerEntryType.CarryForward:
+            ledger_source = ledger_source.where(nxt.c.carried_forward > 0)
+        db.execute(insert(Ledger.__table__).from_select(
+            [l.employee_id, l.leave_type_id, l.year, l.entry_type, l.days, l.created_by],
+            ledger_source,
+        ))
+    return schemas.LeaveRolloverResult(from_year=year, to_year=next_year, balances_created=created)
@@ -0,0 +1,157 @@
+import csv
+import io
+from typing import Dict, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from app import models, schemas
+from app.core import security
+from app.core.invalidation import bus
+from app.services import employee_codes, employee_search, hierarchy
+
+# Rows are numbered from 1, as a spreadsheet user would count them
+RowErrors = List[Dict]
+
+def _format_errors(exc: ValidationError) -> List[str]:
+    return [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in exc.errors()]
+
+def parse_csv(text: str) -> Tuple[List[schemas.OnboardingWorkflow], RowErrors]:
+    """One hire per line, columns named like OnboardingWorkflow's fields; blank cells count as missing."""
+    hires, errors = [], []
+    for row_number, row in enumerate(csv.DictReader(io.StringIO(text)), 1):
+        fields = {k.strip(): v.strip() for k, v in row.items() if k and v is not None and v.strip()}
+        try:
+            hires.append(schemas.OnboardingWorkflow(**fields))
+        except ValidationError as exc:
+            errors.append({"row": row_number, "errors": _format_errors(exc)})
+    return hires, errors
+
+def parse_json(items) -> Tuple[List[schemas.OnboardingWorkflow], RowErrors]:
+    if not isinstance(items, list):
+        return [], [{"row": None, "errors": ["Expected a JSON array of hires"]}]
+    hires, errors = [], []
+    for row_number, item in enumerate(items, 1):
+        try:
+            hires.append(schemas.OnboardingWorkflow.model_validate(item))
+        except ValidationError as exc:
+            errors.append({"row": row_number, "errors": _format_errors(exc)})
+    return hires, errors
+
+def check(db: Session, hires: List[schemas.OnboardingWorkflow]) -> RowErrors:
+    """
+    Everything that would make the inserts fail, found up front with one
+    query per kind of check: usernames and emails taken (in the database
+    or earlier in the batch) and unknown departments, positions and roles.
+    """
+    usernames = {h.username for h in hires}
+    emails = {h.email for h in hires}
+    taken_usernames = set(db.execute(
+        select(models.EmployeeSystemAccess.username).where(models.EmployeeSystemAccess.username.in_(usernames))
+    ).scalars())
+    taken_emails = set(db.execute(
+        select(models.Employee.email).where(models.Employee.email.in_(emails))
+    ).scalars())
+    departments = set(db.execute(
+        select(models.Department.department_id)
+        .where(models.Department.department_id.in_({h.department_id for h in hires}))
+    ).scalars())
+    positions = set(db.execute(
+        select(models.JobPosition.position_id)
+        .where(models.JobPosition.position_id.in_({h.position_id for h in hires}))
+    ).scalars())
+    roles = set(db.execute(
+        select(models.UserRole.role_id).where(models.UserRole.role_id.in_({h.role_id for h in hires}))
+    ).scalars())
+
+    errors = []
+    for row_number, hire in enumerate(hires, 1):
+        problems = []
+        if hire.username in taken_usernames:
+            problems.append("Username already taken")
+        if hire.email in taken_emails:
+            problems.append("The employee with this email already exists in the system.")
+        if hire.department_id not in departments:
+            problems.append("Department not found")
+        if hire.position_id not in positions:
+            problems.append("Job Position not found")
+        if hire.role_id not in roles:
+            problems.append("Role not found")
+        if problems:
+            errors.append({"row": row_number, "errors": problems})
+        # Later rows with the same username / email clash with this one
+        taken_usernames.add(hire.username)
+        taken_emails.add(hire.email)
+    return errors
+
+def onboard(db: Session, hires: List[schemas.OnboardingWorkflow], created_by: Optional[int]) -> List[dict]:
+    """
+    Create the Employee, EmployeeSystemAccess and first OnboardingTask rows
+    for every hire with one multi-row INSERT per table. Call check() first;
+    the caller commits.
+    """
+    # Codes first: on SQLite reserving a block is a write of its own, which
+    # has to happen before this session takes the write lock
+    numbers = employee_codes.allocator.take(len(hires))
+    password_hashes = security.get_password_hashes([h.password for h in hires])
+
+    employee_rows = [
+        {
+            "employee_code": employee_codes.format_code(number, hire.date_of_joining),
+            "first_name": hire.first_name,
+            "last_name": hire.last_name,
+            "email": hire.email,
+            "department_id": hire.department_id,
+            "position_id": hire.position_id,
+            "date_of_joining": hire.date_of_joining,
+            "employment_type": hire.employment_type,
+            "employment_status": hire.employment_status,
+            "created_by": created_by,
+        }
+        for number, hire in zip(numbers, hires)
+    ]
+    employee_ids = db.execute(
+        insert(models.Employee).returning(models.Employee.employee_id, sort_by_parameter_order=True),
+        employee_rows,
+    ).scalars().all()
+
+    db.execute(insert(models.EmployeeSystemAccess), [
+        {
+            "employee_id": employee_id,
+            "role_id": hire.role_id,
+            "username": hire.username,
+            "password_hash": password_hash,
+            "is_active": True,
+        }
+        for employee_id, hire, password_hash in zip(employee_ids, hires, password_hashes)
+    ])
+    tasks = [
+        {
+            "employee_id": employee_id,
+            "task_name": hire.task_name,
+            "task_description": hire.task_description,
+            "assigned_to": created_by,
+            "due_date": hire.task_due_date,
+            "status": models.TaskStatus.Pending,
+        }
+        for employee_id, hire in zip(employee_ids, hires)
+        if hire.task_name
+    ]
+    if tasks:
+        db.execute(insert(models.OnboardingTask), tasks)
+
+    # Bulk INSERTs skip the mapper events: do their work here
+    conn = db.connection()
+    hierarchy.employees.on_insert_many(conn, [(employee_id, None) for employee_id in employee_ids])
+    bus.publish_many(conn, models.Employee.__tablename__, employee_ids)
+    employee_search.mark_changed(db, employee_ids)
+
+    return [
+        {
+            "employee_id": employee_id,
+            "employee_code": row["employee_code"],
+            "employee_name": f"{hire.first_name} {hire.last_name}",
+            "email": hire.email,
+            "username": hire.username,
+        }
+        for employee_id, row, hire in zip(employee_ids, employee_rows, hires)
+    ]
@@ -0,0 +1,267 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date
+from typing import List, Optional, Sequence, Tuple
+from sqlalchemy import and_, exists, func, inspect, literal, or_, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app import database, models, schemas
+from app.core.config import settings
+
+def _zero(col):
+    return func.coalesce(col, 0)
+
+def _insert_for(dialect: str):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Batch payroll is not supported on {dialect}")
+    return insert
+
+def build_payroll_insert(
+    department_id: int,
+    period_start: date,
+    period_end: date,
+    processed_by: Optional[int] = None,
+    dialect: str = "postgresql",
+):
+    """
+    INSERT ... SELECT computing one Payroll row per active employee of a
+    department for the pay period, entirely inside the database:
+
+    - salary from the latest SalaryStructure effective during the period
+    - bonuses = sum of Approved Bonus rows dated within the period
+    - overtime_pay = overtime hours in the period * hourly rate * multiplier
+
+    Employees that already have a payroll row for the period are skipped,
+    which is what makes an interrupted run safe to resume. ON CONFLICT DO
+    NOTHING covers rows a concurrent run inserted after that check.
+    """
+    ss = models.SalaryStructure
+    ranked = (
+        select(
+            ss,
+            func.row_number().over(
+                partition_by=ss.employee_id,
+                order_by=(ss.effective_from.desc(), ss.structure_id.desc()),
+            ).label("rn"),
+        )
+        .where(
+            ss.effective_from <= period_end,
+            or_(ss.effective_to.is_(None), ss.effective_to >= period_start),
+        )
+        .subquery()
+    )
+    bonus = (
+        select(models.Bonus.employee_id, func.sum(models.Bonus.amount).label("amount"))
+        .where(
+            models.Bonus.status == models.BonusStatus.Approved,
+            models.Bonus.bonus_date.between(period_start, period_end),
+        )
+        .group_by(models.Bonus.employee_id)
+        .subquery()
+    )
+    overtime = (
+        select(models.Attendance.employee_id, func.sum(_zero(models.Attendance.overtime_hours)).label("hours"))
+        .where(models.Attendance.attendance_date.between(period_start, period_end))
+        .group_by(models.Attendance.employee_id)
+        .subquery()
+    )
+
+    emp = models.Employee
+    basic = ranked.c.basic_salary
+    allowances = (
+        _zero(ranked.c.house_rent_allowance) + _zero(ranked.c.transport_allowance)
+        + _zero(ranked.c.medical_allowance) + _zero(ranked.c.special_allowance)
+        + _zero(ranked.c.other_allowances)
+    )
+    hourly_rate = basic / settings.PAYROLL_STANDARD_MONTHLY_HOURS
+    overtime_pay = func.round(_zero(overtime.c.hours) * hourly_rate * settings.PAYROLL_OVERTIME_MULTIPLIER, 2)
+    bonuses = _zero(bonus.c.amount)
+    gross = basic + allowances + overtime_pay + bonuses
+    tax = _zero(ranked.c.professional_tax) + _zero(ranked.c.income_tax)
+    insurance = _zero(ranked.c.insurance)
+    retirement = _zero(ranked.c.provident_fund)
+    other = _zero(ranked.c.other_deductions)
+    deductions = tax + insurance + retirement + other
+
+    already_paid = exists().where(
+        models.Payroll.employee_id == emp.employee_id,
+        models.Payroll.pay_period_start == period_start,
+        models.Payroll.pay_period_end == period_end,
+    )
+    source = (
+        select(
+            emp.employee_id,
+            literal(period_start, models.Payroll.pay_period_start.type),
+            literal(period_end, models.Payroll.pay_period_end.type),
+            basic,
+            allowances,
+            overtime_pay,
+            bonuses,
+            gross,
+            tax,
+            insurance,
+            retirement,
+            other,
+            deductions,
+            gross - deductions,
+            literal(models.PayrollStatus.Draft, models.Payroll.status.type),
+            literal(processed_by, models.Payroll.processed_by.type),
+        )
+        .join(ranked, and_(ranked.c.employee_id == emp.employee_id, ranked.c.rn == 1))
+        .outerjoin(bonus, bonus.c.employee_id == emp.employee_id)
+        .outerjoin(overtime, overtime.c.employee_id == emp.employee_id)
+        .where(
+            emp.department_id == department_id,
+            emp.employment_status == models.EmploymentStatus.Active,
+            emp.is_active.is_(True),
+            ~already_paid,
+        )
+    )
+    p = models.Payroll.__table__.c
+    return _insert_for(dialect)(models.Payroll.__table__).from_select(
+        [
+            p.employee_id, p.pay_period_start, p.pay_period_end, p.basic_salary,
+            p.allowances, p.overtime_pay, p.bonuses, p.gross_pay,
+            p.tax_deductions, p.insurance_deductions, p.retirement_deductions,
+            p.other_deductions, p.total_deductions, p.net_pay, p.status, p.processed_by,
+        ],
+        source,
+    ).on_conflict_do_nothing(index_elements=[p.employee_id, p.pay_period_start, p.pay_period_end])
+
+def run_department(
+    department_id: int,
+    period_start: date,
+    period_end: date,
+    processed_by: Optional[int] = None,
+) -> Tuple[int, int, float]:
+    """Compute and insert one department's payroll in its own transaction."""
+    started = time.perf_counter()
+    db = database.SessionLocal()
+    try:
+        stmt = build_payroll_insert(department_id, period_start, period_end, processed_by, db.get_bind().dialect.name)
+        result = db.execute(stmt)
+        db.commit()
+        return department_id, result.rowcount or 0, time.perf_counter() - started
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def _init_worker() -> None:
+    # Forked workers must not reuse the parent's pooled connections
+    database.engine.dispose(close=False)
+
+class PayrollPool:
+    """
+    Worker processes for payroll runs, started on first use and kept for
+    the life of the process. Overlapping runs share them, so the number of
+    forked processes stays at `workers` however many runs are requested.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        return self._executor
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+
+pool = PayrollPool(settings.PAYROLL_WORKERS)
+
+def ensure_unique_periods(conn: Connection) -> None:
+    """
+    Add the one-payslip-per-period unique index to a payroll table created
+    before it was declared (create_all leaves existing tables alone), and
+    drop the plain index it replaces. Fails if duplicates already exist.
+    """
+    columns = ["employee_id", "pay_period_start", "pay_period_end"]
+    inspector = inspect(conn)
+    table = models.Payroll.__tablename__
+    if any(c["column_names"] == columns for c in inspector.get_unique_constraints(table)) or any(
+        i["unique"] and i["column_names"] == columns for i in inspector.get_indexes(table)
+    ):
+        return
+    conn.execute(text(
+        f"CREATE UNIQUE INDEX uq_payroll_employee_period ON {table} ({', '.join(columns)})"
+    ))
+    conn.execute(text("DROP INDEX IF EXISTS ix_payroll_employee_period"))
+
+def run_payroll(
+    db: Session,
+    period_start: date,
+    period_end: date,
+    department_ids: Optional[Sequence[int]] = None,
+    workers: Optional[int] = None,
+    processed_by: Optional[int] = None,
+) -> schemas.PayrollRunResult:
+    """
+    Run payroll for every active employee, partitioned by department.
+    Each department commits independently, so re-running the same period
+    after a failure only fills in the departments/employees still missing.
+    `workers` departments run at once on the shared pool (at most its size).
+    """
+    if department_ids is None:
+        department_ids = list(db.execute(
+            select(models.Department.department_id).order_by(models.Department.department_id)
+        ).scalars())
+    workers = min(workers or pool.workers, pool.workers)
+    # SQLite serializes writers, so parallel partitions would only contend
+    if database.engine.dialect.name == "sqlite":
+        workers = 1
+
+    started = time.perf_counter()
+    args = [(d, period_start, period_end, processed_by) for d in department_ids]
+    outcomes: List[Tuple[int, int, float]] = []
+    failed: List[schemas.PayrollRunDepartment] = []
+    if workers > 1 and len(args) > 1:
+        executor = pool.executor()
+        queued, running = list(args), {}
+        while queued or running:
+            while queued and len(running) < workers:
+                a = queued.pop(0)
+                running[executor.submit(run_department, *a)] = a[0]
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                department_id = running.pop(future)
+                try:
+                    outcomes.append(future.result())
+                except Exception as e:
+                    failed.append(schemas.PayrollRunDepartment(department_id=department_id, processed=0, error=str(e)))
+    else:
+        for a in args:
+            try:
+                outcomes.append(run_department(*a))
+            except Exception as e:
+                failed.append(schemas.PayrollRunDepartment(department_id=a[0], processed=0, error=str(e)))
+
+    elapsed = time.perf_counter() - started
+    processed = sum(count for _, count, _ in outcomes)
+    departments = [
+        schemas.PayrollRunDepartment(department_id=d, processed=count, elapsed_seconds=round(secs, 4))
+        for d, count, secs in outcomes
+    ] + failed
+    return schemas.PayrollRunResult(
+        pay_period_start=period_start,
+        pay_period_end=period_end,
+        departments=sorted(departments, key=lambda d: d.department_id),
+        employees_processed=processed,
+        failed_departments=len(failed),
+        elapsed_seconds=round(elapsed, 4),
+        employees_per_second=round(processed / elapsed, 2) if elapsed > 0 else 0.0,
+    )
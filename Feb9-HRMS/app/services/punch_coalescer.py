@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from app import database
+from app.core.config import settings
+from app.services import attendance as attendance_service
+
+logger = logging.getLogger(__name__)
+
+# (kind, employee_id, at, notes), kind is "in" or "out"
+Punch = Tuple[str, int, datetime, Optional[str]]
+
+class PunchCoalescer:
+    """
+    Group commit for check-in / check-out. Requests hand their punch to one
+    writer thread, which collects punches for up to `window` seconds (or
+    `max_batch` punches) and writes them in a single transaction: one
+    multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING for the check-ins,
+    one UPDATE ... RETURNING for the check-outs, one summary refresh and one
+    commit. A shift-start spike then costs a few statements per batch instead
+    of per request, at the price of up to `window` added latency.
+
+    If a batch fails, its punches are retried one transaction each so a bad
+    punch only fails its own request.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], window: float, max_batch: int, timeout: float = 10):
+        self.session_factory = session_factory
+        self.window = window
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.batches = 0
+        self.punches = 0
+        self.largest_batch = 0
+        self.fallbacks = 0
+        self._queue: "queue.Queue[Tuple[Punch, Future]]" = queue.Queue()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="punch-coalescer", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        """Write whatever is queued, then stop the writer thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout)
+            self._thread = None
+
+    def submit(self, kind: str, employee_id: int, at: datetime, notes: Optional[str] = None) -> Future:
+        self.start()
+        future: Future = Future()
+        self._queue.put(((kind, employee_id, at, notes), future))
+        return future
+
+    def punch(self, kind: str, employee_id: int, at: datetime, notes: Optional[str] = None) -> Optional[dict]:
+        """Queue a punch and block until its batch commits; returns the row or None."""
+        try:
+            return self.submit(kind, employee_id, at, notes).result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise _busy()
+
+    async def punch_async(self, kind: str, employee_id: int, at: datetime, notes: Optional[str] = None) -> Optional[dict]:
+        """Same as punch(), but awaits the batch instead of blocking the event loop."""
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(self.submit(kind, employee_id, at, notes)), timeout=self.timeout
+            )
+        except asyncio.TimeoutError:
+            raise _busy()
+
+    # --- writer thread ---
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                batch = [self._queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch: List[Tuple[Punch, Future]]) -> None:
+        db = self.session_factory()
+        try:
+            results = _apply(db, [punch for punch, _ in batch])
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            if len(batch) == 1:
+                batch[0][1].set_exception(exc)
+                return
+            logger.warning("Punch batch of %s failed (%s); retrying one by one", len(batch), exc)
+            self.fallbacks += 1
+            for item in batch:
+                self._write([item])
+            return
+        finally:
+            db.close()
+        self.batches += 1
+        self.punches += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "name": "punch_coalescer",
+            "enabled": self.enabled,
+            "window_ms": self.window * 1000,
+            "queued": self._queue.qsize(),
+            "batches": self.batches,
+            "punches": self.punches,
+            "largest_batch": self.largest_batch,
+            "avg_batch": round(self.punches / self.batches, 1) if self.batches else 0,
+            "fallbacks": self.fallbacks,
+        }
+
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Attendance service is busy, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+def _apply(db: Session, punches: List[Punch]) -> List[Optional[dict]]:
+    results: List[Optional[dict]] = [None] * len(punches)
+
+    # Check-ins first (a check-out in the same batch needs the row); only
+    # the first check-in per employee and day can win
+    first_in = {}
+    for i, (kind, employee_id, at, _) in enumerate(punches):
+        if kind == "in":
+            first_in.setdefault((employee_id, at.date()), i)
+    if first_in:
+        rows = [
+            {"employee_id": punches[i][1], "attendance_date": punches[i][2].date(),
+             "check_in": punches[i][2].time(), "notes": punches[i][3]}
+            for i in first_in.values()
+        ]
+        for row in db.execute(attendance_service.check_in_statement(db, rows)):
+            results[first_in[(row.employee_id, row.attendance_date)]] = dict(row._mapping)
+
+    # Check-outs: one UPDATE per day in the batch; the last punch of an
+    # employee wins and every check-out of theirs gets the final row
+    last_out: Dict[date, dict] = defaultdict(dict)
+    for kind, employee_id, at, notes in punches:
+        if kind == "out":
+            last_out[at.date()][employee_id] = (at.time(), notes)
+    closed = {}
+    for day, day_punches in last_out.items():
+        for row in db.execute(attendance_service.check_out_statement(db, day, day_punches)):
+            closed[(row.employee_id, row.attendance_date)] = dict(row._mapping)
+    for i, (kind, employee_id, at, _) in enumerate(punches):
+        if kind == "out":
+            results[i] = closed.get((employee_id, at.date()))
+
+    written = [(p[1], p[2].date()) for p, r in zip(punches, results) if r is not None]
+    attendance_service.refresh_monthly_summary(db, written)
+    return results
+
+coalescer = PunchCoalescer(
+    database.SessionLocal,
+    window=settings.ATTENDANCE_COALESCE_MS / 1000,
+    max_batch=settings.ATTENDANCE_COALESCE_MAX_BATCH,
+)
@@ -0,0 +1,123 @@
+import hashlib
+import threading
+import time
+from typing import List, Optional
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+from app import models, schemas
+from app.core.config import settings
+from app.core.invalidation import bus
+from app.core.pagination import PageParams, paginate_sorted
+from app.core.serialization import ListSerializer, dumps
+
+class _Snapshot:
+    __slots__ = ("rows", "keys", "etag", "expires_at")
+
+    def __init__(self, rows: list, keys: list, etag: str, expires_at: float):
+        self.rows = rows
+        self.keys = keys
+        self.etag = etag
+        self.expires_at = expires_at
+
+class ReferenceTable:
+    """
+    A small lookup table held entirely in memory and served with a strong
+    ETag. The ETag is a hash of the table's JSON, so it is stable across
+    reloads and worker processes while the data is unchanged, and a matching
+    If-None-Match is answered with 304 before any DB or serialization work.
+    """
+
+    def __init__(self, name: str, schema, model, key_attr: str, ttl: Optional[float] = None):
+        self.name = name
+        self.model = model
+        self.serializer = ListSerializer(schema, model)
+        self.key = getattr(model, key_attr)
+        self.ttl = settings.REFERENCE_CACHE_TTL_SECONDS if ttl is None else ttl
+        self.version = 0
+        self.loads = 0
+        self.hits = 0
+        self.not_modified = 0
+        self._snapshot: Optional[_Snapshot] = None
+        self._lock = threading.Lock()
+
+    def load(self, db: Session) -> _Snapshot:
+        version = self.version
+        rows = self.serializer.query(db).order_by(self.key).all()
+        digest = hashlib.sha256(dumps([tuple(r) for r in rows])).hexdigest()[:32]
+        snapshot = _Snapshot(
+            rows=rows,
+            keys=[getattr(r, self.key.key) for r in rows],
+            etag=f'"{self.name}-{digest}"',
+            expires_at=time.monotonic() + self.ttl,
+        )
+        with self._lock:
+            self.loads += 1
+            # An invalidate() while we were reading means the rows may
+            # already be stale: serve them this once but don't keep them.
+            if self.version == version:
+                self._snapshot = snapshot
+        return snapshot
+
+    def invalidate(self) -> None:
+        """Drop the snapshot; call after committing a write to the table."""
+        with self._lock:
+            self._snapshot = None
+            self.version += 1
+
+    def snapshot(self, db: Session) -> _Snapshot:
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.expires_at <= time.monotonic():
+            return self.load(db)
+        self.hits += 1
+        return snapshot
+
+    def respond(self, request: Request, response: Response, page: PageParams, db: Session) -> Response:
+        snapshot = self.snapshot(db)
+        response.headers["ETag"] = snapshot.etag
+        response.headers["Cache-Control"] = "private, no-cache"
+        if _etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers={"ETag": snapshot.etag, "Cache-Control": "private, no-cache"})
+        rows = paginate_sorted(snapshot.rows, snapshot.keys, page, response, self.key)
+        return self.serializer.render_rows(rows, response)
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "name": f"reference:{self.name}",
+            "size": len(snapshot.rows) if snapshot else 0,
+            "ttl": self.ttl,
+            "version": self.version,
+            "etag": snapshot.etag if snapshot else None,
+            "loads": self.loads,
+            "hits": self.hits,
+            "not_modified": self.not_modified,
+        }
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    candidates = [t.strip() for t in header.split(",")]
+    return any((t[2:] if t.startswith("W/") else t) == etag for t in candidates)
+
+leave_types = ReferenceTable("leave_types", schemas.LeaveType, models.LeaveType, "leave_type_id")
+roles = ReferenceTable("roles", schemas.UserRole, models.UserRole, "role_id")
+departments = ReferenceTable("departments", schemas.Department, models.Department, "department_id")
+job_positions = ReferenceTable("job_positions", schemas.JobPosition, models.JobPosition, "position_id")
+
+TABLES: List[ReferenceTable] = [leave_types, roles, departments, job_positions]
+
+def _subscribe(table: ReferenceTable) -> None:
+    # Writes on other workers; this worker invalidates after its own commit
+    bus.subscribe(table.model.__tablename__, lambda _: table.invalidate())
+
+for _table in TABLES:
+    _subscribe(_table)
+
+def load_all(db: Session) -> None:
+    """Warm every reference table (called once at startup)."""
+    for table in TABLES:
+        table.load(db)
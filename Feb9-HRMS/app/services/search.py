@@ -0,0 +1,214 @@
+import html
+import re
+from typing import Any, Dict, List, Sequence, Tuple
+from sqlalchemy import column, event, func, inspect, literal_column, select, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app import models
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+
+# The database marks hits with these private-use characters; the snippet is
+# HTML-escaped and only then are they turned into <mark> tags, so markup in
+# stored text (applications come from the public /apply form) stays inert
+_HIT_START = "\ue000"
+_HIT_STOP = "\ue001"
+
+# Postgres' default ts_rank weights for A-D, reused as bm25 column weights
+# on SQLite so both backends rank the same fields the same way
+WEIGHTS = {"A": 1.0, "B": 0.4, "C": 0.2, "D": 0.1}
+
+_HEADLINE_OPTIONS = f"StartSel={_HIT_START}, StopSel={_HIT_STOP}, MaxWords=30, MinWords=10, MaxFragments=2"
+
+class SearchIndex:
+    """
+    Full-text index over some text columns of one table, maintained by the
+    database itself so every write path (ORM, bulk SQL, scripts) keeps it
+    current:
+
+    - PostgreSQL: a generated, weighted `search_vector` tsvector column
+      with a GIN index; queries use websearch_to_tsquery, ts_rank_cd and
+      ts_headline.
+    - SQLite (local development): an external-content FTS5 table kept in
+      sync by triggers; queries use MATCH, bm25 and snippet().
+
+    `fields` are (column, weight) pairs, weight "A" (highest) to "D".
+    """
+
+    def __init__(self, model, fields: Sequence[Tuple[str, str]], config: str = "english"):
+        self.model = model
+        self.table = model.__table__
+        self.pk = inspect(model).primary_key[0]
+        self.fields = list(fields)
+        self.config = config
+        self.fts = f"{self.table.name}_fts"
+        # New tables get their index right away; bootstrap_db adds it to existing ones
+        event.listen(self.table, "after_create", lambda target, connection, **kw: self.ensure(connection))
+
+    @property
+    def columns(self) -> List[str]:
+        return [name for name, _ in self.fields]
+
+    def ensure(self, conn: Connection) -> None:
+        """Create the index (and backfill it) if it is missing; safe to re-run."""
+        dialect = conn.dialect.name
+        t = self.table.name
+        if dialect == "postgresql":
+            vector = " || ".join(
+                f"setweight(to_tsvector('{self.config}', coalesce({name}, '')), '{weight}')"
+                for name, weight in self.fields
+            )
+            conn.execute(text(
+                f"ALTER TABLE {t} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS ({vector}) STORED"
+            ))
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{t}_search ON {t} USING GIN (search_vector)"))
+        elif dialect == "sqlite":
+            existed = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": self.fts}
+            ).first()
+            names = ", ".join(self.columns)
+            new = ", ".join(f"new.{name}" for name in self.columns)
+            old = ", ".join(f"old.{name}" for name in self.columns)
+            pk = self.pk.name
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.fts} USING fts5({names}, "
+                f"content='{t}', content_rowid='{pk}', tokenize='porter unicode61')"
+            ))
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {self.fts}_ai AFTER INSERT ON {t} BEGIN "
+                f"INSERT INTO {self.fts}(rowid, {names}) VALUES (new.{pk}, {new}); END"
+            ))
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {self.fts}_ad AFTER DELETE ON {t} BEGIN "
+                f"INSERT INTO {self.fts}({self.fts}, rowid, {names}) VALUES ('delete', old.{pk}, {old}); END"
+            ))
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {self.fts}_au AFTER UPDATE ON {t} BEGIN "
+                f"INSERT INTO {self.fts}({self.fts}, rowid, {names}) VALUES ('delete', old.{pk}, {old}); "
+                f"INSERT INTO {self.fts}(rowid, {names}) VALUES (new.{pk}, {new}); END"
+            ))
+            if not existed:
+                conn.execute(text(f"INSERT INTO {self.fts}({self.fts}) VALUES ('rebuild')"))
+
+    def search(
+        self, db: Session, q: str, filters: Sequence[Any] = (), skip: int = 0, limit: int = 20,
+    ) -> List[Tuple[Any, float, Dict[str, str]]]:
+        """
+        Ranked matches for the user query `q` (web-search syntax: words,
+        "quoted phrases", `or`, `-excluded`), best first, as
+        (instance, rank, highlights) where highlights maps each matching
+        field to an HTML-escaped snippet with the hits wrapped in <mark> tags.
+        """
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            query = func.websearch_to_tsquery(self.config, q)
+            vector = literal_column(f"{self.table.name}.search_vector")
+            rank = func.ts_rank_cd(vector, query)
+            stmt = select(self.model, rank.label("rank")).where(vector.op("@@")(query))
+        elif dialect == "sqlite":
+            match = fts5_query(q)
+            if not match:
+                return []
+            fts = table(self.fts, column("rowid"))
+            weights = [WEIGHTS[weight] for _, weight in self.fields]
+            # bm25() is lower-is-better; negate it so rank sorts like ts_rank
+            rank = -func.bm25(literal_column(self.fts), *weights)
+            stmt = (
+                select(self.model, rank.label("rank"))
+                .join(fts, fts.c.rowid == self.pk)
+                .where(literal_column(self.fts).op("MATCH")(match))
+            )
+        else:
+            raise NotImplementedError(f"Full-text search is not supported on {dialect}")
+
+        rows = db.execute(
+            stmt.where(*filters).order_by(rank.desc(), self.pk).offset(skip).limit(limit)
+        ).all()
+        if not rows:
+            return []
+        highlights = self._highlights(db, dialect, q, [getattr(obj, self.pk.key) for obj, _ in rows])
+        return [
+            (obj, float(score), highlights.get(getattr(obj, self.pk.key), {}))
+            for obj, score in rows
+        ]
+
+    def _highlights(self, db: Session, dialect: str, q: str, ids: List[int]) -> Dict[int, Dict[str, str]]:
+        # Only for the page being returned: snippets are the expensive part
+        if dialect == "postgresql":
+            query = func.websearch_to_tsquery(self.config, q)
+            stmt = select(self.pk, *[
+                func.ts_headline(self.config, func.coalesce(self.table.c[name], ""), query, _HEADLINE_OPTIONS)
+                for name in self.columns
+            ]).where(self.pk.in_(ids))
+        else:
+            fts = table(self.fts, column("rowid"))
+            stmt = select(fts.c.rowid, *[
+                func.snippet(literal_column(self.fts), i, _HIT_START, _HIT_STOP, "…", 16)
+                for i in range(len(self.columns))
+            ]).where(literal_column(self.fts).op("MATCH")(fts5_query(q)), fts.c.rowid.in_(ids))
+        result = {}
+        for row in db.execute(stmt):
+            result[row[0]] = {
+                name: _to_html(snippet)
+                for name, snippet in zip(self.columns, row[1:])
+                if snippet and _HIT_START in snippet
+            }
+        return result
+
+def _to_html(snippet: str) -> str:
+    return html.escape(snippet).replace(_HIT_START, HIGHLIGHT_START).replace(_HIT_STOP, HIGHLIGHT_STOP)
+
+_TOKEN = re.compile(r'(-?)"([^"]*)"|(\S+)')
+
+def fts5_query(q: str) -> str:
+    """
+    Translate web-search syntax into an FTS5 MATCH expression. Every term is
+    quoted, so user input can never be a syntax error; `or` becomes OR and a
+    leading `-` becomes NOT. Returns "" when there is nothing to match.
+    """
+    positive: List[str] = []
+    negative: List[str] = []
+    pending_or = False
+    for excluded, phrase, word in _TOKEN.findall(q):
+        if word and word.lower() == "or":
+            pending_or = bool(positive)
+            continue
+        if word.startswith("-") and len(word) > 1:
+            excluded, word = "-", word[1:]
+        term = (phrase if phrase or not word else word).replace('"', "").strip()
+        # Punctuation alone tokenizes to nothing and would match no row
+        if not re.search(r"\w", term):
+            continue
+        quoted = f'"{term}"'
+        if excluded:
+            negative.append(quoted)
+        elif pending_or:
+            positive[-1] = f"{positive[-1]} OR {quoted}"
+            pending_or = False
+        else:
+            positive.append(quoted)
+    if not positive:
+        return ""
+    expr = " AND ".join(f"({p})" if " OR " in p else p for p in positive)
+    return " NOT ".join([expr] + negative)
+
+postings = SearchIndex(models.JobPosting, [
+    ("job_title", "A"),
+    ("requirements", "B"),
+    ("job_description", "C"),
+])
+applications = SearchIndex(models.JobApplication, [
+    ("first_name", "A"),
+    ("last_name", "A"),
+    ("current_position", "A"),
+    ("current_company", "B"),
+    ("cover_letter", "C"),
+])
+
+INDEXES = [postings, applications]
+
+def ensure_all(conn: Connection) -> None:
+    for index in INDEXES:
+        index.ensure(conn)
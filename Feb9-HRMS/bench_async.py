@@ -0,0 +1,112 @@
+import sys
+import os
+import argparse
+import asyncio
+import statistics
+import subprocess
+import time
+import httpx
+
+PATHS = ["/employees/", "/attendance/history"]
+
+def start_server(port: int, async_mode: bool) -> subprocess.Popen:
+    env = dict(os.environ, DB_ASYNC="1" if async_mode else "0")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+        stdin=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Server exited with code {proc.returncode}")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("Server did not start")
+
+async def run_level(base: str, headers: dict, concurrency: int, duration: float) -> dict:
+    latencies = []
+    errors = 0
+    stop_at = time.perf_counter() + duration
+
+    async def worker(client: httpx.AsyncClient, n: int):
+        nonlocal errors
+        i = n
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            try:
+                r = await client.get(PATHS[i % len(PATHS)], headers=headers, params={"limit": 20})
+                if r.status_code != 200:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+            i += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=30) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client, n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0,
+    }
+
+def bench(port: int, async_mode: bool, levels, duration: float, username: str, password: str) -> list:
+    proc = start_server(port, async_mode)
+    base = f"http://127.0.0.1:{port}"
+    try:
+        r = httpx.post(f"{base}/auth/login", json={"username": username, "password": password})
+        r.raise_for_status()
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        return [asyncio.run(run_level(base, headers, c, duration)) for c in levels]
+    finally:
+        proc.terminate()
+        proc.wait()
+
+def ceiling(results: list) -> int:
+    # Highest concurrency that still added >5% throughput without errors
+    best = results[0]
+    for r in results[1:]:
+        if r["errors"] or r["rps"] < best["rps"] * 1.05:
+            break
+        best = r
+    return best["concurrency"]
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sync vs async (DB_ASYNC) request handling under load.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--levels", default="1,8,32,64,128", help="Comma-separated concurrency steps")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per step")
+    parser.add_argument("--username", default="admin1")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--mode", choices=["sync", "async", "both"], default="both")
+    args = parser.parse_args()
+
+    levels = [int(x) for x in args.levels.split(",")]
+    modes = [False, True] if args.mode == "both" else [args.mode == "async"]
+    for async_mode in modes:
+        label = "async" if async_mode else "sync"
+        results = bench(args.port, async_mode, levels, args.duration, args.username, args.password)
+        print(f"\n== {label} ==")
+        print(f"{'conc':>6} {'req':>8} {'err':>6} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+        for r in results:
+            print(f"{r['concurrency']:>6} {r['requests']:>8} {r['errors']:>6} {r['rps']:>9.1f} "
+                  f"{r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f}")
+        print(f"Concurrency ceiling ({label}): {ceiling(results)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.path.append(os.getcwd())
+    sys.exit(main())
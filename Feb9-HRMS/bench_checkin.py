@@ -0,0 +1,163 @@
+import sys
+import os
+import argparse
+import asyncio
+import statistics
+import subprocess
+import time
+from datetime import date
+import httpx
+from sqlalchemy import delete, func, select
+from app import models, database
+from app.core import security
+
+ACCOUNT_PREFIX = "bench"
+WARMUP_STEP = 10
+
+def ensure_accounts(count: int) -> list:
+    """Bench employees with logins (created once); returns their usernames."""
+    db = database.SessionLocal()
+    try:
+        existing = db.execute(
+            select(func.count()).select_from(models.EmployeeSystemAccess)
+            .where(models.EmployeeSystemAccess.username.like(f"{ACCOUNT_PREFIX}%"))
+        ).scalar()
+        if existing < count:
+            role = db.query(models.UserRole).filter(models.UserRole.role_name == "Employee").one()
+            dept = db.query(models.Department).filter(models.Department.department_code == "HQ-000").one()
+            pos = db.query(models.JobPosition).filter(models.JobPosition.position_code == "CEO-001").one()
+            for n in range(existing, count):
+                code = f"{n:05d}"
+                employee = models.Employee(
+                    employee_code=f"BENCH-{code}", first_name="Bench", last_name=code,
+                    email=f"{ACCOUNT_PREFIX}{code}@hrms.test", department_id=dept.department_id,
+                    position_id=pos.position_id, date_of_joining=date.today(),
+                    employment_type="Full-time", employment_status="Active",
+                )
+                # Tokens are minted below, so the password hash is never checked
+                employee.system_access = models.EmployeeSystemAccess(
+                    role_id=role.role_id, username=f"{ACCOUNT_PREFIX}{code}", password_hash="!", is_active=True,
+                )
+                db.add(employee)
+            db.commit()
+        return [f"{ACCOUNT_PREFIX}{n:05d}" for n in range(count)]
+    finally:
+        db.close()
+
+def reset_today():
+    """Delete today's attendance for the bench accounts so every check-in is new."""
+    db = database.SessionLocal()
+    try:
+        bench_ids = select(models.Employee.employee_id).where(models.Employee.employee_code.like("BENCH-%"))
+        db.execute(delete(models.Attendance).where(
+            models.Attendance.attendance_date == date.today(),
+            models.Attendance.employee_id.in_(bench_ids),
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+def start_server(port: int, env_overrides: dict, workers: int) -> subprocess.Popen:
+    env = dict(os.environ, **env_overrides)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning",
+         "--workers", str(workers), "--backlog", "4096"],
+        env=env,
+        stdin=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Server exited with code {proc.returncode}")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("Server did not start")
+
+async def spike(client: httpx.AsyncClient, path: str, tokens: list) -> dict:
+    """Every client punches at once, the way badge readers do at 9:00."""
+    latencies = []
+    errors = 0
+
+    async def one(token: str):
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            r = await client.post(path, headers={"Authorization": f"Bearer {token}"})
+            if r.status_code != 200:
+                errors += 1
+        except httpx.HTTPError:
+            errors += 1
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(t) for t in tokens))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "punches": len(tokens),
+        "errors": errors,
+        "per_sec": len(tokens) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+async def run_rounds(base: str, tokens: list, rounds: int) -> list:
+    limits = httpx.Limits(max_connections=len(tokens), max_keepalive_connections=len(tokens))
+    results = []
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=120) as client:
+        # Warm the principal cache and the connections outside the measurement
+        # (in small steps: thousands of cold logins at once would only
+        # measure the connection pool)
+        for i in range(0, len(tokens), WARMUP_STEP):
+            await asyncio.gather(*(client.get("/attendance/summary?year=2000&month=1",
+                                              headers={"Authorization": f"Bearer {t}"})
+                                   for t in tokens[i:i + WARMUP_STEP]))
+        for _ in range(rounds):
+            await asyncio.to_thread(reset_today)
+            check_in = await spike(client, "/attendance/check-in", tokens)
+            check_out = await spike(client, "/attendance/check-out", tokens)
+            results.append((check_in, check_out))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Check-in/check-out throughput when every client punches at once.")
+    parser.add_argument("--clients", type=int, default=2000, help="Concurrent clients (one employee each)")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--workers", type=int, default=1, help="Uvicorn worker processes")
+    parser.add_argument("--coalesce-ms", default="0,5", help="Comma-separated ATTENDANCE_COALESCE_MS values to compare")
+    parser.add_argument("--async-db", action="store_true", help="Serve with DB_ASYNC=1")
+    args = parser.parse_args()
+
+    usernames = ensure_accounts(args.clients)
+    tokens = [security.create_access_token(u) for u in usernames]
+    print(f"{args.clients} clients, {args.rounds} rounds, workers={args.workers}, "
+          f"DB_ASYNC={int(args.async_db)}")
+    print(f"{'coalesce':>9} {'phase':>10} {'punch/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for window in args.coalesce_ms.split(","):
+        env = {
+            "ATTENDANCE_COALESCE_MS": window,
+            "DB_ASYNC": "1" if args.async_db else "0",
+            # Keep the warmed principals for the whole run: measure punches, not logins
+            "PRINCIPAL_CACHE_TTL_SECONDS": "3600",
+        }
+        proc = start_server(args.port, env, args.workers)
+        try:
+            results = asyncio.run(run_rounds(f"http://127.0.0.1:{args.port}", tokens, args.rounds))
+        finally:
+            proc.terminate()
+            proc.wait()
+        for phase, index in (("check-in", 0), ("check-out", 1)):
+            runs = [r[index] for r in results]
+            print(f"{window + ' ms':>9} {phase:>10} {statistics.median(r['per_sec'] for r in runs):>9.1f} "
+                  f"{statistics.median(r['p50_ms'] for r in runs):>9.1f} "
+                  f"{statistics.median(r['p99_ms'] for r in runs):>9.1f} {sum(r['errors'] for r in runs):>7}")
+    return 0
+
+if __name__ == "__main__":
+    sys.path.append(os.getcwd())
+    sys.exit(main())
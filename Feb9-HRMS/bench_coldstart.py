@@ -0,0 +1,81 @@
+import sys
+import os
+import argparse
+import statistics
+import subprocess
+import time
+import httpx
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+
+def measure_import(runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET], capture_output=True, text=True, check=True,
+        )
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return samples
+
+def measure_start(port: int, username: str, password: str) -> dict:
+    base = f"http://127.0.0.1:{port}"
+    spawned = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        stdin=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"Server exited with code {proc.returncode}")
+            if time.perf_counter() - spawned > 60:
+                raise RuntimeError("Server did not start")
+            try:
+                if httpx.get(f"{base}/", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                time.sleep(0.02)
+        ready = time.perf_counter() - spawned
+
+        with httpx.Client(base_url=base) as client:
+            token = client.post("/auth/login", json={"username": username, "password": password}).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            started = time.perf_counter()
+            client.get("/employees/", headers=headers).raise_for_status()
+            first = time.perf_counter() - started
+            started = time.perf_counter()
+            client.get("/employees/", headers=headers).raise_for_status()
+            second = time.perf_counter() - started
+            phases = client.get("/admin/startup", headers=headers).json()
+    finally:
+        proc.terminate()
+        proc.wait()
+    return {"ready": ready, "first": first, "second": second, "server": phases}
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start cost: import time, time-to-ready and first-request latency.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--username", default="admin1")
+    parser.add_argument("--password", default="admin123")
+    args = parser.parse_args()
+
+    imports = measure_import(args.runs)
+    print(f"import app.main:        median {statistics.median(imports) * 1000:8.1f} ms  "
+          f"(min {min(imports) * 1000:.1f}, max {max(imports) * 1000:.1f}, n={len(imports)})")
+
+    starts = [measure_start(args.port, args.username, args.password) for _ in range(args.runs)]
+    for label, key in (("time to ready", "ready"), ("first request", "first"), ("second request", "second")):
+        values = [s[key] for s in starts]
+        print(f"{label + ':':<23} median {statistics.median(values) * 1000:8.1f} ms  "
+              f"(min {min(values) * 1000:.1f}, max {max(values) * 1000:.1f})")
+    last = starts[-1]["server"]
+    print("server-side phases (last run):")
+    for name, secs in last["phases"].items():
+        print(f"  {name:<21} {secs * 1000:8.1f} ms")
+    print(f"  {'time_to_ready':<21} {(last['time_to_ready_seconds'] or 0) * 1000:8.1f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.path.append(os.getcwd())
+    sys.exit(main())
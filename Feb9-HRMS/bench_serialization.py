@@ -0,0 +1,78 @@
+import sys
+import os
+import argparse
+import json
+import time
+from datetime import date, datetime, time as dtime
+from decimal import Decimal
+from fastapi.encoders import jsonable_encoder
+from app import models, schemas
+from app.core.serialization import ListSerializer, dumps
+
+def make_employee(i: int) -> models.Employee:
+    return models.Employee(
+        employee_id=i, employee_code=f"EMP-{i:06d}", first_name="Asha", last_name=f"Rao{i}",
+        email=f"asha.rao{i}@example.com", phone="+91-9800000000", date_of_birth=date(1990, 5, 17),
+        gender=models.Gender.Female, department_id=1 + i % 20, position_id=1 + i % 50, manager_id=i // 10 or None,
+        employment_type=models.EmploymentType.FullTime, employment_status=models.EmploymentStatus.Active,
+        date_of_joining=date(2020, 1, 1), city="Pune", state="MH", country="India",
+        is_active=True, created_at=datetime(2024, 1, 1, 9, 30), updated_at=datetime(2025, 6, 1, 12, 0),
+    )
+
+def make_attendance(i: int) -> models.Attendance:
+    return models.Attendance(
+        attendance_id=i, employee_id=1 + i % 1000, attendance_date=date(2026, 1, 1 + i % 28),
+        check_in=dtime(9, 2, 11), check_out=dtime(18, 15, 40), work_hours=Decimal("9.22"),
+        overtime_hours=Decimal("1.22"), status=models.AttendanceStatus.Present, location="HQ",
+    )
+
+def make_leave(i: int) -> models.LeaveApplication:
+    return models.LeaveApplication(
+        leave_id=i, employee_id=1 + i % 1000, leave_type_id=1 + i % 5, start_date=date(2026, 3, 2),
+        end_date=date(2026, 3, 4), total_days=Decimal("3.0"), reason="Family function",
+        status=models.LeaveApplicationStatus.Pending, applied_on=datetime(2026, 2, 20, 10, 5),
+    )
+
+def stdlib_path(schema, objs) -> bytes:
+    # What FastAPI does for a response_model list with the default JSONResponse
+    validated = [schema.model_validate(o) for o in objs]
+    return json.dumps(jsonable_encoder(validated), separators=(",", ":")).encode()
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-row JSON serialization cost for list endpoints.")
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per page")
+    parser.add_argument("--repeat", type=int, default=20, help="Best of N runs")
+    args = parser.parse_args()
+
+    cases = [
+        ("Employee", schemas.Employee, models.Employee, make_employee),
+        ("Attendance", schemas.Attendance, models.Attendance, make_attendance),
+        ("LeaveApplication", schemas.LeaveApplication, models.LeaveApplication, make_leave),
+    ]
+    print(f"{'schema':<18} {'stdlib us/row':>14} {'adapter us/row':>15} {'rows us/row':>12} {'speedup':>8}")
+    for name, schema, model, factory in cases:
+        serializer = ListSerializer(schema, model)
+        objs = [factory(i) for i in range(1, args.rows + 1)]
+        rows = [tuple(getattr(o, f) for f in serializer.fields) for o in objs]
+        fields = serializer.fields
+
+        before = timed(lambda: stdlib_path(schema, objs), args.repeat)
+        adapter = timed(lambda: serializer.adapter.dump_json(
+            serializer.adapter.validate_python(objs, from_attributes=True)), args.repeat)
+        direct = timed(lambda: dumps([dict(zip(fields, r)) for r in rows]), args.repeat)
+        per = lambda secs: secs / args.rows * 1e6
+        print(f"{name:<18} {per(before):>14.2f} {per(adapter):>15.2f} {per(direct):>12.2f} "
+              f"{before / direct:>7.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.path.append(os.getcwd())
+    sys.exit(main())
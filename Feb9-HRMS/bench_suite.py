@@ -0,0 +1,423 @@
+import sys
+import os
+import argparse
+import asyncio
+import json
+import math
+import random
+import subprocess
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+import httpx
+from sqlalchemy import delete, func, select
+from app import models, database
+from app.core import security
+
+SCENARIOS = ["login", "checkin", "employees", "leave", "payroll"]
+# Leave and payroll write into a far-off period of their own, cleared before each run
+BENCH_YEAR = 2099
+PAYROLL_PERIOD = (date(BENCH_YEAR, 1, 1), date(BENCH_YEAR, 1, 31))
+SEARCH_PREFIXES = ["ma", "jo", "sm", "pat", "li", "wan", "ana", "kum", "chen", "ros"]
+
+# --- fixtures ---
+
+def synthetic_accounts(count: int) -> List[dict]:
+    """Active generate_data.py logins, spread over the organisation; empty when none were loaded."""
+    db = database.SessionLocal()
+    try:
+        access = models.EmployeeSystemAccess
+        rows = db.execute(
+            select(access.username, access.employee_id)
+            .where(access.username.like("syn%"), access.is_active.is_(True))
+            .order_by(access.employee_id)
+        ).all()
+    finally:
+        db.close()
+    step = max(1, len(rows) // max(count, 1))
+    return [{"username": u, "employee_id": e} for u, e in rows[::step][:count]]
+
+def reset_today(employee_ids: List[int]) -> None:
+    """Delete today's attendance for the storm accounts so every check-in is new."""
+    db = database.SessionLocal()
+    try:
+        db.execute(delete(models.Attendance).where(
+            models.Attendance.attendance_date == date.today(),
+            models.Attendance.employee_id.in_(employee_ids),
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+def reset_bench_leave() -> None:
+    db = database.SessionLocal()
+    try:
+        bench_leaves = select(models.LeaveApplication.leave_id).where(
+            models.LeaveApplication.start_date >= date(BENCH_YEAR, 1, 1)
+        )
+        db.execute(delete(models.LeaveLedgerEntry).where(models.LeaveLedgerEntry.year == BENCH_YEAR))
+        db.execute(delete(models.EmployeeLeaveBalance).where(models.EmployeeLeaveBalance.year == BENCH_YEAR))
+        db.execute(delete(models.LeaveApplication).where(models.LeaveApplication.leave_id.in_(bench_leaves)))
+        db.commit()
+    finally:
+        db.close()
+
+def reset_bench_payroll() -> None:
+    db = database.SessionLocal()
+    try:
+        db.execute(delete(models.Payroll).where(
+            models.Payroll.pay_period_start == PAYROLL_PERIOD[0],
+            models.Payroll.pay_period_end == PAYROLL_PERIOD[1],
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+def leave_type_id(code: str = "AL") -> int:
+    db = database.SessionLocal()
+    try:
+        found = db.execute(select(models.LeaveType.leave_type_id).where(models.LeaveType.leave_code == code)).scalar()
+        if found is None:
+            raise RuntimeError(f"No leave type {code}: load data with generate_data.py first")
+        return found
+    finally:
+        db.close()
+
+def payroll_departments(count: int) -> List[int]:
+    """The `count` departments with the most employees."""
+    db = database.SessionLocal()
+    try:
+        return list(db.execute(
+            select(models.Employee.department_id).group_by(models.Employee.department_id)
+            .order_by(func.count().desc(), models.Employee.department_id).limit(count)
+        ).scalars())
+    finally:
+        db.close()
+
+# --- measurement ---
+
+class Recorder:
+    """Latencies and errors per route label ("GET /employees/{id}")."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def call(self, client: httpx.AsyncClient, route: str, method: str, url: str,
+                   expect=(200,), **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            r = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            r = None
+        self.latencies[route].append(time.perf_counter() - started)
+        if r is None or r.status_code not in expect:
+            self.errors[route] += 1
+            return None
+        return r
+
+    def summary(self, elapsed: float) -> dict:
+        routes = {}
+        for route, samples in sorted(self.latencies.items()):
+            samples.sort()
+            routes[route] = {
+                "requests": len(samples),
+                "errors": self.errors[route],
+                "rps": round(len(samples) / elapsed, 2),
+                "p50_ms": round(percentile(samples, 50) * 1000, 2),
+                "p95_ms": round(percentile(samples, 95) * 1000, 2),
+                "p99_ms": round(percentile(samples, 99) * 1000, 2),
+            }
+        total = sum(r["requests"] for r in routes.values())
+        return {
+            "requests": total,
+            "errors": sum(r["errors"] for r in routes.values()),
+            "elapsed_seconds": round(elapsed, 2),
+            "rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "routes": routes,
+        }
+
+def percentile(sorted_samples: List[float], p: float) -> float:
+    # Nearest rank, so p99 of a short run is an observed latency
+    if not sorted_samples:
+        return 0.0
+    return sorted_samples[min(len(sorted_samples), math.ceil(len(sorted_samples) * p / 100)) - 1]
+
+async def for_duration(duration: float, concurrency: int, step) -> float:
+    """Run step(worker, iteration) in `concurrency` loops until `duration` runs out; returns elapsed."""
+    stop_at = time.perf_counter() + duration
+
+    async def loop(worker: int):
+        i = 0
+        while time.perf_counter() < stop_at:
+            await step(worker, i)
+            i += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(loop(w) for w in range(concurrency)))
+    return time.perf_counter() - started
+
+def bearer(username: str) -> dict:
+    return {"Authorization": f"Bearer {security.create_access_token(username)}"}
+
+# --- scenarios ---
+
+async def scenario_login(client, ctx, rec: Recorder) -> float:
+    accounts = ctx["accounts"]
+
+    async def step(worker, i):
+        account = accounts[(worker + i * ctx["concurrency"]) % len(accounts)]
+        await rec.call(client, "POST /auth/login", "POST", "/auth/login",
+                       json={"username": account["username"], "password": ctx["password"]})
+        client.cookies.clear()
+
+    return await for_duration(ctx["duration"], ctx["concurrency"], step)
+
+async def scenario_checkin(client, ctx, rec: Recorder) -> float:
+    """Every account punches in at once, then out at once, the way badge readers do at 9:00."""
+    accounts = ctx["accounts"][:ctx["storm_size"]]
+    headers = [bearer(a["username"]) for a in accounts]
+    ids = [a["employee_id"] for a in accounts]
+    # Warm the principal cache outside the measurement
+    for i in range(0, len(headers), 10):
+        await asyncio.gather(*(client.get("/attendance/summary?year=2000&month=1", headers=h)
+                               for h in headers[i:i + 10]))
+    elapsed = 0.0
+    for _ in range(ctx["rounds"]):
+        await asyncio.to_thread(reset_today, ids)
+        started = time.perf_counter()
+        await asyncio.gather(*(rec.call(client, "POST /attendance/check-in", "POST", "/attendance/check-in", headers=h)
+                               for h in headers))
+        await asyncio.gather(*(rec.call(client, "POST /attendance/check-out", "POST", "/attendance/check-out", headers=h)
+                               for h in headers))
+        elapsed += time.perf_counter() - started
+    return elapsed
+
+async def scenario_employees(client, ctx, rec: Recorder) -> float:
+    """Browse the directory: a few keyset pages, one profile, one typeahead."""
+    headers = ctx["admin"]
+    accounts = ctx["accounts"]
+
+    async def step(worker, i):
+        rng = random.Random(worker * 1_000_003 + i)
+        params = {"limit": 50}
+        for _ in range(3):
+            r = await rec.call(client, "GET /employees/", "GET", "/employees/", headers=headers, params=params)
+            cursor = r.headers.get("X-Next-Cursor") if r is not None else None
+            if not cursor:
+                break
+            params = {"limit": 50, "cursor": cursor}
+        employee_id = rng.choice(accounts)["employee_id"]
+        await rec.call(client, "GET /employees/{id}", "GET", f"/employees/{employee_id}", headers=headers)
+        await rec.call(client, "GET /employees/search", "GET", "/employees/search", headers=headers,
+                       params={"q": rng.choice(SEARCH_PREFIXES)})
+
+    return await for_duration(ctx["duration"], ctx["concurrency"], step)
+
+async def scenario_leave(client, ctx, rec: Recorder) -> float:
+    """Employees apply for a day off in BENCH_YEAR and an admin approves each application."""
+    await asyncio.to_thread(reset_bench_leave)
+    accounts = ctx["accounts"]
+    headers = [bearer(a["username"]) for a in accounts]
+    type_id = await asyncio.to_thread(leave_type_id)
+    first_day = date(BENCH_YEAR, 1, 1)
+
+    async def step(worker, i):
+        n = worker + i * ctx["concurrency"]
+        account = n % len(accounts)
+        # Each account's nth leave lands on a different day, so allowances last the whole run
+        day = first_day + timedelta(days=(n // len(accounts)) % 365)
+        r = await rec.call(client, "POST /leave/apply", "POST", "/leave/apply", headers=headers[account], json={
+            "employee_id": accounts[account]["employee_id"], "leave_type_id": type_id,
+            "start_date": day.isoformat(), "end_date": day.isoformat(), "reason": "Benchmark",
+        })
+        if r is not None:
+            await rec.call(client, "PUT /leave/{id}/status", "PUT", f"/leave/{r.json()['leave_id']}/status",
+                           headers=ctx["admin"], params={"status": "Approved"})
+
+    return await for_duration(ctx["duration"], ctx["concurrency"], step)
+
+async def scenario_payroll(client, ctx, rec: Recorder) -> float:
+    """Sequential full runs of the payroll engine over the largest departments."""
+    departments = await asyncio.to_thread(payroll_departments, ctx["payroll_departments"])
+    elapsed = 0.0
+    for _ in range(ctx["rounds"]):
+        await asyncio.to_thread(reset_bench_payroll)
+        started = time.perf_counter()
+        await rec.call(client, "POST /payroll/run", "POST", "/payroll/run", headers=ctx["admin"], json={
+            "pay_period_start": PAYROLL_PERIOD[0].isoformat(), "pay_period_end": PAYROLL_PERIOD[1].isoformat(),
+            "department_ids": departments,
+        })
+        elapsed += time.perf_counter() - started
+    return elapsed
+
+RUNNERS = {
+    "login": scenario_login,
+    "checkin": scenario_checkin,
+    "employees": scenario_employees,
+    "leave": scenario_leave,
+    "payroll": scenario_payroll,
+}
+
+# --- server, baselines ---
+
+def start_server(port: int, workers: int, env_overrides: dict) -> subprocess.Popen:
+    env = dict(os.environ, **env_overrides)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning",
+         "--workers", str(workers), "--backlog", "4096"],
+        env=env,
+        stdin=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Server exited with code {proc.returncode}")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("Server did not start")
+
+async def run_scenarios(base: str, names: List[str], ctx: dict) -> Dict[str, dict]:
+    limits = httpx.Limits(max_connections=ctx["storm_size"] + ctx["concurrency"],
+                          max_keepalive_connections=ctx["storm_size"] + ctx["concurrency"])
+    results = {}
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=300) as client:
+        for name in names:
+            rec = Recorder()
+            elapsed = await RUNNERS[name](client, ctx, rec)
+            results[name] = rec.summary(elapsed)
+    return results
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Regressions of the current run against a baseline, route by route: p95
+    latency up or throughput down by more than `threshold` (a fraction), or
+    errors where the baseline had none. Routes missing from either side are
+    not compared.
+    """
+    regressions = []
+    for scenario, result in current["scenarios"].items():
+        base_routes = baseline.get("scenarios", {}).get(scenario, {}).get("routes", {})
+        for route, now in result["routes"].items():
+            before = base_routes.get(route)
+            if before is None:
+                continue
+            label = f"{scenario}: {route}"
+            if before["p95_ms"] and now["p95_ms"] > before["p95_ms"] * (1 + threshold):
+                regressions.append(f"{label} p95 {before['p95_ms']:.1f} -> {now['p95_ms']:.1f} ms "
+                                   f"(+{now['p95_ms'] / before['p95_ms'] - 1:.0%})")
+            if before["rps"] and now["rps"] < before["rps"] * (1 - threshold):
+                regressions.append(f"{label} throughput {before['rps']:.1f} -> {now['rps']:.1f} req/s "
+                                   f"({now['rps'] / before['rps'] - 1:.0%})")
+            if now["errors"] and not before["errors"]:
+                regressions.append(f"{label} {now['errors']} errors (baseline had none)")
+    return regressions
+
+def print_results(results: Dict[str, dict]) -> None:
+    print(f"{'scenario':<10} {'route':<28} {'req':>7} {'err':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for scenario, result in results.items():
+        for route, r in result["routes"].items():
+            print(f"{scenario:<10} {route:<28} {r['requests']:>7} {r['errors']:>5} {r['rps']:>9.1f} "
+                  f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}")
+        print(f"{scenario:<10} {'(all routes)':<28} {result['requests']:>7} {result['errors']:>5} {result['rps']:>9.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Drive the real app under concurrent load, report per-route latency percentiles "
+                    "and fail on regressions against a stored baseline.")
+    parser.add_argument("--scenario", choices=SCENARIOS, action="append", dest="scenarios",
+                        help="Scenario to run (repeatable; default: all)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients for the timed scenarios")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per timed scenario")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds of the check-in storm and payroll runs")
+    parser.add_argument("--storm-size", type=int, default=500, help="Accounts punching at once in the check-in storm")
+    parser.add_argument("--payroll-departments", type=int, default=20, help="Departments per payroll run")
+    parser.add_argument("--accounts", type=int, default=2000, help="Synthetic logins to spread the load over")
+    parser.add_argument("--workers", type=int, default=1, help="Uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=8768)
+    parser.add_argument("--username", default="admin1", help="Admin login (approvals, payroll)")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--account-password", default="synthetic123", help="Password of the synthetic logins")
+    parser.add_argument("--generate", type=float, metavar="SCALE", default=None,
+                        help="Load generate_data.py data at this scale first")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON (default: bench_baseline_<dialect>.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline instead of comparing")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed regression as a fraction (default: 0.2)")
+    parser.add_argument("--output", default=None, help="Also write this run's results to a JSON file")
+    args = parser.parse_args()
+
+    dialect = database.engine.dialect.name
+    if args.generate is not None:
+        import generate_data
+        generate_data.generate(args.generate, 42, 1, date.today())
+
+    accounts = synthetic_accounts(args.accounts)
+    if not accounts:
+        print("No synthetic accounts: load data with `python generate_data.py` (or pass --generate SCALE).")
+        return 2
+    names = args.scenarios or SCENARIOS
+    ctx = {
+        "accounts": accounts,
+        "password": args.account_password,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "rounds": args.rounds,
+        "storm_size": min(args.storm_size, len(accounts)),
+        "payroll_departments": args.payroll_departments,
+    }
+    env = {
+        # Measure the requests, not logins: tokens minted here stay cached
+        "PRINCIPAL_CACHE_TTL_SECONDS": "3600",
+    }
+    print(f"{dialect}: {', '.join(names)} with {args.concurrency} clients, {args.duration}s each, "
+          f"{len(accounts)} accounts, workers={args.workers}")
+    proc = start_server(args.port, args.workers, env)
+    base = f"http://127.0.0.1:{args.port}"
+    try:
+        r = httpx.post(f"{base}/auth/login", json={"username": args.username, "password": args.password})
+        r.raise_for_status()
+        ctx["admin"] = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        scenarios = asyncio.run(run_scenarios(base, names, ctx))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    current = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "database": dialect,
+        "settings": {k: v for k, v in ctx.items() if k not in ("accounts", "password", "admin")},
+        "workers": args.workers,
+        "accounts": len(accounts),
+        "scenarios": scenarios,
+    }
+    print_results(scenarios)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+
+    baseline_path = args.baseline or f"bench_baseline_{dialect}.json"
+    if args.save_baseline:
+        with open(baseline_path, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"Baseline saved to {baseline_path}.")
+        return 0
+    if not os.path.exists(baseline_path):
+        print(f"No baseline at {baseline_path}: run with --save-baseline to create one.")
+        return 0
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    if baseline.get("settings") != current["settings"] or baseline.get("workers") != current["workers"]:
+        print(f"Warning: {baseline_path} was recorded with different settings; comparing anyway.")
+    regressions = compare(current, baseline, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    print(f"{len(regressions)} regression(s) against {baseline_path} (threshold {args.threshold:.0%}).")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
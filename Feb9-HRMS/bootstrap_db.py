@@ -0,0 +1,34 @@
+import sys
+import os
+import time
+from sqlalchemy import inspect
+from app import models, database
+from app.services import attendance_partitions, employee_search, leave, payroll, search
+
+def bootstrap_database():
+    print(f"Connecting to {database.engine.url.render_as_string(hide_password=True)}...")
+    started = time.perf_counter()
+    # Creates missing tables only; existing tables are left as they are
+    models.Base.metadata.create_all(bind=database.engine)
+    tables = inspect(database.engine).get_table_names()
+    print(f"Schema ready: {len(tables)} tables in {time.perf_counter() - started:.2f}s.")
+    # New tables got their search indexes on create; this adds them to existing ones
+    with database.engine.begin() as conn:
+        search.ensure_all(conn)
+        employee_search.ensure(conn)
+        payroll.ensure_unique_periods(conn)
+        leave.ensure_unique_balances(conn)
+
+    db = database.SessionLocal()
+    try:
+        created = attendance_partitions.ensure_partitions(db)
+        if created:
+            print(f"Created attendance partitions: {', '.join(created)}")
+        elif database.engine.dialect.name == "postgresql" and not attendance_partitions.is_partitioned(db.connection()):
+            print("Attendance is not partitioned yet: run `python manage_attendance_storage.py convert`.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.path.append(os.getcwd())
+    bootstrap_database()
@@ -0,0 +1,855 @@
+import sys
+import argparse
+import bisect
+import csv
+import io
+import random
+import time
+from datetime import date, datetime, time as clock, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection
+from app import models, database
+from app.core import security
+from app.core.config import settings
+from app.core.invalidation import bus
+from app.services import attendance, attendance_partitions, employee_codes
+from app.services.attendance_partitions import add_months, month_start
+
+# Employees at --scale 1; everything else is sized from the headcount
+BASE_EMPLOYEES = 100_000
+TEAM_SIZE = 40
+SQUAD_SIZE = 8
+POSTINGS_PER_EMPLOYEE = 1 / 200
+CHUNK_SIZE = 10_000
+CODE_PREFIX = "SYN"
+# Every generated login shares this password (hashed once)
+PASSWORD = "synthetic123"
+GROUPS = ["attendance", "leave", "payroll", "recruitment"]
+
+DIVISIONS = [
+    ("Engineering", ["Software Engineer", "QA Engineer", "DevOps Engineer"]),
+    ("Sales", ["Account Executive", "Sales Development Representative"]),
+    ("Finance", ["Accountant", "Financial Analyst"]),
+    ("Operations", ["Operations Analyst", "Logistics Coordinator"]),
+    ("Human Resources", ["HR Generalist", "Recruiter"]),
+    ("Marketing", ["Marketing Specialist", "Content Strategist"]),
+    ("Customer Support", ["Support Engineer", "Customer Success Manager"]),
+    ("Product", ["Product Manager", "Product Designer"]),
+    ("Research", ["Research Scientist", "Data Scientist"]),
+    ("Manufacturing", ["Production Technician", "Quality Inspector"]),
+    ("Supply Chain", ["Buyer", "Supply Planner"]),
+    ("Information Technology", ["Systems Administrator", "Network Engineer"]),
+    ("Legal", ["Legal Counsel", "Paralegal"]),
+    ("Facilities", ["Facilities Coordinator", "Maintenance Technician"]),
+]
+UNITS = [
+    "Platform", "Core", "Enterprise", "Growth", "Analytics", "Infrastructure", "Regional", "Global",
+    "Services", "Strategy", "Planning", "Compliance", "Delivery", "Innovation", "Partnerships", "Quality",
+]
+SKILLS = {
+    "Engineering": ["Python", "Go", "Kubernetes", "PostgreSQL", "distributed systems", "CI/CD", "test automation"],
+    "Sales": ["pipeline management", "Salesforce", "negotiation", "enterprise accounts", "forecasting"],
+    "Finance": ["IFRS", "financial modelling", "Excel", "month-end close", "budgeting", "audit"],
+    "Operations": ["process improvement", "Lean", "vendor management", "SAP", "reporting"],
+    "Human Resources": ["talent acquisition", "employee relations", "HRIS", "payroll", "labour law"],
+    "Marketing": ["SEO", "campaign management", "copywriting", "Google Analytics", "brand strategy"],
+    "Customer Support": ["Zendesk", "troubleshooting", "customer onboarding", "SLAs", "escalations"],
+    "Product": ["roadmapping", "user research", "Figma", "A/B testing", "stakeholder management"],
+    "Research": ["machine learning", "statistics", "R", "experimental design", "scientific writing"],
+    "Manufacturing": ["CNC machining", "ISO 9001", "six sigma", "preventive maintenance", "safety"],
+    "Supply Chain": ["procurement", "demand planning", "inventory control", "ERP", "logistics"],
+    "Information Technology": ["Active Directory", "networking", "Linux", "ITIL", "cloud security"],
+    "Legal": ["contract law", "litigation", "GDPR", "corporate governance", "intellectual property"],
+    "Facilities": ["HVAC", "space planning", "health and safety", "vendor coordination", "budgeting"],
+}
+FIRST_NAMES = [
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+    "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen",
+    "Aarav", "Priya", "Rohan", "Ananya", "Vikram", "Isha", "Arjun", "Kavya", "Wei", "Mei", "Hiroshi",
+    "Yuki", "Ahmed", "Fatima", "Omar", "Layla", "Carlos", "Sofia", "Mateo", "Valentina", "Lucas", "Emma",
+    "Noah", "Olivia", "Liam", "Ava", "Ethan", "Mia", "Chen", "Amara", "Kwame", "Zanele", "Ivan", "Olga",
+    "Lars", "Ingrid", "Pierre", "Camille", "Giulia", "Marco",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin", "Lee",
+    "Patel", "Sharma", "Gupta", "Singh", "Kumar", "Reddy", "Nair", "Iyer", "Wang", "Li", "Zhang", "Liu",
+    "Tanaka", "Suzuki", "Sato", "Khan", "Hassan", "Ali", "Silva", "Santos", "Oliveira", "Costa",
+    "Muller", "Schmidt", "Schneider", "Fischer", "Dubois", "Laurent", "Rossi", "Russo", "Ivanov",
+    "Petrov", "Nielsen", "Hansen", "Okafor", "Mensah", "Dlamini", "Novak", "Kowalski", "Murphy",
+]
+LOCATIONS = [
+    ("New York", "NY", "USA"), ("San Francisco", "CA", "USA"), ("Austin", "TX", "USA"),
+    ("London", "England", "UK"), ("Berlin", "Berlin", "Germany"), ("Bengaluru", "Karnataka", "India"),
+    ("Pune", "Maharashtra", "India"), ("Singapore", "Singapore", "Singapore"), ("Toronto", "ON", "Canada"),
+    ("Sydney", "NSW", "Australia"),
+]
+COMPANIES = [
+    "Acme Corp", "Globex", "Initech", "Umbrella Group", "Stark Industries", "Wayne Enterprises",
+    "Hooli", "Vandelay Industries", "Soylent", "Wonka Industries", "Tyrell Corp", "Cyberdyne Systems",
+]
+# Annual salary range per job level
+SALARY_BANDS = {
+    "Executive": (250_000, 400_000),
+    "Director": (170_000, 250_000),
+    "Manager": (110_000, 165_000),
+    "Lead": (90_000, 130_000),
+    "Senior": (75_000, 115_000),
+    "Mid": (55_000, 85_000),
+    "Junior": (40_000, 60_000),
+    "Intern": (20_000, 30_000),
+}
+# (name, code, days per year, share of applications, longest leave in working days)
+LEAVE_TYPES = [
+    ("Annual Leave", "AL", 20, 0.55, 10),
+    ("Sick Leave", "SL", 10, 0.30, 3),
+    ("Casual Leave", "CL", 7, 0.15, 2),
+]
+HOLIDAYS = {(1, 1), (12, 25)}
+
+
+class Position(NamedTuple):
+    position_id: int
+    department_id: int
+    title: str
+    level: str
+    division: str
+
+
+class Hire(NamedTuple):
+    employee_id: int
+    department_id: int
+    position_id: int
+    manager_id: Optional[int]
+    level: str
+    division: str
+    employment_type: models.EmploymentType
+    status: models.EmploymentStatus
+    joined: date
+    left: Optional[date]
+    salary: int  # annual, at the start of the window
+
+
+class BulkLoader:
+    """
+    Streams generated rows into one table at a time: COPY ... FROM STDIN
+    (CSV) on Postgres, chunked executemany on SQLite. Values go through the
+    columns' bind processors first, so enums, times and JSON are stored
+    exactly as the ORM would store them.
+    """
+
+    def __init__(self, conn: Connection, chunk_size: int = CHUNK_SIZE):
+        self.conn = conn
+        self.dialect = conn.dialect
+        self.chunk_size = chunk_size
+        if self.dialect.name not in ("postgresql", "sqlite"):
+            raise NotImplementedError(f"Bulk loading is not supported on {self.dialect.name}")
+
+    def load(self, model, columns: Sequence[str], rows: Iterable[tuple]) -> int:
+        table = model.__table__
+        processors = [table.c[name].type.dialect_impl(self.dialect).bind_processor(self.dialect) for name in columns]
+        column_list = ", ".join(columns)
+        if self.dialect.name == "postgresql":
+            statement = f"COPY {table.name} ({column_list}) FROM STDIN WITH (FORMAT csv)"
+        else:
+            statement = f"INSERT INTO {table.name} ({column_list}) VALUES ({', '.join('?' * len(columns))})"
+        loaded = 0
+        for chunk in _chunks(rows, self.chunk_size):
+            chunk = [
+                tuple(value if process is None or value is None else process(value)
+                      for process, value in zip(processors, row))
+                for row in chunk
+            ]
+            if self.dialect.name == "postgresql":
+                self._copy(statement, chunk)
+            else:
+                self.conn.exec_driver_sql(statement, chunk)
+            loaded += len(chunk)
+        return loaded
+
+    def _copy(self, statement: str, chunk: List[tuple]) -> None:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(chunk)  # None -> empty field -> NULL
+        buffer.seek(0)
+        cursor = self.conn.connection.driver_connection.cursor()
+        try:
+            if hasattr(cursor, "copy_expert"):  # psycopg2
+                cursor.copy_expert(statement, buffer)
+            else:  # psycopg 3
+                with cursor.copy(statement) as copy:
+                    copy.write(buffer.getvalue())
+        finally:
+            cursor.close()
+
+    def reset_sequence(self, model) -> None:
+        """Move a serial column past the ids written explicitly (Postgres only)."""
+        if self.dialect.name != "postgresql":
+            return
+        table = model.__table__
+        pk = table.primary_key.columns.values()[0].name
+        self.conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', '{pk}'), "
+            f"(SELECT coalesce(max({pk}), 1) FROM {table.name}))"
+        ))
+
+
+def _chunks(rows: Iterable[tuple], size: int) -> Iterator[List[tuple]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _next_id(conn: Connection, column) -> int:
+    return (conn.execute(select(func.max(column))).scalar() or 0) + 1
+
+def _split(total: int, parts: int, rng: random.Random, low: float = 0.5, high: float = 1.5) -> List[int]:
+    """`total` split into `parts` uneven, non-negative shares."""
+    weights = [rng.uniform(low, high) for _ in range(parts)]
+    scale = total / sum(weights)
+    shares = [int(w * scale) for w in weights]
+    for i in rng.sample(range(parts), total - sum(shares)):
+        shares[i] += 1
+    return shares
+
+def _money(value: float) -> float:
+    return round(value, 2)
+
+def _month_end(month: date) -> date:
+    return add_months(month, 1) - timedelta(days=1)
+
+
+class Generator:
+    """
+    Builds a synthetic organisation and its history from a seed. The same
+    seed, scale, years and as-of date give the same rows on an empty
+    database; every table draws from its own random stream, so skipping a
+    group of tables leaves the others unchanged.
+    """
+
+    def __init__(self, seed: int, scale: float, years: int, as_of: date):
+        self.seed = seed
+        self.as_of = as_of
+        self.start = date(as_of.year - years, as_of.month, 1)
+        self.headcount = max(50, round(BASE_EMPLOYEES * scale))
+        days = (self.start + timedelta(days=n) for n in range((as_of - self.start).days + 1))
+        self.workdays = [d for d in days if d.weekday() < 5 and (d.month, d.day) not in HOLIDAYS]
+        self.departments: List[dict] = []
+        self.positions: List[Position] = []
+        self.hires: List[Hire] = []
+        self.postings: List[dict] = []
+        self._paths: Dict[int, Tuple[int, ...]] = {}
+
+    def rng(self, stream: str, key: Optional[int] = None) -> random.Random:
+        return random.Random(f"{self.seed}:{stream}" if key is None else f"{self.seed}:{stream}:{key}")
+
+    # --- organisation ---
+
+    def build(self, first_department_id: int, first_position_id: int, first_employee_id: int) -> None:
+        """Departments (division > department > team), positions and the manager tree, in memory."""
+        rng = self.rng("org")
+        teams = max(1, round(self.headcount / TEAM_SIZE))
+        divisions = min(len(DIVISIONS), max(1, round(teams ** (1 / 3))))
+        per_division = min(len(UNITS), max(1, round((teams / divisions) ** 0.5)))
+        departments = divisions * per_division
+        teams = max(teams, departments)
+
+        department_ids = iter(range(first_department_id, first_department_id + 1 + divisions + departments + teams))
+        position_ids = iter(range(first_position_id, 1_000_000_000))
+        employee_ids = iter(range(first_employee_id, first_employee_id + self.headcount))
+
+        def department(name: str, parent: Optional[dict], division: str) -> dict:
+            location = rng.choice(LOCATIONS)[0]
+            node = {
+                "department_id": next(department_ids), "department_name": name,
+                "parent_department_id": parent["department_id"] if parent else None,
+                "manager_id": None, "location": location, "division": division,
+                "budget": 0,
+            }
+            self.departments.append(node)
+            return node
+
+        def position(dept: dict, title: str, level: str, division: str) -> Position:
+            pos = Position(next(position_ids), dept["department_id"], title, level, division)
+            self.positions.append(pos)
+            return pos
+
+        def hire(dept: dict, pos: Position, manager: Optional[Hire], senior: bool = False) -> Hire:
+            employee_id = next(employee_ids)
+            low, high = SALARY_BANDS[pos.level]
+            # Managers have been around longer; a share of everyone else joined during the window
+            tenure = rng.randint(3 * 365, 15 * 365) if senior else rng.randint(30, (self.as_of - self.start).days + 6 * 365)
+            joined = self.as_of - timedelta(days=tenure)
+            employment_type = models.EmploymentType.Intern if pos.level == "Intern" else rng.choices(
+                [models.EmploymentType.FullTime, models.EmploymentType.Contract,
+                 models.EmploymentType.PartTime, models.EmploymentType.Temporary],
+                [88, 6, 4, 2],
+            )[0]
+            status, left = models.EmploymentStatus.Active, None
+            if not senior:
+                status = rng.choices(
+                    [models.EmploymentStatus.Active, models.EmploymentStatus.OnLeave, models.EmploymentStatus.Suspended,
+                     models.EmploymentStatus.Resigned, models.EmploymentStatus.Terminated],
+                    [90, 3, 1, 4, 2],
+                )[0]
+            if status in (models.EmploymentStatus.Resigned, models.EmploymentStatus.Terminated):
+                earliest = max(joined + timedelta(days=90), self.start)
+                if earliest < self.as_of:
+                    left = earliest + timedelta(days=rng.randrange((self.as_of - earliest).days))
+                else:
+                    status = models.EmploymentStatus.Active
+            person = Hire(
+                employee_id, dept["department_id"], pos.position_id, manager.employee_id if manager else None,
+                pos.level, pos.division, employment_type, status, joined, left, rng.randint(low, high) // 100 * 100,
+            )
+            self.hires.append(person)
+            self._paths[employee_id] = (employee_id,) + (self._paths[manager.employee_id] if manager else ())
+            dept["budget"] += person.salary
+            return person
+
+        root = department("Head Office", None, "Executive")
+        ceo = hire(root, position(root, "Chief Executive Officer", "Executive", "Executive"), None, senior=True)
+        root["manager_id"] = ceo.employee_id
+
+        # Heads first, so every manager exists before their reports
+        units: List[Tuple[dict, Hire, List[Position], List[Position]]] = []
+        team_counts = _split(teams - departments, departments, rng, 0, 2)
+        for division_name, roles in DIVISIONS[:divisions]:
+            division = department(division_name, root, division_name)
+            director = hire(division, position(division, f"Director of {division_name}", "Director", division_name),
+                            ceo, senior=True)
+            division["manager_id"] = director.employee_id
+            manager_position = position(division, f"{division_name} Manager", "Manager", division_name)
+            lead_position = position(division, f"{division_name} Team Lead", "Lead", division_name)
+            ladder = [
+                position(division, title, level, division_name)
+                for role in roles
+                for title, level in [(f"Senior {role}", "Senior"), (role, "Mid"),
+                                     (f"Junior {role}", "Junior"), (f"{role} Intern", "Intern")]
+            ]
+            for unit in rng.sample(UNITS, per_division):
+                dept = department(f"{division_name} {unit}", division, division_name)
+                head = hire(dept, manager_position, director, senior=True)
+                dept["manager_id"] = head.employee_id
+                for n in range(1 + team_counts.pop()):
+                    team = department(f"{unit} Team {n + 1}", dept, division_name)
+                    lead = hire(team, lead_position, head, senior=True)
+                    team["manager_id"] = lead.employee_id
+                    units.append((team, lead, [p for p in ladder if p.level == "Senior"], ladder))
+
+        members = self.headcount - len(self.hires)
+        levels = ["Senior", "Mid", "Junior", "Intern"]
+        for (team, lead, seniors, ladder), size in zip(units, _split(max(0, members), len(units), rng)):
+            # Squads of about SQUAD_SIZE under senior members keep spans of control realistic
+            squads = [hire(team, rng.choice(seniors), lead) for _ in range(max(0, -(-size // SQUAD_SIZE) - 1))]
+            for n in range(size - len(squads)):
+                level = rng.choices(levels, [20, 50, 22, 8])[0]
+                pos = rng.choice([p for p in ladder if p.level == level])
+                hire(team, pos, squads[n % len(squads)] if squads else lead)
+
+    # --- rows, one generator per table ---
+
+    def department_rows(self) -> Iterator[tuple]:
+        for d in self.departments:
+            yield (
+                d["department_id"], d["department_name"], f"{CODE_PREFIX}-D{d['department_id']:06d}",
+                d["parent_department_id"], d["manager_id"], d["budget"], d["location"],
+                f"{d['division']} organisation" if d["parent_department_id"] else "Headquarters", True,
+            )
+
+    def department_closure_rows(self) -> Iterator[tuple]:
+        paths: Dict[int, Tuple[int, ...]] = {}
+        for d in self.departments:
+            parent = d["parent_department_id"]
+            path = paths[d["department_id"]] = (d["department_id"],) + (paths[parent] if parent else ())
+            for depth, ancestor in enumerate(path):
+                yield ancestor, d["department_id"], depth
+
+    def position_rows(self) -> Iterator[tuple]:
+        for p in self.positions:
+            low, high = SALARY_BANDS[p.level]
+            skills = ", ".join(SKILLS.get(p.division, SKILLS["Operations"])[:3])
+            yield (
+                p.position_id, p.title, f"{CODE_PREFIX}-P{p.position_id:06d}", p.department_id, p.level,
+                low, high, f"{p.title} in the {p.division} division.", f"Experience with {skills}.", True,
+            )
+
+    def employee_rows(self, code_numbers: Sequence[int]) -> Iterator[tuple]:
+        rng = self.rng("employees")
+        genders = list(models.Gender)
+        marital_statuses = list(models.MaritalStatus)
+        for person, number in zip(self.hires, code_numbers):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            city, state, country = rng.choice(LOCATIONS)
+            born = person.joined - timedelta(days=rng.randint(21 * 365, 45 * 365))
+            yield (
+                person.employee_id, employee_codes.format_code(number, person.joined), first, last,
+                f"{first}.{last}.{person.employee_id}@synthetic.example.com".lower(),
+                f"+1-555-{rng.randrange(10_000_000):07d}", born, rng.choice(genders), rng.choice(marital_statuses),
+                person.department_id, person.position_id, person.manager_id, person.employment_type, person.status,
+                person.joined, person.left, person.joined + timedelta(days=90), city, state, country,
+                person.left is None,
+            )
+
+    def employee_closure_rows(self) -> Iterator[tuple]:
+        for person in self.hires:
+            for depth, ancestor in enumerate(self._paths[person.employee_id]):
+                yield ancestor, person.employee_id, depth
+
+    def access_rows(self, role_id: int, password_hash: str) -> Iterator[tuple]:
+        for person in self.hires:
+            yield person.employee_id, role_id, f"syn{person.employee_id}", password_hash, person.left is None
+
+    # --- leave ---
+
+    def _employed(self, person: Hire) -> Tuple[int, int]:
+        """Range of self.workdays the person was employed for."""
+        first = bisect.bisect_left(self.workdays, max(person.joined, self.start))
+        last = bisect.bisect_right(self.workdays, min(person.left or self.as_of, self.as_of))
+        return first, max(first, last)
+
+    def leave_plan(self, person: Hire, allowances: Sequence[int]) -> List[tuple]:
+        """
+        (leave type index, first and last workday index, status, applied on,
+        reason) of each leave the person applied for, in date order. Drawn
+        from the person's own stream, so leave and attendance agree.
+        """
+        rng = self.rng("leave", person.employee_id)
+        first, last = self._employed(person)
+        if first == last:
+            return []
+        status = models.LeaveApplicationStatus
+        shares = [share for _, _, _, share, _ in LEAVE_TYPES]
+        used: Dict[Tuple[int, int], int] = {}
+        busy = set()
+        plan = []
+        for _ in range(round(rng.uniform(3, 9) * (last - first) / 260)):
+            kind = rng.choices(range(len(LEAVE_TYPES)), shares)[0]
+            begin = rng.randrange(first, last)
+            end = min(begin + rng.randint(1, LEAVE_TYPES[kind][4]), last) - 1
+            while self.workdays[end].year != self.workdays[begin].year:
+                end -= 1
+            if busy.intersection(range(begin, end + 1)):
+                continue
+            days = end - begin + 1
+            year = self.workdays[begin].year
+            if (self.as_of - self.workdays[begin]).days < 30 and rng.random() < 0.5:
+                outcome = status.Pending
+            else:
+                outcome = rng.choices([status.Approved, status.Rejected, status.Cancelled], [85, 10, 5])[0]
+            if outcome == status.Approved:
+                if used.get((year, kind), 0) + days > allowances[kind]:
+                    continue
+                used[(year, kind)] = used.get((year, kind), 0) + days
+            busy.update(range(begin, end + 1))
+            applied_on = datetime.combine(self.workdays[begin] - timedelta(days=rng.randint(1, 21)), clock(9, 30))
+            reason = rng.choice(LEAVE_REASONS[LEAVE_TYPES[kind][1]])
+            plan.append((kind, begin, end, outcome, applied_on, reason))
+        plan.sort(key=lambda leave: leave[1])
+        return plan
+
+    def leave_rows(self, first_leave_id: int, leave_types: Sequence[Tuple[int, int]]) -> Iterator[tuple]:
+        allowances = [allowance for _, allowance in leave_types]
+        leave_id = first_leave_id
+        for person in self.hires:
+            for kind, begin, end, outcome, applied_on, reason in self.leave_plan(person, allowances):
+                decided = outcome in (models.LeaveApplicationStatus.Approved, models.LeaveApplicationStatus.Rejected)
+                yield (
+                    leave_id, person.employee_id, leave_types[kind][0], self.workdays[begin], self.workdays[end],
+                    end - begin + 1, reason, outcome, applied_on,
+                    person.manager_id if decided else None, applied_on + timedelta(days=1) if decided else None,
+                    "Team capacity during the requested dates" if outcome == models.LeaveApplicationStatus.Rejected else None,
+                )
+                leave_id += 1
+
+    def _leave_years(self, person: Hire) -> range:
+        return range(max(person.joined, self.start).year, min(person.left or self.as_of, self.as_of).year + 1)
+
+    def balance_rows(self, leave_types: Sequence[Tuple[int, int]]) -> Iterator[tuple]:
+        allowances = [allowance for _, allowance in leave_types]
+        for person in self.hires:
+            used: Dict[Tuple[int, int], int] = {}
+            for kind, begin, end, outcome, _, _ in self.leave_plan(person, allowances):
+                if outcome == models.LeaveApplicationStatus.Approved:
+                    key = (self.workdays[begin].year, kind)
+                    used[key] = used.get(key, 0) + end - begin + 1
+            for year in self._leave_years(person):
+                for kind, (leave_type_id, allowance) in enumerate(leave_types):
+                    days = used.get((year, kind), 0)
+                    yield person.employee_id, leave_type_id, year, allowance, days, allowance - days, 0
+
+    def ledger_rows(self, first_leave_id: int, leave_types: Sequence[Tuple[int, int]]) -> Iterator[tuple]:
+        """Allocation per balance and Approval per approved leave, matching the balance rows."""
+        allowances = [allowance for _, allowance in leave_types]
+        entry = models.LeaveLedgerEntryType
+        leave_id = first_leave_id
+        for person in self.hires:
+            for year in self._leave_years(person):
+                for leave_type_id, allowance in leave_types:
+                    yield person.employee_id, leave_type_id, year, entry.Allocation, allowance, None
+            for kind, begin, end, outcome, _, _ in self.leave_plan(person, allowances):
+                if outcome == models.LeaveApplicationStatus.Approved:
+                    yield (person.employee_id, leave_types[kind][0], self.workdays[begin].year,
+                           entry.Approval, -(end - begin + 1), leave_id)
+                leave_id += 1
+
+    # --- attendance ---
+
+    def attendance_rows(self, allowances: Sequence[int]) -> Iterator[tuple]:
+        """One row per working day employed: approved leave shows as On Leave, weekends are not stored."""
+        rng = self.rng("attendance")
+        status = models.AttendanceStatus
+        times = [clock(m // 60, m % 60) for m in range(24 * 60)]
+        for person in self.hires:
+            first, last = self._employed(person)
+            on_leave = set()
+            for _, begin, end, outcome, _, _ in self.leave_plan(person, allowances):
+                if outcome == models.LeaveApplicationStatus.Approved:
+                    on_leave.update(range(begin, end + 1))
+            employee_id = person.employee_id
+            for i in range(first, last):
+                day = self.workdays[i]
+                if i in on_leave:
+                    yield employee_id, day, None, None, None, 0, status.OnLeave
+                    continue
+                roll = rng.random()
+                if roll < 0.02:
+                    yield employee_id, day, None, None, None, 0, status.Absent
+                    continue
+                if roll < 0.09:
+                    came, outcome = 9 * 60 + 15 + rng.randrange(75), status.Late
+                else:
+                    came, outcome = 8 * 60 + 30 + rng.randrange(45), status.Present
+                if roll > 0.98:
+                    went, outcome = came + 4 * 60 + rng.randrange(30), status.HalfDay
+                else:
+                    went = min(came + 8 * 60 + rng.randrange(-15, 150), 23 * 60 + 59)
+                hours = round((went - came) / 60, 2)
+                yield employee_id, day, times[came], times[went], hours, round(max(0.0, hours - 9), 2), outcome
+
+    # --- payroll ---
+
+    def salary_history(self, person: Hire) -> List[Tuple[date, int]]:
+        """(effective from, annual salary): pay at the start of the window, then a raise every January."""
+        rng = self.rng("salary", person.employee_id)
+        salary = person.salary
+        history = [(max(person.joined, self.start), salary)]
+        for year in range(history[0][0].year + 1, min(person.left or self.as_of, self.as_of).year + 1):
+            salary = int(salary * rng.uniform(1.02, 1.08)) // 100 * 100
+            history.append((date(year, 1, 1), salary))
+        return history
+
+    def salary_structure_rows(self) -> Iterator[tuple]:
+        for person in self.hires:
+            history = self.salary_history(person)
+            for n, (effective_from, annual) in enumerate(history):
+                effective_to = history[n + 1][0] - timedelta(days=1) if n + 1 < len(history) else None
+                pay = _monthly_pay(annual)
+                yield (
+                    person.employee_id, effective_from, effective_to, pay["basic"], pay["hra"], pay["transport"],
+                    pay["medical"], pay["special"], pay["provident_fund"], pay["professional_tax"],
+                    pay["income_tax"], pay["insurance"], pay["gross"], pay["deductions"], pay["net"],
+                    "USD", models.PaymentFrequency.Monthly,
+                )
+
+    def payroll_rows(self) -> Iterator[tuple]:
+        """A paid payroll row for every complete month employed; some Decembers carry a bonus."""
+        rng = self.rng("payroll")
+        for person in self.hires:
+            history = self.salary_history(person)
+            last_day = min(person.left or self.as_of, self.as_of)
+            month = month_start(history[0][0])
+            while _month_end(month) <= self.as_of and month <= last_day:
+                annual = next(salary for effective, salary in reversed(history) if effective <= _month_end(month))
+                pay = _monthly_pay(annual)
+                bonus = _money(annual * rng.uniform(0.03, 0.10)) if month.month == 12 and rng.random() < 0.3 else 0
+                tax = _money(pay["income_tax"] + bonus * 0.2)
+                deductions = _money(tax + pay["insurance"] + pay["provident_fund"] + pay["professional_tax"])
+                gross = _money(pay["gross"] + bonus)
+                yield (
+                    person.employee_id, month, _month_end(month), _month_end(month), pay["basic"],
+                    _money(pay["gross"] - pay["basic"]), bonus, gross, tax, pay["insurance"],
+                    pay["provident_fund"], pay["professional_tax"], deductions, _money(gross - deductions),
+                    models.PayrollStatus.Paid, models.PaymentMethod.BankTransfer,
+                )
+                month = add_months(month, 1)
+
+    # --- recruitment ---
+
+    def build_postings(self, first_posting_id: int) -> None:
+        rng = self.rng("postings")
+        openings = [p for p in self.positions if p.level in ("Senior", "Mid", "Junior", "Intern")]
+        window = (self.as_of - self.start).days
+        for n in range(max(5, round(self.headcount * POSTINGS_PER_EMPLOYEE))):
+            pos = rng.choice(openings)
+            # Most postings are old and closed; the last couple of months are still open
+            posted = self.as_of - timedelta(days=rng.randrange(window))
+            closing = posted + timedelta(days=rng.randint(30, 60))
+            if closing < self.as_of:
+                status = models.JobPostingStatus.Closed
+            else:
+                status = models.JobPostingStatus.OnHold if rng.random() < 0.1 else models.JobPostingStatus.Open
+            least = {"Senior": 5, "Mid": 2, "Junior": 0, "Intern": 0}[pos.level]
+            skills = rng.sample(SKILLS[pos.division], 3)
+            city = rng.choice(LOCATIONS)[0]
+            self.postings.append({
+                "posting_id": first_posting_id + n, "position": pos, "posted": posted, "closing": closing,
+                "status": status, "min_experience": least, "max_experience": least + rng.randint(2, 6),
+                "vacancies": rng.choices([1, 2, 3, 5], [70, 18, 8, 4])[0], "skills": skills, "city": city,
+                "description": " ".join([
+                    f"We are looking for a {pos.title} to join our {pos.division} team in {city}.",
+                    f"You will work closely with colleagues across {rng.choice(UNITS).lower()} projects",
+                    f"and help us grow our {pos.division.lower()} capabilities.",
+                    f"Day to day you will use {skills[0]} and {skills[1]}.",
+                ]),
+            })
+
+    def posting_rows(self) -> Iterator[tuple]:
+        for p in self.postings:
+            pos = p["position"]
+            low, high = SALARY_BANDS[pos.level]
+            yield (
+                p["posting_id"], pos.position_id, pos.title, pos.department_id, p["vacancies"], p["description"],
+                f"{p['min_experience']}+ years of experience. Strong {p['skills'][0]}, {p['skills'][1]} "
+                f"and {p['skills'][2]} skills.",
+                p["min_experience"], p["max_experience"], low, high, p["city"],
+                models.EmploymentType.Intern if pos.level == "Intern" else models.EmploymentType.FullTime,
+                p["posted"], p["closing"], p["status"],
+            )
+
+    def application_rows(self) -> Iterator[tuple]:
+        rng = self.rng("applications")
+        status = models.ApplicationStatus
+        titles = sorted({p.title for p in self.positions})
+        n = 0
+        for p in self.postings:
+            closed = p["status"] == models.JobPostingStatus.Closed
+            last_day = min(p["closing"], self.as_of)
+            hired = 0
+            for _ in range(rng.randint(5, 50)):
+                n += 1
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                experience = rng.randint(max(0, p["min_experience"] - 1), p["max_experience"] + 2)
+                company = rng.choice(COMPANIES)
+                current = rng.choice(titles)
+                if closed:
+                    outcome = rng.choices([status.Rejected, status.Withdrawn, status.Offered, status.Hired], [75, 12, 5, 8])[0]
+                    if outcome == status.Hired:
+                        if hired == p["vacancies"]:
+                            outcome = status.Rejected
+                        hired += 1
+                else:
+                    outcome = rng.choices([status.Applied, status.Screening, status.Interview, status.Rejected],
+                                          [45, 25, 15, 15])[0]
+                applied = p["posted"] + timedelta(days=rng.randint(0, max(0, (last_day - p["posted"]).days)))
+                yield (
+                    p["posting_id"], first, last, f"{first}.{last}{n}@applicant.example.com".lower(),
+                    f"+1-555-{rng.randrange(10_000_000):07d}", company, current, experience,
+                    rng.randint(*SALARY_BANDS[p["position"].level]) // 1000 * 1000, rng.choice([0, 15, 30, 60, 90]),
+                    f"I have {experience} years of experience as a {current} at {company}, where I worked with "
+                    f"{' and '.join(rng.sample(SKILLS[p['position'].division], 2))}. I would love to bring that "
+                    f"experience to the {p['position'].title} role in {p['city']}.",
+                    outcome, datetime.combine(applied, clock(rng.randrange(8, 20), rng.randrange(60))),
+                )
+
+
+LEAVE_REASONS = {
+    "AL": ["Family vacation", "Travel abroad", "Personal time off", "Wedding in the family", "Moving house"],
+    "SL": ["Flu", "Medical appointment", "Recovering from a minor surgery", "Migraine", "Dental treatment"],
+    "CL": ["Personal errand", "Child's school event", "Home repairs", "Bank and government paperwork"],
+}
+
+def _monthly_pay(annual: int) -> dict:
+    gross = annual / 12
+    basic = gross * 0.5
+    tax_rate = 0.30 if annual > 150_000 else 0.20 if annual > 60_000 else 0.10
+    pay = {
+        "gross": gross, "basic": basic, "hra": gross * 0.2, "transport": gross * 0.05,
+        "medical": gross * 0.05, "special": gross * 0.2, "provident_fund": basic * 0.12,
+        "professional_tax": 200, "income_tax": gross * tax_rate, "insurance": gross * 0.01,
+    }
+    pay = {k: _money(v) for k, v in pay.items()}
+    pay["deductions"] = _money(pay["provident_fund"] + pay["professional_tax"] + pay["income_tax"] + pay["insurance"])
+    pay["net"] = _money(pay["gross"] - pay["deductions"])
+    return pay
+
+def _role_id(conn: Connection, name: str) -> int:
+    table = models.UserRole.__table__
+    role_id = conn.execute(select(table.c.role_id).where(table.c.role_name == name)).scalar()
+    if role_id is None:
+        role_id = conn.execute(table.insert().values(
+            role_name=name, description="Standard employee access", permissions={"all": False}, is_active=True,
+        ).returning(table.c.role_id)).scalar_one()
+    return role_id
+
+def _leave_types(conn: Connection) -> List[Tuple[int, int]]:
+    """(leave_type_id, days per year) for LEAVE_TYPES, creating the missing ones."""
+    table = models.LeaveType.__table__
+    found = []
+    for name, code, days, _, _ in LEAVE_TYPES:
+        row = conn.execute(
+            select(table.c.leave_type_id, table.c.days_per_year).where(table.c.leave_code == code)
+        ).first()
+        if row is None:
+            row = conn.execute(table.insert().values(
+                leave_name=name, leave_code=code, days_per_year=days, is_paid=True,
+                carry_forward_allowed=code == "AL", max_carry_forward_days=5 if code == "AL" else None,
+                requires_approval=True, is_active=True,
+            ).returning(table.c.leave_type_id, table.c.days_per_year)).first()
+        found.append((row[0], row[1] if row[1] is not None else days))
+    return found
+
+def generate(scale: float, seed: int, years: int, as_of: date, skip: Sequence[str] = (),
+             chunk_size: int = CHUNK_SIZE, log: Callable[[str], None] = print) -> Dict[str, int]:
+    """
+    Generate and load a synthetic organisation into the configured database,
+    next to whatever is already there. Everything is written in one
+    transaction; returns the rows loaded per table.
+    """
+    engine = database.engine
+    generator = Generator(seed, scale, years, as_of)
+    with engine.connect() as conn:
+        first_ids = {
+            model: _next_id(conn, column) for model, column in [
+                (models.Department, models.Department.department_id),
+                (models.JobPosition, models.JobPosition.position_id),
+                (models.Employee, models.Employee.employee_id),
+                (models.LeaveApplication, models.LeaveApplication.leave_id),
+                (models.JobPosting, models.JobPosting.posting_id),
+            ]
+        }
+    started = time.perf_counter()
+    generator.build(first_ids[models.Department], first_ids[models.JobPosition], first_ids[models.Employee])
+    generator.build_postings(first_ids[models.JobPosting])
+    log(f"Organisation: {len(generator.departments)} departments, {len(generator.positions)} positions, "
+        f"{len(generator.hires)} employees, {len(generator.workdays)} working days "
+        f"({generator.start} to {as_of}) in {time.perf_counter() - started:.2f}s.")
+
+    # Both write in their own transactions, so they go before the load takes the write lock
+    code_numbers = employee_codes.allocator.take(len(generator.hires))
+    if "attendance" not in skip:
+        months = (as_of.year - generator.start.year) * 12 + as_of.month - generator.start.month
+        db = database.SessionLocal()
+        try:
+            attendance_partitions.ensure_partitions(
+                db, today=generator.start, ahead=months + settings.ATTENDANCE_PARTITIONS_AHEAD,
+            )
+        finally:
+            db.close()
+    password_hash = security.get_password_hash(PASSWORD)
+
+    counts: Dict[str, int] = {}
+    with engine.begin() as conn:
+        loader = BulkLoader(conn, chunk_size)
+
+        def load(model, columns: Sequence[str], rows: Iterable[tuple]) -> None:
+            began = time.perf_counter()
+            counts[model.__tablename__] = loaded = loader.load(model, columns, rows)
+            elapsed = time.perf_counter() - began
+            log(f"  {model.__tablename__}: {loaded} rows in {elapsed:.2f}s ({loaded / max(elapsed, 1e-9):.0f}/s)")
+
+        role_id = _role_id(conn, "Employee")
+        leave_types = _leave_types(conn)
+        allowances = [allowance for _, allowance in leave_types]
+
+        load(models.Department, [
+            "department_id", "department_name", "department_code", "parent_department_id", "manager_id",
+            "budget", "location", "description", "is_active",
+        ], generator.department_rows())
+        load(models.DepartmentClosure, ["ancestor_id", "descendant_id", "depth"], generator.department_closure_rows())
+        load(models.JobPosition, [
+            "position_id", "position_title", "position_code", "department_id", "job_level",
+            "min_salary", "max_salary", "job_description", "requirements", "is_active",
+        ], generator.position_rows())
+        load(models.Employee, [
+            "employee_id", "employee_code", "first_name", "last_name", "email", "mobile", "date_of_birth",
+            "gender", "marital_status", "department_id", "position_id", "manager_id", "employment_type",
+            "employment_status", "date_of_joining", "date_of_leaving", "probation_end_date",
+            "city", "state", "country", "is_active",
+        ], generator.employee_rows(code_numbers))
+        load(models.EmployeeClosure, ["ancestor_id", "descendant_id", "depth"], generator.employee_closure_rows())
+        load(models.EmployeeSystemAccess, ["employee_id", "role_id", "username", "password_hash", "is_active"],
+             generator.access_rows(role_id, password_hash))
+
+        if "leave" not in skip:
+            load(models.LeaveApplication, [
+                "leave_id", "employee_id", "leave_type_id", "start_date", "end_date", "total_days", "reason",
+                "status", "applied_on", "approved_by", "approved_on", "rejection_reason",
+            ], generator.leave_rows(first_ids[models.LeaveApplication], leave_types))
+            load(models.EmployeeLeaveBalance, [
+                "employee_id", "leave_type_id", "year", "total_days", "used_days", "remaining_days",
+                "carried_forward",
+            ], generator.balance_rows(leave_types))
+            load(models.LeaveLedgerEntry, ["employee_id", "leave_type_id", "year", "entry_type", "days", "leave_id"],
+                 generator.ledger_rows(first_ids[models.LeaveApplication], leave_types))
+        if "attendance" not in skip:
+            load(models.Attendance, [
+                "employee_id", "attendance_date", "check_in", "check_out", "work_hours", "overtime_hours", "status",
+            ], generator.attendance_rows(allowances))
+        if "payroll" not in skip:
+            load(models.SalaryStructure, [
+                "employee_id", "effective_from", "effective_to", "basic_salary", "house_rent_allowance",
+                "transport_allowance", "medical_allowance", "special_allowance", "provident_fund",
+                "professional_tax", "income_tax", "insurance", "gross_salary", "total_deductions", "net_salary",
+                "currency", "payment_frequency",
+            ], generator.salary_structure_rows())
+            load(models.Payroll, [
+                "employee_id", "pay_period_start", "pay_period_end", "payment_date", "basic_salary", "allowances",
+                "bonuses", "gross_pay", "tax_deductions", "insurance_deductions", "retirement_deductions",
+                "other_deductions", "total_deductions", "net_pay", "status", "payment_method",
+            ], generator.payroll_rows())
+        if "recruitment" not in skip:
+            load(models.JobPosting, [
+                "posting_id", "position_id", "job_title", "department_id", "vacancies", "job_description",
+                "requirements", "min_experience", "max_experience", "min_salary", "max_salary", "location",
+                "employment_type", "posted_date", "closing_date", "status",
+            ], generator.posting_rows())
+            load(models.JobApplication, [
+                "posting_id", "first_name", "last_name", "email", "phone", "current_company", "current_position",
+                "total_experience", "expected_salary", "notice_period", "cover_letter", "status", "applied_date",
+            ], generator.application_rows())
+
+        # Ids above were written explicitly; the bulk load also skipped the mapper events
+        for model in first_ids:
+            loader.reset_sequence(model)
+        for model in (models.Department, models.JobPosition, models.Employee, models.UserRole, models.LeaveType):
+            bus.publish(conn, model.__tablename__)
+
+    if "attendance" not in skip:
+        began = time.perf_counter()
+        db = database.SessionLocal()
+        try:
+            summaries = attendance.rebuild_monthly_summary(db)
+            db.commit()
+        finally:
+            db.close()
+        log(f"  attendance_monthly_summary: {summaries} rows rebuilt in {time.perf_counter() - began:.2f}s")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Load a synthetic, reproducible HRMS dataset for benchmarking.")
+    parser.add_argument("--scale", type=float, default=1.0, help=f"Size factor: {BASE_EMPLOYEES} employees per 1.0")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    parser.add_argument("--years", type=int, default=2, help="Years of attendance, leave and payroll history")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=None,
+                        help="Last day of history (default: today; pin it for identical data on any day)")
+    parser.add_argument("--skip", choices=GROUPS, action="append", default=[], help="Leave out a group of tables (repeatable)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows per COPY / executemany batch")
+    args = parser.parse_args()
+
+    print(f"Loading into {database.engine.url.render_as_string(hide_password=True)} "
+          f"(scale {args.scale}, seed {args.seed}, {args.years} years)...")
+    started = time.perf_counter()
+    counts = generate(args.scale, args.seed, args.years, args.as_of or date.today(), args.skip, args.chunk_size)
+    print(f"Loaded {sum(counts.values())} rows into {len(counts)} tables in {time.perf_counter() - started:.2f}s. "
+          f"Every synthetic login (syn<employee_id>) uses the password '{PASSWORD}'.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+import sys
+import os
+import argparse
+import json
+from app import database
+from app.services import attendance_partitions
+
+def main():
+    parser = argparse.ArgumentParser(description="Attendance partitions, retention and archival.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ensure = commands.add_parser("ensure", help="Create upcoming monthly partitions (Postgres)")
+    ensure.add_argument("--ahead", type=int, default=None, help="Months ahead (default: ATTENDANCE_PARTITIONS_AHEAD)")
+    archive = commands.add_parser("archive", help="Move months older than the retention window to archive files")
+    archive.add_argument("--years", type=int, default=None, help="Retention in years (default: ATTENDANCE_RETENTION_YEARS)")
+    archive.add_argument("--dir", default=None, help="Archive directory (default: ATTENDANCE_ARCHIVE_DIR)")
+    archive.add_argument("--dry-run", action="store_true", help="Only list the months that would be archived")
+    commands.add_parser("convert", help="Migrate an existing plain attendance table to monthly partitions (Postgres)")
+    commands.add_parser("status", help="Show partitions and archived months")
+    args = parser.parse_args()
+
+    db = database.SessionLocal()
+    try:
+        if args.command == "ensure":
+            created = attendance_partitions.ensure_partitions(db, ahead=args.ahead)
+            print(f"Created {len(created)} partition(s): {', '.join(created) or '-'}")
+        elif args.command == "archive":
+            if args.dry_run:
+                months = attendance_partitions.expired_months(db, args.years)
+                print("Would archive:", ", ".join(f"{m:%Y-%m}" for m in months) or "nothing")
+                return 0
+            for record in attendance_partitions.archive_expired(db, args.years, args.dir):
+                print(f"Archived {record.year}-{record.month:02d}: {record.row_count} rows -> {record.path}")
+        elif args.command == "convert":
+            copied = attendance_partitions.convert_to_partitioned(db)
+            print(f"Copied {copied} rows into the partitioned attendance table.")
+        else:
+            print(json.dumps(attendance_partitions.storage_status(db), indent=2))
+    finally:
+        db.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.path.append(os.getcwd())
+    sys.exit(main())
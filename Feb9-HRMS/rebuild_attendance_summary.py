@@ -0,0 +1,29 @@
+import sys
+import os
+import argparse
+import time
+from app import database
+from app.services import attendance
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the attendance_monthly_summary rollup from raw attendance.")
+    parser.add_argument("--year", type=int, default=None, help="Only rebuild this year (default: everything)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    db = database.SessionLocal()
+    try:
+        count = attendance.rebuild_monthly_summary(db, args.year)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    scope = f"year {args.year}" if args.year else "all years"
+    print(f"Rebuilt {count} employee-month summaries ({scope}) in {time.perf_counter() - started:.2f}s.")
+    return 0
+
+if __name__ == "__main__":
+    sys.path.append(os.getcwd())
+    sys.exit(main())
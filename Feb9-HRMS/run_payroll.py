@@ -0,0 +1,33 @@
+import sys
+import argparse
+from datetime import date
+from app import database
+from app.services import payroll
+
+def main():
+    parser = argparse.ArgumentParser(description="Run payroll for all active employees in a pay period.")
+    parser.add_argument("start", type=date.fromisoformat, help="Pay period start (YYYY-MM-DD)")
+    parser.add_argument("end", type=date.fromisoformat, help="Pay period end (YYYY-MM-DD)")
+    parser.add_argument("--department", type=int, action="append", dest="departments", help="Limit to department id (repeatable)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: PAYROLL_WORKERS)")
+    args = parser.parse_args()
+    if args.workers:
+        # Started lazily, so this sizes the pool for this run
+        payroll.pool.workers = args.workers
+
+    db = database.SessionLocal()
+    try:
+        result = payroll.run_payroll(db, args.start, args.end, department_ids=args.departments, workers=args.workers)
+    finally:
+        db.close()
+
+    for d in result.departments:
+        status = f"ERROR: {d.error}" if d.error else f"{d.processed} employees in {d.elapsed_seconds}s"
+        print(f"Department {d.department_id}: {status}")
+    print(f"Processed {result.employees_processed} employees in {result.elapsed_seconds}s "
+          f"({result.employees_per_second}/s), {result.failed_departments} department(s) failed.")
+    # Re-run the same period to resume after failures; finished employees are skipped.
+    return 1 if result.failed_departments else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Query budgets for the busiest list endpoints. A page costs the same number
+of statements whatever its size; a lazy load creeping into a response
+model shows up here as a budget blown on the larger page.
+
+Runs against a throwaway SQLite database loaded with a small synthetic
+organisation: python -m pytest tests/
+"""
+import os
+import tempfile
+from datetime import date
+
+_db_dir = tempfile.mkdtemp(prefix="hrms-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'hrms.db')}"
+os.environ["DB_ASYNC"] = "false"
+os.environ["QUERY_STATS_ENABLED"] = "true"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["HASH_POOL_WORKERS"] = "0"
+
+import pytest
+from fastapi.testclient import TestClient
+
+import bootstrap_db
+import generate_data
+import seed
+from app import database, models
+from app.core import security
+from app.core.query_stats import QueryStats, assert_max_queries, max_queries
+from app.main import app
+from app.services import hierarchy
+
+@pytest.fixture(scope="module")
+def client():
+    bootstrap_db.bootstrap_database()
+    seed.seed_data()
+    generate_data.generate(0.001, 7, 1, date(2025, 6, 30), skip=["payroll", "recruitment"], log=lambda _: None)
+    with TestClient(app) as c:
+        yield c
+
+@pytest.fixture(scope="module")
+def admin(client):
+    response = client.post("/auth/login", json={"username": "admin1", "password": "admin123"})
+    client.cookies.clear()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    # Warm the principal cache so every budget below counts the handler alone
+    client.get("/employees/?limit=1", headers=headers)
+    return headers
+
+@pytest.fixture(scope="module")
+def employee(client):
+    username = f"syn{_employee_with_manager().employee_id}"
+    response = client.post("/auth/login", json={"username": username, "password": generate_data.PASSWORD})
+    client.cookies.clear()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    client.get("/attendance/history?limit=1", headers=headers)
+    return headers
+
+def _employee_with_manager() -> models.Employee:
+    db = database.SessionLocal()
+    try:
+        return db.query(models.Employee).filter(
+            models.Employee.manager_id.isnot(None)
+        ).order_by(models.Employee.employee_id).first()
+    finally:
+        db.close()
+
+@pytest.mark.parametrize("limit", [10, 100])
+def test_employee_list(client, admin, limit):
+    response = client.get(f"/employees/?limit={limit}", headers=admin)
+    assert response.status_code == 200
+    assert_max_queries(response, 1)
+
+def test_employee_list_projection(client, admin):
+    response = client.get("/employees/?limit=100&fields=employee_id,first_name,last_name", headers=admin)
+    assert response.status_code == 200
+    assert set(response.json()[0]) == {"employee_id", "first_name", "last_name"}
+    assert_max_queries(response, 1)
+
+@pytest.mark.parametrize("limit", [10, 100])
+def test_attendance_history(client, admin, limit):
+    response = client.get(f"/attendance/history?limit={limit}", headers=admin)
+    assert response.status_code == 200
+    assert len(response.json()) == limit
+    assert_max_queries(response, 1)
+
+def test_own_attendance_history(client, employee):
+    response = client.get("/attendance/history?limit=100", headers=employee)
+    assert response.status_code == 200
+    assert_max_queries(response, 1)
+
+@pytest.mark.parametrize("limit", [10, 100])
+def test_pending_leave(client, admin, limit):
+    response = client.get(f"/leave/pending?limit={limit}", headers=admin)
+    assert response.status_code == 200
+    assert response.json()
+    assert_max_queries(response, 1)
+
+def test_reports_walk_by_cursor(client, admin):
+    manager = _employee_with_manager().manager_id
+    everyone = client.get(f"/employees/{manager}/reports?limit=1000&fields=employee_id", headers=admin).json()
+    walked, cursor = [], ""
+    while True:
+        response = client.get(f"/employees/{manager}/reports?limit=3&fields=employee_id&cursor={cursor}", headers=admin)
+        assert_max_queries(response, 1)
+        walked += response.json()
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert walked == everyone
+
+def test_management_chain(client):
+    node = _employee_with_manager()
+    db = database.SessionLocal()
+    try:
+        with max_queries(1):
+            chain = hierarchy.employees.ancestors_query(db, models.Employee, node.employee_id).all()
+    finally:
+        db.close()
+    assert chain[0].employee_id == node.manager_id
+
+def test_budget_failure_lists_statements(client):
+    db = database.SessionLocal()
+    try:
+        with pytest.raises(AssertionError, match="Ran 2 queries, expected at most 1"):
+            with max_queries(1):
+                db.get(models.Employee, 1)
+                db.get(models.Department, 1)
+    finally:
+        db.close()
+
+def test_repeated_writes_are_not_n_plus_one():
+    stats = QueryStats()
+    for _ in range(20):
+        stats.record("INSERT INTO payroll (employee_id) SELECT employee_id FROM employees WHERE department_id = ?", 0.001)
+        stats.record("SELECT employees.employee_id FROM employees WHERE employees.manager_id = ?", 0.001)
+    assert [n for _, n in stats.repeated(threshold=5, kinds={"SELECT"})] == [20]
+    assert len(stats.repeated(threshold=5, kinds={"SELECT", "INSERT"})) == 2
@@ -31,10 +31,11 @@ def verify():
         
         if missing:
             print(f"ERROR: Missing tables: {missing}")
-            # Identify if we need to run init (main.py imports models which triggers drop_all/create_all only if run? No, main.py has code at top level)
-            # If we import app.main, it will run the create_all code.
-            print("Attempting to initialize tables via importing app.main...")
-            from app import main
+            # Tables are created by the bootstrap command, not by importing app.main
+            print("Attempting to initialize tables via bootstrap_db...")
+            from bootstrap_db import bootstrap_database
+            bootstrap_database()
+            inspector = inspect(engine)
             # Re-check
             tables = inspector.get_table_names()
             print(f"Found {len(tables)} tables after init.")